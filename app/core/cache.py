@@ -0,0 +1,245 @@
+import hashlib
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Protocol
+
+from app.core.config import settings
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a time-to-live.
+
+    Entries are evicted least-recently-used first once `maxsize` is reached.
+    A per-entry ttl can be passed to `set` to override the default.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        if self.maxsize <= 0:
+            return
+
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class FileCache:
+    """TTL cache of bytes values kept as one file per key in a directory.
+
+    Every worker process on a host that points at the same directory shares
+    the entries, so an invalidation in one worker is seen by all of them. It
+    stands in for a networked cache without adding a service to deploy.
+    A file holds its expiry time followed by the raw value; nothing read
+    from the directory is ever deserialized into objects.
+    Hit and miss counters are per process.
+    """
+
+    PRUNE_INTERVAL = 100
+    HEADER = struct.Struct(">d")
+
+    def __init__(self, directory: str, maxsize: int, ttl: float) -> None:
+        self.directory = directory
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: Hashable) -> str:
+        return os.path.join(self.directory, hashlib.sha256(repr(key).encode()).hexdigest())
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+        except FileNotFoundError:
+            data = b""
+        if len(data) < self.HEADER.size:
+            self._count(hit=False)
+            return default
+
+        expires_at, = self.HEADER.unpack_from(data)
+        value = data[self.HEADER.size:]
+
+        # Wall-clock time, since entries are shared between processes
+        if expires_at <= time.time():
+            self._unlink(path)
+            self._count(hit=False)
+            return default
+
+        self._count(hit=True)
+        return value
+
+    def set(self, key: Hashable, value: bytes, ttl: Optional[float] = None) -> None:
+        if self.maxsize <= 0:
+            return
+
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=".", suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(self.HEADER.pack(expires_at))
+                file.write(value)
+            os.replace(temp_path, self._path(key))
+        except BaseException:
+            self._unlink(temp_path)
+            raise
+
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % self.PRUNE_INTERVAL == 0
+        if prune:
+            self.prune()
+
+    def delete(self, key: Hashable) -> None:
+        self._unlink(self._path(key))
+
+    def clear(self) -> None:
+        for entry in self._entries():
+            self._unlink(entry.path)
+
+    def prune(self) -> None:
+        """Evict the least recently written entries beyond maxsize; expired ones go on read."""
+        entries = sorted(self._entries(), key=lambda entry: entry.stat().st_mtime)
+        excess = len(entries) - self.maxsize
+        for entry in entries[:max(excess, 0)]:
+            self._unlink(entry.path)
+            with self._lock:
+                self.evictions += 1
+
+    def _entries(self) -> list[os.DirEntry]:
+        with os.scandir(self.directory) as entries:
+            return [entry for entry in entries if entry.is_file() and not entry.name.startswith(".")]
+
+    @staticmethod
+    def _unlink(path: str) -> None:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    def __len__(self) -> int:
+        return len(self._entries())
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class CacheBackend(Protocol):
+    def get(self, key: Hashable, default: Any = None) -> Any: ...
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None: ...
+    def delete(self, key: Hashable) -> None: ...
+    def clear(self) -> None: ...
+    def stats(self) -> dict: ...
+
+
+def create_cache(backend: str, maxsize: int, ttl: float, directory: Optional[str] = None) -> CacheBackend:
+    if backend == "memory":
+        return TTLCache(maxsize=maxsize, ttl=ttl)
+    if backend == "file":
+        return FileCache(directory=directory, maxsize=maxsize, ttl=ttl)
+    if backend == "none":
+        return TTLCache(maxsize=0, ttl=ttl)
+    raise ValueError(f"Unknown cache backend: {backend}")
+
+
+# Snapshots of authenticated users keyed by user id, see app.core.security
+user_cache = TTLCache(
+    maxsize=settings.AUTH_USER_CACHE_SIZE,
+    ttl=settings.AUTH_USER_CACHE_TTL_SECONDS,
+)
+
+
+# Current token_version per user id, checked by stateless access tokens
+token_version_cache = TTLCache(
+    maxsize=settings.AUTH_USER_CACHE_SIZE,
+    ttl=settings.TOKEN_VERSION_CACHE_TTL_SECONDS,
+)
+
+# Verified JWT payloads keyed by token digest, each entry lives until the token's exp
+token_cache = TTLCache(
+    maxsize=settings.TOKEN_CACHE_SIZE,
+    ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
+
+# Serialized article payloads keyed by article id, see app.repository.article
+article_cache = create_cache(
+    settings.ARTICLE_CACHE_BACKEND,
+    maxsize=settings.ARTICLE_CACHE_SIZE,
+    ttl=settings.ARTICLE_CACHE_TTL_SECONDS,
+    directory=settings.ARTICLE_CACHE_DIR,
+)
@@ -17,6 +17,39 @@ class JwtSettings(BaseSettings):
     ALGORITHM: str = Field(default=os.getenv("ALGORITHM", "HS256"))
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(default=int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30)))
     REFRESH_TOKEN_EXPIRE_DAYS: int = Field(default=int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 7)))
+    JWT_STATELESS_AUTH: bool = Field(default=os.getenv("JWT_STATELESS_AUTH", "false").lower() == "true")
+
+class PasswordSettings(BaseSettings):
+    PASSWORD_SCHEMES: str = Field(default=os.getenv("PASSWORD_SCHEMES", "bcrypt"))
+    PASSWORD_BCRYPT_ROUNDS: int = Field(default=int(os.getenv("PASSWORD_BCRYPT_ROUNDS", 12)))
+    PASSWORD_HASH_WORKERS: int = Field(default=int(os.getenv("PASSWORD_HASH_WORKERS", 2)))
+    PASSWORD_HASH_QUEUE_DEPTH: int = Field(default=int(os.getenv("PASSWORD_HASH_QUEUE_DEPTH", 32)))
+
+class RateLimitSettings(BaseSettings):
+    LOGIN_RATE_LIMIT_BACKEND: str = Field(default=os.getenv("LOGIN_RATE_LIMIT_BACKEND", "memory"))
+    LOGIN_RATE_LIMIT_SIZE: int = Field(default=int(os.getenv("LOGIN_RATE_LIMIT_SIZE", 100000)))
+    LOGIN_USERNAME_BURST: int = Field(default=int(os.getenv("LOGIN_USERNAME_BURST", 10)))
+    LOGIN_USERNAME_PER_MINUTE: float = Field(default=float(os.getenv("LOGIN_USERNAME_PER_MINUTE", 5)))
+    LOGIN_IP_BURST: int = Field(default=int(os.getenv("LOGIN_IP_BURST", 100)))
+    LOGIN_IP_PER_MINUTE: float = Field(default=float(os.getenv("LOGIN_IP_PER_MINUTE", 60)))
+
+class ImageSettings(BaseSettings):
+    IMAGE_WORKERS: int = Field(default=int(os.getenv("IMAGE_WORKERS", 2)))
+
+class StaticSettings(BaseSettings):
+    STATIC_SENDFILE_HEADER: str = Field(default=os.getenv("STATIC_SENDFILE_HEADER", ""))
+    STATIC_ACCEL_REDIRECT_PREFIX: str = Field(default=os.getenv("STATIC_ACCEL_REDIRECT_PREFIX", "/internal/uploads/"))
+
+class CacheSettings(BaseSettings):
+    AUTH_USER_CACHE_SIZE: int = Field(default=int(os.getenv("AUTH_USER_CACHE_SIZE", 10000)))
+    AUTH_USER_CACHE_TTL_SECONDS: int = Field(default=int(os.getenv("AUTH_USER_CACHE_TTL_SECONDS", 60)))
+    TOKEN_CACHE_SIZE: int = Field(default=int(os.getenv("TOKEN_CACHE_SIZE", 10000)))
+    TOKEN_VERSION_CACHE_TTL_SECONDS: int = Field(default=int(os.getenv("TOKEN_VERSION_CACHE_TTL_SECONDS", 30)))
+    ROLE_REGISTRY_REFRESH_SECONDS: int = Field(default=int(os.getenv("ROLE_REGISTRY_REFRESH_SECONDS", 300)))
+    ARTICLE_CACHE_BACKEND: str = Field(default=os.getenv("ARTICLE_CACHE_BACKEND", "memory"))
+    ARTICLE_CACHE_SIZE: int = Field(default=int(os.getenv("ARTICLE_CACHE_SIZE", 1000)))
+    ARTICLE_CACHE_TTL_SECONDS: int = Field(default=int(os.getenv("ARTICLE_CACHE_TTL_SECONDS", 300)))
+    ARTICLE_CACHE_DIR: str = Field(default=os.getenv("ARTICLE_CACHE_DIR", ".cache/articles"))
 
 class PostgresSettings(BaseSettings):
     POSTGRES_USER: str = Field(default=os.getenv("POSTGRES_USER", "postgres"))
@@ -27,6 +60,10 @@ class PostgresSettings(BaseSettings):
     POSTGRES_SYNC_PREFIX: str = Field(default=os.getenv("POSTGRES_SYNC_PREFIX", "postgresql+psycopg2://"))
     POSTGRES_ASYNC_PREFIX: str = Field(default=os.getenv("POSTGRES_ASYNC_PREFIX", "postgresql+asyncpg://"))
     POSTGRES_URI: str = Field(default=f"{os.getenv('POSTGRES_USER')}:{os.getenv('POSTGRES_PASSWORD')}@{os.getenv('POSTGRES_SERVER')}:{os.getenv('POSTGRES_PORT')}/{os.getenv('POSTGRES_DB')}")
+    POSTGRES_ASYNC_POOL_SIZE: int = Field(default=int(os.getenv("POSTGRES_ASYNC_POOL_SIZE", 20)))
+    POSTGRES_ASYNC_MAX_OVERFLOW: int = Field(default=int(os.getenv("POSTGRES_ASYNC_MAX_OVERFLOW", 10)))
+    POSTGRES_ASYNC_POOL_TIMEOUT: int = Field(default=int(os.getenv("POSTGRES_ASYNC_POOL_TIMEOUT", 30)))
+    POSTGRES_ASYNC_POOL_RECYCLE: int = Field(default=int(os.getenv("POSTGRES_ASYNC_POOL_RECYCLE", 1800)))
 
 class EnvironmentOption(Enum):
     LOCAL = "local"
@@ -39,6 +76,11 @@ class EnvironmentSettings(BaseSettings):
 class Settings(
     AppSettings,
     JwtSettings,
+    CacheSettings,
+    PasswordSettings,
+    RateLimitSettings,
+    ImageSettings,
+    StaticSettings,
     PostgresSettings,
     EnvironmentSettings,
 ):
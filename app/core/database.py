@@ -1,4 +1,5 @@
 from sqlalchemy import create_engine, text
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession as SQLAlchemyAsyncSession
 from sqlalchemy.orm import (
     sessionmaker, scoped_session,
@@ -21,7 +22,16 @@ engine = create_engine(
 Session = sessionmaker(engine, future=True)
 factory_session = scoped_session(Session)
 
-async_engine = create_async_engine(DATABASE_ASYNC_URL, echo=False, future=True)
+async_engine = create_async_engine(
+    DATABASE_ASYNC_URL,
+    echo=False,
+    future=True,
+    pool_size=settings.POSTGRES_ASYNC_POOL_SIZE,
+    max_overflow=settings.POSTGRES_ASYNC_MAX_OVERFLOW,
+    pool_timeout=settings.POSTGRES_ASYNC_POOL_TIMEOUT,
+    pool_recycle=settings.POSTGRES_ASYNC_POOL_RECYCLE,
+    pool_pre_ping=True,
+)
 AsyncSession = sessionmaker(bind=async_engine, class_=SQLAlchemyAsyncSession, expire_on_commit=False)
 
 def get_db():
@@ -39,6 +49,27 @@ async def get_async_db():
             await db.close()
 
 
+UNIQUE_VIOLATION = "23505"
+FOREIGN_KEY_VIOLATION = "23503"
+
+def is_constraint_violation(error: IntegrityError, pgcode: str, constraint_name: str) -> bool:
+    orig = error.orig
+    if getattr(orig, "pgcode", None) != pgcode:
+        return False
+
+    # asyncpg chains its own exception, psycopg2 exposes diagnostics directly
+    name = getattr(orig.__cause__, "constraint_name", None)
+    if name is None and hasattr(orig, "diag"):
+        name = orig.diag.constraint_name
+    return name == constraint_name
+
+def is_unique_violation(error: IntegrityError, constraint_name: str) -> bool:
+    return is_constraint_violation(error, UNIQUE_VIOLATION, constraint_name)
+
+def is_foreign_key_violation(error: IntegrityError, constraint_name: str) -> bool:
+    return is_constraint_violation(error, FOREIGN_KEY_VIOLATION, constraint_name)
+
+
 def clear_all_data_on_database(db: SQLAlchemySession):
     db.execute(text("DELETE FROM articles"))
     db.execute(text("DELETE FROM files"))
@@ -0,0 +1,140 @@
+import asyncio
+import multiprocessing
+import random
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.response import ServiceUnavailable
+
+# The first scheme hashes new passwords; hashes in any other scheme, or with
+# fewer bcrypt rounds than configured, are replaced on the next login
+pwd_context = CryptContext(
+    schemes=[scheme.strip() for scheme in settings.PASSWORD_SCHEMES.split(",")],
+    deprecated="auto",
+    bcrypt__rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+)
+
+LATENCY_SAMPLES = 1000
+DUMMY_PASSWORD = "dummy-password"
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+def verify_and_update(password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    try:
+        return pwd_context.verify_and_update(password, hashed_password)
+    except ValueError:
+        return False, None
+
+
+class PasswordHasher:
+    """Runs password hashing in a dedicated process pool with bounded admission.
+
+    At most `workers` hashes run at once and `queue_depth` more may wait; any
+    request beyond that is rejected with 503 straight away instead of piling
+    up behind a login burst. With no workers, hashing falls back to the
+    shared threadpool, still bounded the same way.
+    """
+
+    def __init__(self, workers: int, queue_depth: int):
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._latencies = deque(maxlen=LATENCY_SAMPLES)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn keeps workers free of the parent's event loop and pooled connections
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def _run(self, function, *args):
+        if self._in_flight >= max(self.workers, 1) + self.queue_depth:
+            self._rejected += 1
+            raise ServiceUnavailable(message="Password hashing is at capacity, try again shortly.").http_exception()
+
+        self._in_flight += 1
+        start = time.perf_counter()
+        try:
+            if self.workers > 0:
+                result = await self._run_in_pool(function, *args)
+            else:
+                result = await run_in_threadpool(function, *args)
+        finally:
+            self._in_flight -= 1
+
+        # Failures are left out, their latency says nothing about a real hash
+        self._completed += 1
+        self._latencies.append(time.perf_counter() - start)
+        return result
+
+    async def _run_in_pool(self, function, *args):
+        executor = self._get_executor()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, function, *args)
+        except BrokenProcessPool:
+            # A worker died and the pool refuses all further work; the next
+            # call starts a fresh one unless a concurrent call already has
+            if self._executor is executor:
+                self.shutdown()
+            raise ServiceUnavailable(message="Password hashing is restarting, try again shortly.").http_exception()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+        """Check a password; the second value is a replacement hash when the stored one is outdated."""
+        return await self._run(verify_and_update, password, hashed_password)
+
+    async def dummy_verify(self):
+        """Take as long as a real verify without doing one, for logins with an unknown username.
+
+        Sleeps for a recently observed hashing latency, so probes for
+        usernames cannot be told apart by timing and cost no worker time.
+        Only the very first call, with nothing observed yet, hashes for real.
+        """
+        if not self._latencies:
+            await self.hash(DUMMY_PASSWORD)
+            return
+        await asyncio.sleep(random.choice(self._latencies))
+
+    def stats(self) -> dict:
+        latencies = sorted(self._latencies)
+
+        def percentile(fraction: float) -> float:
+            if not latencies:
+                return 0.0
+            return round(latencies[min(int(len(latencies) * fraction), len(latencies) - 1)] * 1e3, 2)
+
+        return {
+            "workers": self.workers,
+            "queue_depth": self.queue_depth,
+            "in_flight": self._in_flight,
+            "queued": max(self._in_flight - max(self.workers, 1), 0),
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "p50_ms": percentile(0.5),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE_DEPTH)
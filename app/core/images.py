@@ -0,0 +1,112 @@
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from PIL import Image
+
+from app.core.config import settings
+from app.core.database import AsyncSession
+from app.core.storage import delete_uploaded_file
+import app.repository.file as file_repo
+
+VARIANT_WIDTHS = (320, 640, 1280)
+VARIANT_FORMAT = "webp"
+VARIANT_QUALITY = 80
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+def is_enabled() -> bool:
+    return settings.IMAGE_WORKERS > 0
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn keeps workers free of the parent's event loop and pooled connections
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+def variant_path(source_path: str, width: int) -> str:
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    return os.path.join(os.path.dirname(source_path), f"{stem}-{width}w.{VARIANT_FORMAT}")
+
+def generate_variants(source_path: str) -> list[dict]:
+    """Write downscaled copies of an image next to it, one per width in VARIANT_WIDTHS.
+
+    Runs inside the process pool. Widths at or above the original are skipped,
+    so small images produce no variants.
+    """
+    variants = []
+    with Image.open(source_path) as image:
+        image.load()
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+
+        for width in VARIANT_WIDTHS:
+            if width >= image.width:
+                break
+
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.Resampling.LANCZOS)
+
+            file_path = variant_path(source_path, width)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(source_path), prefix=".variant-", suffix=".part")
+            try:
+                with os.fdopen(fd, "wb") as buffer:
+                    resized.save(buffer, format=VARIANT_FORMAT.upper(), quality=VARIANT_QUALITY, method=4)
+                os.replace(temp_path, file_path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+
+            variants.append({
+                "width": width,
+                "format": VARIANT_FORMAT,
+                "file_path": file_path,
+                "size": os.path.getsize(file_path),
+            })
+
+    return variants
+
+async def process_thumbnail(file_id: int):
+    """Background task: build the variants of a newly referenced file in the process pool."""
+    if not is_enabled():
+        return
+
+    async with AsyncSession() as db:
+        file = await file_repo.get_file_by_id(db, file_id)
+        if file is None or await file_repo.get_file_variant_count(db, file_id):
+            return
+        source_path = file.file_path
+
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+    try:
+        variants = await loop.run_in_executor(executor, generate_variants, source_path)
+    except BrokenProcessPool:
+        traceback.print_exc()
+        # A dead worker breaks the whole pool; replace it for the next upload
+        if _executor is executor:
+            shutdown_executor()
+        return
+    except Exception:
+        traceback.print_exc()
+        return
+
+    async with AsyncSession() as db:
+        if not await file_repo.add_file_variants(db, file_id, variants):
+            for variant in variants:
+                delete_uploaded_file(variant["file_path"])
@@ -0,0 +1,52 @@
+import json
+from typing import Any, AsyncIterator, Iterable
+
+from pydantic_core import to_json
+
+MEDIA_TYPE = "application/x-ndjson"
+MAX_LINE_SIZE = 10 * 1024 * 1024
+
+class NDJSONError(ValueError):
+    def __init__(self, line_number: int, message: str) -> None:
+        super().__init__(f"Line {line_number}: {message}")
+        self.line_number = line_number
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, Any]]:
+    """Decode a stream of newline-delimited JSON, one (line number, value) at a time.
+
+    Only the current line is buffered, so arbitrarily large bodies are read in
+    constant memory. Blank lines are skipped.
+    """
+    # Pieces of the unfinished line; joined once it ends, so long lines
+    # spread over many chunks are not copied again for every chunk
+    parts: list[bytes] = []
+    pending = 0
+    line_number = 0
+    async for chunk in chunks:
+        *lines, rest = chunk.split(b"\n")
+        if lines:
+            parts.append(lines[0])
+            lines[0] = b"".join(parts)
+            parts, pending = [], 0
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, decode_line(line_number, line)
+        if rest:
+            parts.append(rest)
+            pending += len(rest)
+        if pending > MAX_LINE_SIZE:
+            raise NDJSONError(line_number + 1, "line is too long")
+
+    buffer = b"".join(parts)
+    if buffer.strip():
+        yield line_number + 1, decode_line(line_number + 1, buffer)
+
+def decode_line(line_number: int, line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except (json.JSONDecodeError, UnicodeDecodeError) as error:
+        raise NDJSONError(line_number, f"invalid JSON ({error})") from error
+
+def encode_ndjson(values: Iterable[Any]) -> bytes:
+    return b"".join(to_json(value) + b"\n" for value in values)
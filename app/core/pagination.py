@@ -0,0 +1,21 @@
+import base64
+import binascii
+import json
+from typing import Any
+
+from pydantic_core import to_json
+
+def encode_cursor(*values: Any) -> str:
+    """Opaque keyset cursor holding the sort key of the last row on a page."""
+    return base64.urlsafe_b64encode(to_json(list(values))).decode().rstrip("=")
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """Inverse of encode_cursor; raises ValueError for anything it did not produce."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as error:
+        raise ValueError("Invalid cursor") from error
+
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    return values
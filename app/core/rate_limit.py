@@ -0,0 +1,174 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Optional, Protocol
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core import database
+from app.core.config import settings
+from app.core.response import TooManyRequests
+from app.models import RateLimitBucket
+
+# How often the postgres backend drops buckets that have fully refilled
+PRUNE_INTERVAL_SECONDS = 60
+
+
+class MemoryRateLimiter:
+    """Token buckets kept in this process, bounded to the `maxsize` most recent keys.
+
+    Buckets use GCRA: each key stores only the time its bucket will be full
+    again, which behaves exactly like a token bucket of `burst` tokens
+    refilled at `per_minute`, without a background refill.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.allowed = 0
+        self.rejected = 0
+        self._data: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def acquire(self, key: str, burst: int, per_minute: float) -> Optional[float]:
+        """Take a token for key; None when allowed, otherwise seconds until one is available."""
+        interval = 60 / per_minute
+        tolerance = interval * (burst - 1)
+        with self._lock:
+            now = time.monotonic()
+            tat = max(self._data.get(key, now), now)
+            if tat - tolerance > now:
+                self.rejected += 1
+                return tat - tolerance - now
+
+            self._data[key] = tat + interval
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            self.allowed += 1
+            return None
+
+    async def reset(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        return {"backend": "memory", "keys": len(self._data), "allowed": self.allowed, "rejected": self.rejected}
+
+
+class PostgresRateLimiter:
+    """The same buckets in an UNLOGGED table, shared by every worker and host.
+
+    Each attempt is one upsert that only advances the bucket while it still
+    has a token, so concurrent attempts cannot overspend it.
+    """
+
+    def __init__(self) -> None:
+        self.allowed = 0
+        self.rejected = 0
+        self._pruned_at = 0.0
+
+    async def acquire(self, key: str, burst: int, per_minute: float) -> Optional[float]:
+        interval = timedelta(seconds=60 / per_minute)
+        tolerance = interval * (burst - 1)
+        # Not now(): that is the transaction start, which for an attempt queued on
+        # the row lock can be earlier than the attempt that advanced the bucket
+        now = func.clock_timestamp()
+        query = insert(RateLimitBucket).values(key=key, tat=now + interval)
+        query = query.on_conflict_do_update(
+            index_elements=[RateLimitBucket.key],
+            set_={"tat": func.greatest(RateLimitBucket.tat, now) + interval},
+            where=RateLimitBucket.tat - tolerance <= now,
+        ).returning(RateLimitBucket.tat)
+
+        async with database.AsyncSession() as db:
+            allowed = (await db.execute(query)).scalar() is not None
+            retry_after = None
+            if not allowed:
+                wait = select(RateLimitBucket.tat - tolerance - now).filter_by(key=key)
+                retry_after = max((await db.scalar(wait)).total_seconds(), 0.0)
+            if time.monotonic() - self._pruned_at > PRUNE_INTERVAL_SECONDS:
+                self._pruned_at = time.monotonic()
+                await db.execute(delete(RateLimitBucket).where(RateLimitBucket.tat < now))
+            await db.commit()
+
+        if allowed:
+            self.allowed += 1
+        else:
+            self.rejected += 1
+        return retry_after
+
+    async def reset(self, key: str) -> None:
+        async with database.AsyncSession() as db:
+            await db.execute(delete(RateLimitBucket).filter_by(key=key))
+            await db.commit()
+
+    def clear(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {"backend": "postgres", "keys": None, "allowed": self.allowed, "rejected": self.rejected}
+
+
+class NoRateLimiter:
+    async def acquire(self, key: str, burst: int, per_minute: float) -> Optional[float]:
+        return None
+
+    async def reset(self, key: str) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {"backend": "none", "keys": 0, "allowed": 0, "rejected": 0}
+
+
+class RateLimiter(Protocol):
+    async def acquire(self, key: str, burst: int, per_minute: float) -> Optional[float]: ...
+    async def reset(self, key: str) -> None: ...
+    def clear(self) -> None: ...
+    def stats(self) -> dict: ...
+
+
+def create_rate_limiter(backend: str, maxsize: int) -> RateLimiter:
+    if backend == "memory":
+        return MemoryRateLimiter(maxsize=maxsize)
+    if backend == "postgres":
+        return PostgresRateLimiter()
+    if backend == "none":
+        return NoRateLimiter()
+    raise ValueError(f"Unknown rate limit backend: {backend}")
+
+
+login_rate_limiter = create_rate_limiter(settings.LOGIN_RATE_LIMIT_BACKEND, settings.LOGIN_RATE_LIMIT_SIZE)
+
+def username_key(username: str) -> str:
+    return f"user:{username}"[:255]
+
+async def check_login_attempt(username: str, client_ip: Optional[str]):
+    """Admission control for password logins, run before any lookup or hashing.
+
+    Spends one token from the client's bucket and one from the username's;
+    an empty bucket rejects the attempt with 429 and Retry-After.
+    """
+    buckets = [(username_key(username), settings.LOGIN_USERNAME_BURST, settings.LOGIN_USERNAME_PER_MINUTE)]
+    if client_ip:
+        buckets.insert(0, (f"ip:{client_ip}", settings.LOGIN_IP_BURST, settings.LOGIN_IP_PER_MINUTE))
+
+    for key, burst, per_minute in buckets:
+        retry_after = await login_rate_limiter.acquire(key, burst, per_minute)
+        if retry_after is not None:
+            raise TooManyRequests(
+                message="Too many login attempts, try again later.",
+                retry_after=max(int(retry_after + 0.999), 1),
+            ).http_exception()
+
+async def reset_login_attempts(username: str):
+    """A successful login gives the account its full budget back; the client's budget is kept."""
+    await login_rate_limiter.reset(username_key(username))
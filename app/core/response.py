@@ -1,21 +1,48 @@
-from fastapi.responses import JSONResponse
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, Response
 from fastapi import HTTPException, status
+from pydantic_core import to_json
 from typing import Any, Optional
 
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded by pydantic-core.
+
+    Pydantic models, datetimes, UUIDs and generic containers are written
+    straight to bytes, so handlers can pass schema instances without first
+    converting them to plain dicts.
+    """
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
+
+class RawJSON(bytes):
+    """Already-encoded JSON, embedded in a response envelope as-is."""
+
 class Ok:
-    def __init__(self, data: Optional[Any] = None, message: Optional[str] = None) -> None:
+    def __init__(self, data: Optional[Any] = None, message: Optional[str] = None, headers: Optional[dict] = None) -> None:
         self.message = message
         self.data = data or {}
+        self.headers = headers
 
     def json(self):
-        return JSONResponse(content={"status": "success", "message": self.message, "data": self.data}, status_code=status.HTTP_200_OK)
+        if isinstance(self.data, RawJSON):
+            return Response(
+                content=b'{"status":"success","message":' + to_json(self.message) + b',"data":' + self.data + b'}',
+                status_code=status.HTTP_200_OK,
+                headers=self.headers,
+                media_type="application/json"
+            )
+        return FastJSONResponse(
+            content={"status": "success", "message": self.message, "data": self.data},
+            status_code=status.HTTP_200_OK,
+            headers=self.headers
+        )
 
 class Created:
     def __init__(self, data: Optional[Any] = None) -> None:
         self.data = data or {}
 
     def json(self):
-        return JSONResponse(content={"status": "success", "data": self.data}, status_code=status.HTTP_201_CREATED)
+        return FastJSONResponse(content={"status": "success", "data": self.data}, status_code=status.HTTP_201_CREATED)
 
 class NotFound:
     def __init__(self, message: str = "Not Found") -> None:
@@ -38,6 +65,22 @@ class BadRequest:
             status_code=status.HTTP_400_BAD_REQUEST
         )
 
+class UnprocessableEntity:
+    """A body field rejected after parsing, reported in the same shape as pydantic's errors."""
+    def __init__(self, field: str, message: str, value: Optional[Any] = None) -> None:
+        self.field = field
+        self.message = message
+        self.value = value
+
+    def http_exception(self):
+        raise RequestValidationError([{
+            "type": "value_error",
+            "loc": ("body", self.field),
+            "msg": f"Value error, {self.message}",
+            "input": self.value,
+            "ctx": {"error": ValueError(self.message)},
+        }])
+
 class Forbidden:
     def __init__(self, message: str = "Forbidden") -> None:
         self.message = message
@@ -58,6 +101,30 @@ class Unauthorized:
             status_code=status.HTTP_401_UNAUTHORIZED
         )
 
+class TooManyRequests:
+    def __init__(self, message: str = "Too Many Requests", retry_after: int = 1) -> None:
+        self.message = message
+        self.retry_after = retry_after
+
+    def http_exception(self):
+        raise HTTPException(
+            detail={"status": "error", "message": self.message},
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            headers={"Retry-After": str(self.retry_after)}
+        )
+
+class ServiceUnavailable:
+    def __init__(self, message: str = "Service Unavailable", retry_after: int = 1) -> None:
+        self.message = message
+        self.retry_after = retry_after
+
+    def http_exception(self):
+        raise HTTPException(
+            detail={"status": "error", "message": self.message},
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={"Retry-After": str(self.retry_after)}
+        )
+
 class InternalServerError:
     def __init__(self, error: str = "Internal Server Error") -> None:
         self.error = error
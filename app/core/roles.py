@@ -0,0 +1,156 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import FrozenSet, Mapping, Optional
+
+import asyncpg
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import database
+from app.core.config import settings
+from app.models import Role
+from app.schemas.role import DetailRole
+
+ADMIN_ROLE = "admin"
+
+# Postgres channel notified by every transaction that changes the roles table
+ROLES_CHANNEL = "roles_changed"
+
+# Delay before the listener reconnects after losing its connection
+RECONNECT_SECONDS = 5
+
+# Least time between two reloads triggered by unknown role ids, so requests
+# carrying a stale or forged id cannot turn into one query each
+MISS_RELOAD_SECONDS = 1
+
+
+@dataclass(frozen=True)
+class RoleSnapshot:
+    roles: Mapping[int, DetailRole] = field(default_factory=lambda: MappingProxyType({}))
+    admin_ids: FrozenSet[int] = frozenset()
+
+
+class RoleRegistry:
+    """Every role held in memory, so checks on the request path cost no query.
+
+    The whole table is read into an immutable snapshot which is swapped in
+    one assignment; readers never see a partial update. A worker reloads it
+    after changing a role and whenever another worker announces a change on
+    ROLES_CHANNEL, and every ROLE_REGISTRY_REFRESH_SECONDS to pick up edits
+    made outside the API; the periodic reload runs on its own, so it goes on
+    while the listener is disconnected. An id missing from the snapshot
+    triggers a reload before it is reported as unknown, at most once every
+    MISS_RELOAD_SECONDS.
+    """
+
+    def __init__(self) -> None:
+        self._snapshot = RoleSnapshot()
+        self._loaded = False
+        self._miss_reload_at = float("-inf")
+        self._listener: Optional[asyncio.Task] = None
+        self._refresher: Optional[asyncio.Task] = None
+        self.listening = False
+        self.reloads = 0
+        self.loaded_at: Optional[float] = None
+
+    async def load(self, db: AsyncSession) -> None:
+        roles = (await db.execute(select(Role).order_by(Role.id))).scalars().all()
+        self._snapshot = RoleSnapshot(
+            roles=MappingProxyType({role.id: DetailRole.model_validate(role) for role in roles}),
+            admin_ids=frozenset(role.id for role in roles if role.name == ADMIN_ROLE),
+        )
+        self._loaded = True
+        self.reloads += 1
+        self.loaded_at = time.time()
+
+    async def get(self, db: AsyncSession, role_id: int) -> Optional[DetailRole]:
+        role = self._snapshot.roles.get(role_id)
+        if role is None and (not self._loaded or time.monotonic() - self._miss_reload_at >= MISS_RELOAD_SECONDS):
+            # Created by another worker, or outside the API, since the last load
+            self._miss_reload_at = time.monotonic()
+            await self.load(db)
+            role = self._snapshot.roles.get(role_id)
+        return role
+
+    async def roles(self, db: AsyncSession) -> list[DetailRole]:
+        if not self._loaded:
+            await self.load(db)
+        return list(self._snapshot.roles.values())
+
+    def is_admin(self, role_id: int) -> bool:
+        return role_id in self._snapshot.admin_ids
+
+    async def notify(self, db: AsyncSession) -> None:
+        """Announce a change to every worker; delivered only if the transaction commits."""
+        await db.execute(select(func.pg_notify(ROLES_CHANNEL, "")))
+
+    async def reload(self) -> None:
+        async with database.AsyncSession() as db:
+            await self.load(db)
+
+    async def start(self) -> None:
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+        if self._refresher is None:
+            self._refresher = asyncio.create_task(self._refresh())
+
+    async def stop(self) -> None:
+        for task in (self._listener, self._refresher):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._listener = None
+        self._refresher = None
+
+    async def _refresh(self) -> None:
+        while True:
+            await asyncio.sleep(settings.ROLE_REGISTRY_REFRESH_SECONDS)
+            try:
+                await self.reload()
+            except Exception:
+                import traceback
+                traceback.print_exc()
+
+    async def _listen(self) -> None:
+        # A dedicated connection, so LISTEN never leaks into the shared pool
+        dsn = database.async_engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(dsn)
+                changed = asyncio.Event()
+                await connection.add_listener(ROLES_CHANNEL, lambda *args: changed.set())
+                connection.add_termination_listener(lambda *args: changed.set())
+                self.listening = True
+
+                # Initial load, or catching up on whatever was missed while disconnected
+                await self.reload()
+                while not connection.is_closed():
+                    await changed.wait()
+                    changed.clear()
+                    if not connection.is_closed():
+                        await self.reload()
+            except Exception:
+                import traceback
+                traceback.print_exc()
+            finally:
+                self.listening = False
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(RECONNECT_SECONDS)
+
+    def stats(self) -> dict:
+        return {
+            "roles": len(self._snapshot.roles),
+            "listening": self.listening,
+            "reloads": self.reloads,
+            "loaded_at": self.loaded_at,
+        }
+
+
+role_registry = RoleRegistry()
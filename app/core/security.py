@@ -1,23 +1,31 @@
 from datetime import timedelta, datetime, UTC
 from typing import Optional
+import hashlib
+import time
 
 from fastapi import Depends
 from jwt import InvalidTokenError
-from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordBearer
 import jwt
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import user_cache, token_version_cache, token_cache
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.hashing import pwd_context
 from app.core.response import Unauthorized, Forbidden
+from app.core.roles import role_registry
 from app.models import User
-from app.repository.user import get_user_by_id
-from app.schemas.auth import TokenData
+from app.repository.user import get_user_by_id, get_user_token_version
+from app.schemas.auth import TokenData, CurrentUser
+from app.schemas.role import DetailRole
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# User columns copied into stateless access tokens
+TOKEN_CLAIM_FIELDS = ("username", "name", "role_id")
+
+# Synchronous helpers for scripts and tests; request handlers go through password_hasher
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     try:
         return pwd_context.verify(plain_password, hashed_password)
@@ -27,7 +35,7 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
-def create_token(user: User, expires_delta: Optional[timedelta] = None, is_refresh: bool = False) -> str:
+def create_token(user: User | CurrentUser, expires_delta: Optional[timedelta] = None, is_refresh: bool = False) -> str:
     if expires_delta:
         expire = datetime.now(tz=UTC) + expires_delta
     else:
@@ -39,11 +47,19 @@ def create_token(user: User, expires_delta: Optional[timedelta] = None, is_refre
 
     to_encode = {
         "user_id": user.id,
+        "ver": user.token_version or 0,
         "exp": expire
     }
 
     if is_refresh:
         to_encode["is_refresh"] = True
+    elif settings.JWT_STATELESS_AUTH:
+        to_encode.update({
+            "username": user.username,
+            "name": user.name,
+            "role_id": user.role_id,
+            "role": user.role.name,
+        })
 
     encoded_jwt = jwt.encode(
         to_encode,
@@ -55,27 +71,52 @@ def create_token(user: User, expires_delta: Optional[timedelta] = None, is_refre
 def verify_and_decode_jwt(token: str, is_refresh: bool = False) -> dict:
     credentials_exception = Unauthorized(message="Could not validate credentials")
 
-    try:
-        payload = jwt.decode(
-            token,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM]
-        )
+    token_digest = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(token_digest)
+
+    if payload is None:
+        try:
+            payload = jwt.decode(
+                token,
+                settings.SECRET_KEY,
+                algorithms=[settings.ALGORITHM]
+            )
+        except InvalidTokenError:
+            raise credentials_exception.http_exception()
 
         exp = payload.get("exp")
-        if exp is None or datetime.fromtimestamp(exp, tz=UTC) < datetime.now(tz=UTC):
+        if exp is None or exp <= time.time():
             raise credentials_exception.http_exception()
 
-        if is_refresh and not payload.get("is_refresh"):
-            raise Unauthorized(message="Invalid token type").http_exception()
+        token_cache.set(token_digest, payload, ttl=exp - time.time())
+    elif payload["exp"] <= time.time():
+        raise credentials_exception.http_exception()
 
-        return payload
+    if is_refresh and not payload.get("is_refresh"):
+        raise Unauthorized(message="Invalid token type").http_exception()
+
+    return payload
 
-    except InvalidTokenError:
-        raise credentials_exception.http_exception()
 
+async def get_token_version(db: AsyncSession, user_id: int) -> Optional[int]:
+    token_version = token_version_cache.get(user_id)
+    if token_version is None:
+        token_version = await get_user_token_version(db, user_id)
+        if token_version is not None:
+            token_version_cache.set(user_id, token_version)
+    return token_version
+
+def get_user_from_claims(payload: dict) -> CurrentUser:
+    return CurrentUser(
+        id=payload["user_id"],
+        username=payload["username"],
+        name=payload["name"],
+        role_id=payload["role_id"],
+        role=DetailRole(id=payload["role_id"], name=payload["role"]),
+        token_version=payload["ver"],
+    )
 
-def get_user_from_token(db: Session, token: str, is_refresh: bool = False) -> User:
+async def get_user_from_token(db: AsyncSession, token: str, is_refresh: bool = False) -> CurrentUser:
     credentials_exception = Unauthorized(message="Could not validate credentials")
 
     try:
@@ -84,19 +125,42 @@ def get_user_from_token(db: Session, token: str, is_refresh: bool = False) -> Us
         if user_id is None:
             raise credentials_exception.http_exception()
 
-        token_data = TokenData(user_id=user_id, exp=payload.get("exp"), is_refresh=payload.get("is_refresh"))
+        token_data = TokenData(
+            user_id=user_id,
+            exp=payload.get("exp"),
+            is_refresh=payload.get("is_refresh"),
+            token_version=payload.get("ver"),
+        )
 
     except InvalidTokenError as error:
         raise error
 
-    user = get_user_by_id(db, token_data.user_id)
-    if user is None:
-        raise credentials_exception.http_exception()
-    return user
+    if settings.JWT_STATELESS_AUTH and not token_data.is_refresh and "role" in payload:
+        # Claims are trusted as issued; only the revocation counter is looked up
+        token_version = await get_token_version(db, token_data.user_id)
+        if token_version is None or token_version != token_data.token_version:
+            raise credentials_exception.http_exception()
+        current_user = get_user_from_claims(payload)
+    else:
+        current_user = user_cache.get(token_data.user_id)
+        if current_user is None:
+            user = await get_user_by_id(db, token_data.user_id)
+            if user is None:
+                raise credentials_exception.http_exception()
+
+            current_user = CurrentUser.model_validate(user)
+            user_cache.set(current_user.id, current_user)
+
+        if token_data.token_version is not None and token_data.token_version != current_user.token_version:
+            raise credentials_exception.http_exception()
+
+    # check_user_admin reads the registry, so make sure it knows this role
+    await role_registry.get(db, current_user.role_id)
+    return current_user
 
-def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> User:
-    return get_user_from_token(db, token)
+async def get_current_user(db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)) -> CurrentUser:
+    return await get_user_from_token(db, token)
 
-def check_user_admin(user: User):
-    if not user.role.name == "admin":
+def check_user_admin(user: CurrentUser):
+    if not role_registry.is_admin(user.role_id):
         raise Forbidden().http_exception()
\ No newline at end of file
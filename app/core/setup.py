@@ -1,9 +1,17 @@
+from contextlib import asynccontextmanager
+
 from fastapi import APIRouter, FastAPI, HTTPException, Request, status
 from fastapi.exceptions import RequestValidationError
 from starlette.responses import JSONResponse
-from starlette.staticfiles import StaticFiles
 
 from app.core.config import Settings
+from app.core.database import async_engine
+from app.core.hashing import password_hasher
+from app.core.images import shutdown_executor
+from app.core.response import FastJSONResponse
+from app.core.roles import role_registry
+from app.core.static import UploadStaticFiles
+from app.core.storage import UPLOAD_DIR
 from app.schemas.base import BaseResponse
 
 
@@ -15,17 +23,36 @@ def create_application(
         title=settings.APP_NAME,
         description=settings.APP_DESCRIPTION,
         version=settings.APP_VERSION,
+        lifespan=lifespan,
+        default_response_class=FastJSONResponse,
     )
     app.get("/")(lambda: {"message": "Welcome to the API"})
 
     app.include_router(router)
 
-    app.mount("/static", StaticFiles(directory="uploads"), name="static")
+    app.mount(
+        "/static",
+        UploadStaticFiles(
+            directory=UPLOAD_DIR,
+            sendfile_header=settings.STATIC_SENDFILE_HEADER,
+            accel_prefix=settings.STATIC_ACCEL_REDIRECT_PREFIX,
+        ),
+        name="static",
+    )
 
     app.add_exception_handler(RequestValidationError, validation_exception_handler)
 
     return app
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await role_registry.start()
+    yield
+    await role_registry.stop()
+    shutdown_executor()
+    password_hasher.shutdown()
+    await async_engine.dispose()
+
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     processed_errors = []
     for error in exc.errors():
@@ -0,0 +1,81 @@
+import mimetypes
+import os
+import re
+from typing import Optional
+
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles, NotModifiedResponse
+from starlette.types import Scope
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+SENDFILE_HEADERS = ("X-Accel-Redirect", "X-Sendfile")
+
+# <sha256>.<ext> originals and <sha256>-<width>w.<ext> variants, see app.core.storage and app.core.images
+CONTENT_HASHED_NAME = re.compile(r"^[0-9a-f]{64}(-[0-9]+w)?\.[a-z0-9]+$")
+
+def is_content_hashed(path: str) -> bool:
+    return CONTENT_HASHED_NAME.match(os.path.basename(path)) is not None
+
+def content_etag(path: str) -> str:
+    # The name already is the content hash, with the variant width if any
+    return '"' + os.path.splitext(os.path.basename(path))[0] + '"'
+
+class UploadStaticFiles(StaticFiles):
+    """StaticFiles for the uploads directory.
+
+    Uploads are stored under the hash of their content, so a URL never
+    changes meaning and is served as immutable for a year. A conditional
+    request for such a file is always answered with 304, because whatever
+    copy the client holds is current. With `sendfile_header` set, the body
+    is left to the front proxy via X-Accel-Redirect or X-Sendfile; otherwise
+    FileResponse streams it and honours Range requests. Dot-files, such as
+    the temporary files of uploads still being written, are never served.
+    """
+
+    def __init__(self, *, directory: str, sendfile_header: Optional[str] = None, accel_prefix: str = "/internal/uploads/"):
+        super().__init__(directory=directory)
+        if sendfile_header and sendfile_header not in SENDFILE_HEADERS:
+            raise ValueError(f"Unsupported sendfile header: {sendfile_header}")
+        self.sendfile_header = sendfile_header or None
+        self.accel_prefix = accel_prefix
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if any(part.startswith(".") for part in path.split(os.sep)):
+            raise HTTPException(status_code=404)
+        return await super().get_response(path, scope)
+
+    def file_response(
+        self,
+        full_path: str,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        immutable = is_content_hashed(full_path)
+        request_headers = Headers(scope=scope)
+
+        if self.sendfile_header:
+            response = self.sendfile_response(full_path, stat_result)
+        else:
+            response = super().file_response(full_path, stat_result, scope, status_code)
+
+        if immutable:
+            response.headers["cache-control"] = IMMUTABLE_CACHE_CONTROL
+            response.headers["etag"] = content_etag(full_path)
+            if "if-none-match" in request_headers or "if-modified-since" in request_headers:
+                return NotModifiedResponse(response.headers)
+        return response
+
+    def sendfile_response(self, full_path: str, stat_result: os.stat_result) -> Response:
+        if self.sendfile_header == "X-Accel-Redirect":
+            target = self.accel_prefix.rstrip("/") + "/" + os.path.relpath(full_path, self.directory)
+        else:
+            target = os.path.abspath(full_path)
+
+        media_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+        return Response(
+            media_type=media_type,
+            headers={self.sendfile_header: target},
+        )
@@ -0,0 +1,99 @@
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import BinaryIO, Optional
+
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from app.core.response import BadRequest
+
+UPLOAD_DIR = "uploads"
+os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+CHUNK_SIZE = 64 * 1024
+MAX_FILE_SIZE = 5 * 1024 * 1024
+
+# Leading bytes of each accepted format, mapped to (content type, extension)
+FILE_SIGNATURES = {
+    b"\xff\xd8\xff": ("image/jpeg", "jpg"),
+    b"\x89PNG\r\n\x1a\n": ("image/png", "png"),
+}
+
+@dataclass(frozen=True)
+class StoredFile:
+    path: str
+    temp_path: str
+    sha256: str
+    size: int
+    content_type: str
+
+def sniff_file_type(head: bytes) -> Optional[tuple[str, str]]:
+    for signature, file_type in FILE_SIGNATURES.items():
+        if head.startswith(signature):
+            return file_type
+    return None
+
+def write_upload(source: BinaryIO) -> StoredFile:
+    """Copy an upload to a temporary file in UPLOAD_DIR in fixed-size chunks.
+
+    The type is taken from the file's magic bytes rather than the client's
+    headers and the size limit is enforced as bytes arrive. The final path is
+    derived from the content hash; the blob only appears there once
+    `publish_stored_file` is called.
+    """
+    fd, temp_path = tempfile.mkstemp(dir=UPLOAD_DIR, prefix=".upload-", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as buffer:
+            chunk = source.read(CHUNK_SIZE)
+            file_type = sniff_file_type(chunk)
+            if file_type is None:
+                raise BadRequest(message="File type not allowed. Only JPEG and PNG are allowed.").http_exception()
+
+            digest = hashlib.sha256()
+            size = 0
+            while chunk:
+                size += len(chunk)
+                if size > MAX_FILE_SIZE:
+                    raise BadRequest(message=f"File size exceeds the maximum limit of {MAX_FILE_SIZE // (1024 * 1024)} MB.").http_exception()
+
+                digest.update(chunk)
+                buffer.write(chunk)
+                chunk = source.read(CHUNK_SIZE)
+
+            buffer.flush()
+            os.fsync(buffer.fileno())
+
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+    content_type, file_ext = file_type
+    sha256 = digest.hexdigest()
+    return StoredFile(
+        path=os.path.join(UPLOAD_DIR, f"{sha256}.{file_ext}"),
+        temp_path=temp_path,
+        sha256=sha256,
+        size=size,
+        content_type=content_type,
+    )
+
+async def save_uploaded_file(file: UploadFile) -> StoredFile:
+    if file.size is not None and file.size > MAX_FILE_SIZE:
+        raise BadRequest(message=f"File size exceeds the maximum limit of {MAX_FILE_SIZE // (1024 * 1024)} MB.").http_exception()
+
+    return await run_in_threadpool(write_upload, file.file)
+
+def publish_stored_file(stored_file: StoredFile):
+    # Identical content always maps to the same path, so replacing an existing blob is harmless
+    os.replace(stored_file.temp_path, stored_file.path)
+
+def discard_stored_file(stored_file: StoredFile):
+    delete_uploaded_file(stored_file.temp_path)
+
+def delete_uploaded_file(file_path: str):
+    try:
+        os.remove(file_path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,35 @@
+"""Add indexes on users
+
+Revision ID: 4c8e2f6a9b13
+Revises: 7a2e4c9b1d56
+Create Date: 2026-10-18 22:41:53.172604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c8e2f6a9b13'
+down_revision: Union[str, None] = '7a2e4c9b1d56'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index('ix_users_role_id', 'users', ['role_id', 'id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_users_name_id', 'users', ['name', 'id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_users_deleted_id', 'users', ['id'], unique=False, postgresql_where=sa.text('deleted_at IS NOT NULL'), postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_users_username_pattern', 'users', ['username'], unique=False, postgresql_ops={'username': 'varchar_pattern_ops'}, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_users_username_pattern', table_name='users', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_users_deleted_id', table_name='users', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_users_name_id', table_name='users', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_users_role_id', table_name='users', postgresql_concurrently=True, if_exists=True)
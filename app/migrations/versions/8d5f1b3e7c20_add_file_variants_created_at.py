@@ -0,0 +1,28 @@
+"""Add file_variants created_at
+
+Revision ID: 8d5f1b3e7c20
+Revises: 4c8e2f6a9b13
+Create Date: 2026-10-18 23:52:07.415830
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d5f1b3e7c20'
+down_revision: Union[str, None] = '4c8e2f6a9b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing variants get the migration time, later than their real creation,
+    # so Last-Modified can only err towards a full response
+    op.add_column('file_variants', sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('file_variants', 'created_at')
@@ -0,0 +1,35 @@
+"""Add indexes on articles
+
+Revision ID: e8b41f7c9d02
+Revises: c27a5e90b6d1
+Create Date: 2026-10-18 16:22:07.845210
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b41f7c9d02'
+down_revision: Union[str, None] = 'c27a5e90b6d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index('ix_articles_author_id', 'articles', ['author', 'id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_articles_deleted_at', 'articles', ['deleted_at'], unique=False, postgresql_where=sa.text('deleted_at IS NOT NULL'), postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_articles_thumbnail_file_id', 'articles', ['thumbnail_file_id'], unique=False, postgresql_where=sa.text('thumbnail_file_id IS NOT NULL'), postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_articles_slug_pattern', 'articles', ['slug'], unique=False, postgresql_ops={'slug': 'varchar_pattern_ops'}, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_articles_slug_pattern', table_name='articles', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_articles_thumbnail_file_id', table_name='articles', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_articles_deleted_at', table_name='articles', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_articles_author_id', table_name='articles', postgresql_concurrently=True, if_exists=True)
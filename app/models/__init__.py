@@ -1,4 +1,6 @@
 from .user import User
 from .role import Role
 from .article import Article
-from .file import File
\ No newline at end of file
+from .file import File
+from .file_variant import FileVariant
+from .rate_limit_bucket import RateLimitBucket
@@ -1,13 +1,15 @@
 from datetime import datetime, UTC
 
 from slugify import slugify
-from sqlalchemy import Column, Text, ForeignKey, VARCHAR, DateTime
-from sqlalchemy.orm import relationship, Session
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, Computed, Text, ForeignKey, VARCHAR, DateTime, BigInteger, Index, select, func, case, cast, or_, text
+from sqlalchemy.orm import relationship, Session, deferred
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
 import uuid_utils as uuid
 
 from .base import Base
 
+SEARCH_CONFIG = "english"
+
 class Article(Base):
     __tablename__ = "articles"
 
@@ -22,22 +24,52 @@ class Article(Base):
     updated_at = Column("updated_at", DateTime(timezone=True), default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC))
     deleted_at = Column("deleted_at", DateTime(timezone=True), default=None)
 
+    # Maintained by Postgres; title matches (A) rank above body matches (B)
+    search_vector = deferred(Column(
+        "search_vector",
+        TSVECTOR,
+        Computed(
+            f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, title), 'A') || "
+            f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, content), 'B')",
+            persisted=True,
+        ),
+    ))
+
     author = relationship("User", backref="articles", foreign_keys=[author_id])
     thumbnail_file = relationship("File", backref="articles", foreign_keys=[thumbnail_file_id])
 
+    __table_args__ = (
+        # Author listings walk the author's ids newest-first, see get_articles
+        Index("ix_articles_author_id", author_id, id),
+        Index("ix_articles_deleted_at", deleted_at, postgresql_where=text("deleted_at IS NOT NULL")),
+        Index("ix_articles_thumbnail_file_id", thumbnail_file_id, postgresql_where=text("thumbnail_file_id IS NOT NULL")),
+        # The unique index cannot serve LIKE 'base-%' under a non-C collation
+        Index("ix_articles_slug_pattern", slug, postgresql_ops={"slug": "varchar_pattern_ops"}),
+        Index("ix_articles_search_vector", search_vector, postgresql_using="gin"),
+    )
+
     def generate_slug(self, db: Session):
         if not self.title or not isinstance(self.title, str):
             raise ValueError("Title must be a non-empty string.")
 
         base_slug = slugify(self.title)
-        slug = base_slug
-        counter = 1
+        suffix = func.substr(Article.slug, len(base_slug) + 2)
+
+        # One round trip: is the base slug taken, and what is the highest numeric suffix in use.
+        # slugify only emits [a-z0-9-], so the LIKE pattern needs no escaping.
+        query = select(
+            func.count(case((Article.slug == base_slug, 1))),
+            func.max(case((suffix.regexp_match("^[0-9]{1,18}$"), cast(suffix, BigInteger)))),
+        ).where(or_(Article.slug == base_slug, Article.slug.like(f"{base_slug}-%")))
+        if self.id is not None:
+            query = query.where(Article.id != self.id)
 
-        while db.query(Article).filter(Article.slug == slug).first() is not None:
-            slug = f"{base_slug}-{counter}"
-            counter += 1
+        base_taken, max_suffix = db.execute(query).one()
 
-        self.slug = slug
+        if not base_taken:
+            self.slug = base_slug
+        else:
+            self.slug = f"{base_slug}-{(max_suffix or 0) + 1}"
         return self.slug
 
     def soft_delete(self):
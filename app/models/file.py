@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, VARCHAR
+from sqlalchemy import Column, Integer, VARCHAR, CHAR, BigInteger
 
 from .base import Base
 
@@ -6,4 +6,6 @@ class File(Base):
     __tablename__ = "files"
 
     id = Column("id", Integer, primary_key=True, autoincrement=True)
-    file_path = Column("file_path", VARCHAR(255), nullable=False)
\ No newline at end of file
+    file_path = Column("file_path", VARCHAR(255), nullable=False)
+    sha256 = Column("sha256", CHAR(64), nullable=True, unique=True)
+    size = Column("size", BigInteger, nullable=True)
\ No newline at end of file
@@ -0,0 +1,24 @@
+from datetime import datetime, UTC
+
+from sqlalchemy import Column, Integer, VARCHAR, BigInteger, DateTime, ForeignKey, UniqueConstraint, func
+from sqlalchemy.orm import relationship, backref
+
+from .base import Base
+
+class FileVariant(Base):
+    __tablename__ = "file_variants"
+    __table_args__ = (UniqueConstraint("file_id", "width", "format"),)
+
+    id = Column("id", Integer, primary_key=True, autoincrement=True)
+    file_id = Column("file_id", ForeignKey("files.id", ondelete="CASCADE"), nullable=False)
+    width = Column("width", Integer, nullable=False)
+    format = Column("format", VARCHAR(10), nullable=False)
+    file_path = Column("file_path", VARCHAR(255), nullable=False)
+    size = Column("size", BigInteger, nullable=False)
+    created_at = Column("created_at", DateTime(timezone=True), nullable=False, default=lambda: datetime.now(UTC), server_default=func.now())
+
+    file = relationship(
+        "File",
+        backref=backref("variants", cascade="all, delete-orphan", passive_deletes=True, order_by="FileVariant.width"),
+        foreign_keys=[file_id],
+    )
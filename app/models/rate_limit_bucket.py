@@ -0,0 +1,12 @@
+from sqlalchemy import Column, VARCHAR, DateTime
+
+from .base import Base
+
+class RateLimitBucket(Base):
+    __tablename__ = "rate_limit_buckets"
+    # Limiter state is disposable, so skip the WAL
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
+
+    key = Column("key", VARCHAR(255), primary_key=True)
+    # Theoretical arrival time of the next attempt (GCRA); rows in the past are equivalent to absent
+    tat = Column("tat", DateTime(timezone=True), nullable=False)
@@ -1,6 +1,6 @@
 from datetime import datetime, UTC
 
-from sqlalchemy import Column, Integer, VARCHAR, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, VARCHAR, DateTime, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 
 from .base import Base
@@ -13,15 +13,29 @@ class User(Base):
     name = Column("name", VARCHAR(100), nullable=False)
     password = Column("password", VARCHAR(255), nullable=False)
     role_id = Column(Integer, ForeignKey("roles.id"), nullable=False)
+    token_version = Column("token_version", Integer, nullable=False, default=0, server_default="0")
 
     created_at = Column("created_at", DateTime(timezone=True), default=lambda: datetime.now(UTC))
-    updated_at = Column("updated_at", DateTime(timezone=True), default=lambda: datetime.now(UTC))
+    updated_at = Column("updated_at", DateTime(timezone=True), default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC))
     deleted_at = Column("deleted_at", DateTime(timezone=True), default=None)
 
     role = relationship("Role", backref="users", foreign_keys=[role_id])
 
+    # Keyset orders and filters of the admin listing, see get_users
+    __table_args__ = (
+        Index("ix_users_role_id", role_id, id),
+        Index("ix_users_name_id", name, id),
+        Index("ix_users_deleted_id", id, postgresql_where=text("deleted_at IS NOT NULL")),
+        # The unique index cannot serve LIKE 'prefix%' under a non-C collation
+        Index("ix_users_username_pattern", username, postgresql_ops={"username": "varchar_pattern_ops"}),
+    )
+
+    def revoke_tokens(self):
+        self.token_version = (self.token_version or 0) + 1
+
     def soft_delete(self):
         self.deleted_at = datetime.now(UTC)
+        self.revoke_tokens()
 
     def restore(self):
         self.deleted_at = None
@@ -1,52 +1,279 @@
-from typing import List
+from collections import defaultdict
+from datetime import datetime, UTC
+import html
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
 import os
 
-from sqlalchemy import and_
-from sqlalchemy.orm import Session, joinedload
+import uuid_utils as uuid
 
-from app.models import Article
-from app.schemas.article import DetailArticle, DetailAuthor
+from pydantic_core import to_json
+from slugify import slugify
+from sqlalchemy import VARCHAR, BigInteger, Float, Row, and_, bindparam, case, cast, column, func, insert, literal, or_, select, true
+from sqlalchemy.dialects.postgresql import ARRAY, REGCONFIG
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
+from app.core import database
+from app.core.cache import article_cache
+from app.core.database import is_unique_violation
+from app.core.ndjson import encode_ndjson
+from app.core.pagination import encode_cursor
+from app.core.response import RawJSON
+from app.models import Article, File, FileVariant, User
+from app.models.article import SEARCH_CONFIG
+from app.schemas.article import DetailArticle, DetailAuthor, ArticleView, ImportArticle
 
-def get_articles(db: Session, author_id: str) -> List[DetailArticle]:
-    articles = (
-        db.query(Article)
-        .options(joinedload(Article.thumbnail_file), joinedload(Article.author))
-        .filter_by(author_id=author_id)
-        .all()
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+EXCERPT_LENGTH = 280
+SLUG_ALLOCATION_ATTEMPTS = 5
+IMPORT_BATCH_SIZE = 1000
+EXPORT_BATCH_SIZE = 1000
+
+# ts_headline wraps matches in control characters that cannot occur in escaped text
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_STOP = "\x03"
+SEARCH_HEADLINE_OPTIONS = (
+    f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, "
+    "MaxFragments=2, MaxWords=30, MinWords=10, FragmentDelimiter=\" ... \""
+)
+
+def static_url(file_path: Optional[str]) -> Optional[str]:
+    return f"/static/{os.path.basename(file_path)}" if file_path else None
+
+def build_srcset(variants: Iterable[Tuple[str, int]]) -> Optional[str]:
+    return ", ".join(f"{static_url(file_path)} {width}w" for file_path, width in variants) or None
+
+def thumbnail_url(file: Optional[File]) -> Optional[str]:
+    return static_url(file.file_path) if file else None
+
+def thumbnail_srcset(file: Optional[File]) -> Optional[str]:
+    if not file:
+        return None
+    return build_srcset((variant.file_path, variant.width) for variant in file.variants)
+
+async def get_thumbnail_srcsets(db: AsyncSession, file_ids: Iterable[int]) -> Dict[int, str]:
+    file_ids = set(file_ids)
+    if not file_ids:
+        return {}
+
+    query = (
+        select(FileVariant.file_id, FileVariant.file_path, FileVariant.width)
+        .filter(FileVariant.file_id.in_(file_ids))
+        .order_by(FileVariant.file_id, FileVariant.width)
     )
+    variants: Dict[int, List[Tuple[str, int]]] = defaultdict(list)
+    for row in await db.execute(query):
+        variants[row.file_id].append((row.file_path, row.width))
+
+    return {file_id: build_srcset(rows) for file_id, rows in variants.items()}
+
+async def get_articles(
+    db: AsyncSession,
+    author_id: str,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[UUID] = None,
+    view: ArticleView = ArticleView.FULL,
+) -> Tuple[List[dict], Optional[str]]:
+    """Read-only listing that selects plain columns and maps rows straight to the response shape.
+
+    Skipping ORM instances avoids identity-map and relationship loading work
+    per row; `to_json` encodes the datetimes in the returned dicts directly.
+    """
+    if view == ArticleView.SUMMARY:
+        # Keep the full body out of the result set; only the excerpt leaves the database
+        body_key, body_column = "excerpt", func.left(Article.content, EXCERPT_LENGTH)
+    else:
+        body_key, body_column = "content", Article.content
+
+    query = (
+        select(
+            Article.id,
+            Article.title,
+            body_column.label("body"),
+            Article.thumbnail_file_id,
+            File.file_path.label("thumbnail_path"),
+            Article.created_at,
+            Article.updated_at,
+            Article.deleted_at,
+            User.id.label("author_id"),
+            User.name.label("author_name"),
+        )
+        .join(User, User.id == Article.author_id)
+        .outerjoin(File, File.id == Article.thumbnail_file_id)
+        .filter(Article.author_id == author_id)
+    )
+    if cursor is not None:
+        query = query.filter(Article.id < cursor)
+
+    # uuid7 ids are time-ordered, so walking the primary key backwards yields
+    # newest-first pages without an OFFSET scan. One extra row tells us
+    # whether another page exists.
+    rows = (await db.execute(query.order_by(Article.id.desc()).limit(limit + 1))).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(str(rows[-1].id))
+
+    srcsets = await get_thumbnail_srcsets(db, (row.thumbnail_file_id for row in rows if row.thumbnail_file_id))
 
     return [
-        DetailArticle(
-            id=str(article.id),
-            title=article.title,
-            content=article.content,
-            thumbnail_url=f"/static/{os.path.basename(article.thumbnail_file.file_path)}" if article.thumbnail_file else None,
-            created_at=article.created_at,
-            updated_at=article.updated_at,
-            deleted_at=article.deleted_at,
-            author=DetailAuthor(id=article.author.id, name=article.author.name)
-        ).to_dict()
-        for article in articles
-    ]
-
-def get_article_by_id_db(db: Session, article_id: str) -> Article | None:
-    article = (
-        db.query(Article)
+        {
+            "id": str(row.id),
+            "title": row.title,
+            body_key: row.body,
+            "thumbnail_url": static_url(row.thumbnail_path),
+            "thumbnail_srcset": srcsets.get(row.thumbnail_file_id),
+            "created_at": row.created_at,
+            "updated_at": row.updated_at,
+            "deleted_at": row.deleted_at,
+            "author": {"id": row.author_id, "name": row.author_name},
+        }
+        for row in rows
+    ], next_cursor
+
+async def get_article_by_id_db(db: AsyncSession, article_id: str) -> Article | None:
+    query = (
+        select(Article)
         .options(joinedload(Article.thumbnail_file), joinedload(Article.author))
         .filter(Article.id == article_id)
-        .first()
     )
 
-    return article
+    return (await db.execute(query)).scalar()
 
-def get_article_by_id(db: Session, article_id: str) -> DetailArticle | None:
-    article = (
-        db.query(Article)
-        .options(joinedload(Article.thumbnail_file), joinedload(Article.author))
+async def search_articles(
+    db: AsyncSession,
+    author_id: str,
+    q: str,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[Tuple[float, UUID]] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    """Full-text search over the author's live articles, best match first.
+
+    Pages are keyed on (rank, id), and ts_headline, the expensive part, only
+    runs for the rows of the page being returned.
+    """
+    config = cast(SEARCH_CONFIG, REGCONFIG)
+    tsquery = func.websearch_to_tsquery(config, q)
+    rank = func.ts_rank(Article.search_vector, tsquery, type_=Float)
+
+    page = (
+        select(
+            Article.id,
+            Article.title,
+            Article.content,
+            Article.thumbnail_file_id,
+            File.file_path.label("thumbnail_path"),
+            Article.created_at,
+            Article.updated_at,
+            User.id.label("author_id"),
+            User.name.label("author_name"),
+            rank.label("rank"),
+        )
+        .join(User, User.id == Article.author_id)
+        .outerjoin(File, File.id == Article.thumbnail_file_id)
+        .filter(
+            Article.author_id == author_id,
+            Article.deleted_at.is_(None),
+            Article.search_vector.bool_op("@@")(tsquery),
+        )
+    )
+    if cursor is not None:
+        cursor_rank, cursor_id = cursor
+        page = page.filter(or_(rank < cursor_rank, and_(rank == cursor_rank, Article.id < cursor_id)))
+    page = page.order_by(rank.desc(), Article.id.desc()).limit(limit + 1).subquery()
+
+    query = (
+        select(
+            page,
+            func.ts_headline(config, page.c.content, tsquery, SEARCH_HEADLINE_OPTIONS).label("snippet"),
+        )
+        .order_by(page.c.rank.desc(), page.c.id.desc())
+    )
+    rows = (await db.execute(query)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].rank, str(rows[-1].id))
+
+    srcsets = await get_thumbnail_srcsets(db, (row.thumbnail_file_id for row in rows if row.thumbnail_file_id))
+
+    return [
+        {
+            "id": str(row.id),
+            "title": row.title,
+            "snippet": highlight_snippet(row.snippet),
+            "rank": row.rank,
+            "thumbnail_url": static_url(row.thumbnail_path),
+            "thumbnail_srcset": srcsets.get(row.thumbnail_file_id),
+            "created_at": row.created_at,
+            "updated_at": row.updated_at,
+            "author": {"id": row.author_id, "name": row.author_name},
+        }
+        for row in rows
+    ], next_cursor
+
+def highlight_snippet(snippet: str) -> str:
+    # Escape the article text first, then turn the match markers into <mark> tags
+    return html.escape(snippet).replace(HIGHLIGHT_START, "<mark>").replace(HIGHLIGHT_STOP, "</mark>")
+
+def build_article_version_query():
+    variants = (
+        select(
+            func.count().label("variant_count"),
+            func.max(FileVariant.created_at).label("variants_created_at"),
+        )
+        .filter(FileVariant.file_id == Article.thumbnail_file_id)
+        .lateral()
+    )
+    return (
+        select(
+            Article.id,
+            Article.updated_at,
+            Article.thumbnail_file_id,
+            variants.c.variant_count,
+            variants.c.variants_created_at,
+            User.name.label("author_name"),
+            User.updated_at.label("author_updated_at"),
+        )
+        .join(User, User.id == Article.author_id)
+        .join(variants, true())
+        .filter(and_(Article.deleted_at.is_(None), Article.id == bindparam("article_id")))
+    )
+
+# Built once: on every article GET, constructing this statement took longer than running it
+ARTICLE_VERSION_QUERY = build_article_version_query()
+
+async def get_article_version(db: AsyncSession, article_id: str) -> Optional[Row]:
+    """Values that identify the current representation of an article, without loading its body.
+
+    Besides updated_at this covers what changes the response without touching
+    the article row: generated thumbnail variants and the author's name.
+    """
+    return (await db.execute(ARTICLE_VERSION_QUERY, {"article_id": article_id})).first()
+
+def article_last_modified(version: Row) -> datetime:
+    """Latest change to anything get_article_version covers, for Last-Modified."""
+    return max(
+        moment
+        for moment in (version.updated_at, version.variants_created_at, version.author_updated_at)
+        if moment is not None
+    )
+
+async def get_article_by_id(db: AsyncSession, article_id: str) -> DetailArticle | None:
+    query = (
+        select(Article)
+        .options(
+            joinedload(Article.thumbnail_file).selectinload(File.variants),
+            joinedload(Article.author),
+        )
         .filter(and_(Article.deleted_at.is_(None), Article.id == article_id))
-        .first()
     )
+    article = (await db.execute(query)).scalar()
 
     if not article:
         return None
@@ -55,33 +282,176 @@ def get_article_by_id(db: Session, article_id: str) -> DetailArticle | None:
         id=str(article.id),
         title=article.title,
         content=article.content,
-        thumbnail_url=f"/static/{os.path.basename(article.thumbnail_file.file_path)}" if article.thumbnail_file else None,
+        thumbnail_url=thumbnail_url(article.thumbnail_file),
+        thumbnail_srcset=thumbnail_srcset(article.thumbnail_file),
         created_at=article.created_at,
         updated_at=article.updated_at,
         deleted_at=article.deleted_at,
         author=DetailAuthor(id=article.author.id, name=article.author.name)
-    ).to_dict()
+    )
+
+async def get_cached_article(db: AsyncSession, article_id: UUID, etag: str) -> RawJSON | None:
+    """get_article_by_id through article_cache, as encoded JSON.
+
+    Entries are the ETag they were built for, a newline and the payload, so
+    a payload made stale by a change that bypasses invalidation (new
+    thumbnail variants, an author rename, another worker's write) is rebuilt
+    instead of served. Hits are returned without decoding.
+    """
+    key = str(article_id)
+    cached = article_cache.get(key)
+    if cached is not None:
+        cached_etag, _, payload = cached.partition(b"\n")
+        if cached_etag == etag.encode():
+            return RawJSON(payload)
+
+    article = await get_article_by_id(db, key)
+    if not article:
+        return None
 
-def create_article(db: Session, new_article: Article) -> Article:
-    db.add(new_article)
-    db.commit()
-    db.refresh(new_article)
+    payload = to_json(article)
+    article_cache.set(key, etag.encode() + b"\n" + payload)
+    return RawJSON(payload)
+
+def invalidate_article(article_id: UUID):
+    article_cache.delete(str(article_id))
+
+async def assign_slug(db: AsyncSession, article: Article):
+    # The allocator does not lock, so a concurrent writer can claim the same slug
+    # first; the unique constraint catches that and we allocate again.
+    for attempt in range(1, SLUG_ALLOCATION_ATTEMPTS + 1):
+        try:
+            async with db.begin_nested():
+                await db.run_sync(article.generate_slug)
+                db.add(article)
+            return
+        except IntegrityError as error:
+            if attempt == SLUG_ALLOCATION_ATTEMPTS or not is_unique_violation(error, "articles_slug_key"):
+                raise
+
+async def create_article(db: AsyncSession, new_article: Article) -> Article:
+    await assign_slug(db, new_article)
+    await db.commit()
+    await db.refresh(new_article)
     return new_article
 
-def update_article(db: Session, article: Article):
-    db.commit()
-    db.refresh(article)
+async def update_article(db: AsyncSession, article: Article):
+    await db.commit()
+    invalidate_article(article.id)
+    await db.refresh(article)
 
-def soft_delete_article(db: Session, article: Article):
+async def soft_delete_article(db: AsyncSession, article: Article):
     article.soft_delete()
-    db.commit()
-    db.refresh(article)
+    await db.commit()
+    invalidate_article(article.id)
+    await db.refresh(article)
 
-def restore_article(db: Session, article: Article):
+async def restore_article(db: AsyncSession, article: Article):
     article.restore()
-    db.commit()
-    db.refresh(article)
+    await db.commit()
+    invalidate_article(article.id)
+    await db.refresh(article)
+
+async def delete_article(db: AsyncSession, article: Article):
+    await db.delete(article)
+    await db.commit()
+    invalidate_article(article.id)
+
+async def allocate_slugs(db: AsyncSession, titles: List[str]) -> List[str]:
+    """Slugs for a batch of new articles, following the rules of Article.generate_slug.
+
+    A single query reports, per distinct base slug, whether it is taken and its
+    highest numeric suffix; collisions inside the batch are resolved in memory.
+    """
+    bases = [slugify(title) for title in titles]
+    candidates = (
+        func.unnest(literal(sorted(set(bases)), ARRAY(VARCHAR)))
+        .table_valued(column("base", VARCHAR))
+        .render_derived(name="candidates")
+    )
+    base = candidates.c.base
+    suffix = func.substr(Article.slug, func.length(base) + 2)
+    usage = (
+        select(
+            func.count(case((Article.slug == base, 1))).label("taken"),
+            func.max(case((suffix.regexp_match("^[0-9]{1,18}$"), cast(suffix, BigInteger)))).label("max_suffix"),
+        )
+        .where(or_(
+            Article.slug == base,
+            # Byte-wise equivalent of LIKE base || '-%' that ix_articles_slug_pattern can serve
+            and_(Article.slug.op("~>=~", is_comparison=True)((base + "-").self_group()), Article.slug.op("~<~", is_comparison=True)((base + ".").self_group())),
+        ))
+        .lateral("usage")
+    )
+    query = select(base, usage.c.taken, usage.c.max_suffix).select_from(candidates).join(usage, true())
+    state = {row.base: [row.taken > 0, row.max_suffix or 0] for row in await db.execute(query)}
+
+    slugs = []
+    used = set()
+    for base_slug in bases:
+        entry = state[base_slug]
+        slug = base_slug if not entry[0] else None
+        entry[0] = True
+        # A title like "Post 2" may already have claimed "post-2" within the batch
+        while slug is None or slug in used:
+            entry[1] += 1
+            slug = f"{base_slug}-{entry[1]}"
+        used.add(slug)
+        slugs.append(slug)
+    return slugs
+
+async def import_articles(db: AsyncSession, articles: List[ImportArticle], default_author_id: int) -> int:
+    """Insert a batch of articles with one executemany, without committing.
+
+    Ids are uuid7 values taken from created_at so imported history keeps its
+    place in id-ordered listings. Like assign_slug, the batch is retried if a
+    concurrent writer claims one of its slugs first.
+    """
+    now = datetime.now(UTC)
+    rows = []
+    for article in articles:
+        created_at = article.created_at or now
+        rows.append({
+            "id": str(uuid.uuid7(timestamp=int(created_at.timestamp()), nanos=created_at.microsecond * 1000)),
+            "title": article.title,
+            "content": article.content,
+            "author_id": article.author_id or default_author_id,
+            "created_at": created_at,
+            "updated_at": article.updated_at or created_at,
+            "deleted_at": article.deleted_at,
+        })
 
-def delete_article(db: Session, article: Article):
-    db.delete(article)
-    db.commit()
\ No newline at end of file
+    for attempt in range(1, SLUG_ALLOCATION_ATTEMPTS + 1):
+        slugs = await allocate_slugs(db, [row["title"] for row in rows])
+        try:
+            async with db.begin_nested():
+                await db.execute(insert(Article), [{**row, "slug": slug} for row, slug in zip(rows, slugs)])
+            return len(rows)
+        except IntegrityError as error:
+            if attempt == SLUG_ALLOCATION_ATTEMPTS or not is_unique_violation(error, "articles_slug_key"):
+                raise
+
+async def export_articles() -> AsyncIterator[bytes]:
+    """Every article as NDJSON, read through a server-side cursor in EXPORT_BATCH_SIZE rows.
+
+    Opens its own session because the response body is produced after the
+    request's dependencies have been torn down.
+    """
+    query = (
+        select(
+            Article.id,
+            Article.title,
+            Article.slug,
+            Article.content,
+            Article.author_id,
+            Article.created_at,
+            Article.updated_at,
+            Article.deleted_at,
+        )
+        .order_by(Article.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    async with database.AsyncSession() as db:
+        result = await db.stream(query)
+        async for rows in result.mappings().partitions():
+            yield encode_ndjson(dict(row) for row in rows)
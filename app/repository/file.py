@@ -1,18 +1,83 @@
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from typing import Optional
 
-from app.models import File
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-def get_file_by_id(db: Session, file_id: int) -> File:
+from app.core.database import is_unique_violation
+from app.core.storage import StoredFile, publish_stored_file, delete_uploaded_file
+from app.models import File, FileVariant, Article
+
+async def get_file_by_id(db: AsyncSession, file_id: int) -> File:
     query = select(File).filter_by(id=file_id)
-    return db.execute(query).scalar()
+    return (await db.execute(query)).scalar()
+
+async def get_file_variant_count(db: AsyncSession, file_id: int) -> int:
+    query = select(func.count()).select_from(FileVariant).filter_by(file_id=file_id)
+    return (await db.execute(query)).scalar()
+
+async def get_file_by_sha256(db: AsyncSession, sha256: str, for_update: bool = False) -> Optional[File]:
+    query = select(File).filter_by(sha256=sha256)
+    if for_update:
+        query = query.with_for_update()
+    return (await db.execute(query)).scalar()
+
+async def acquire_file(db: AsyncSession, stored_file: StoredFile) -> File:
+    """Return the files row for the upload's content, inserting it if the content is new.
+
+    The row stays locked until the caller commits, which keeps a concurrent
+    `release_file` from removing the blob while a new reference is being added.
+    The blob is published only after the lock is held, so it is on disk even
+    if a release of the same content committed just before.
+    """
+    file = await get_file_by_sha256(db, stored_file.sha256, for_update=True)
+    if file is None:
+        try:
+            async with db.begin_nested():
+                file = File(file_path=stored_file.path, sha256=stored_file.sha256, size=stored_file.size)
+                db.add(file)
+        except IntegrityError as error:
+            # Another request inserted the same content first
+            if not is_unique_violation(error, "files_sha256_key"):
+                raise
+            file = await get_file_by_sha256(db, stored_file.sha256, for_update=True)
+
+    publish_stored_file(stored_file)
+    return file
+
+async def release_file(db: AsyncSession, file: File):
+    """Drop a reference to `file`, deleting the row and blob once no article uses it."""
+    await db.execute(select(File.id).filter_by(id=file.id).with_for_update())
+
+    variant_paths = (await db.execute(select(FileVariant.file_path).filter_by(file_id=file.id))).scalars().all()
+    references = await db.execute(
+        select(func.count()).select_from(Article).filter(Article.thumbnail_file_id == file.id)
+    )
+    if references.scalar() > 0:
+        await db.commit()
+        return
+
+    await db.delete(file)
+    await db.flush()
+    # Removed while the row lock is held so an acquire_file waiting on it republishes afterwards
+    delete_uploaded_file(file.file_path)
+    for variant_path in variant_paths:
+        delete_uploaded_file(variant_path)
+    await db.commit()
 
-def create_file(db: Session, new_file: File) -> File:
-    db.add(new_file)
-    db.commit()
-    db.refresh(new_file)
-    return new_file
+async def add_file_variants(db: AsyncSession, file_id: int, variants: list[dict]) -> bool:
+    """Record generated variants, returning False if the file was released in the meantime."""
+    locked = await db.execute(select(File.id).filter_by(id=file_id).with_for_update())
+    if locked.scalar() is None:
+        await db.rollback()
+        return False
 
-def delete_file(db: Session, file: File):
-    db.delete(file)
-    db.commit()
\ No newline at end of file
+    if variants:
+        await db.execute(
+            insert(FileVariant)
+            .values([{"file_id": file_id, **variant} for variant in variants])
+            .on_conflict_do_nothing()
+        )
+    await db.commit()
+    return True
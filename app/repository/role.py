@@ -1,28 +1,52 @@
 from typing import Sequence
 
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import select, func, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import Role
+from app.core.cache import user_cache, token_version_cache
+from app.core.config import settings
+from app.core.roles import role_registry
+from app.models import Role, User
+from app.schemas.role import DetailRole
 
 
-def get_roles(db: Session) -> Sequence[Role]:
-    query = select(Role)
-    return db.execute(query).scalars().all()
+async def get_roles(db: AsyncSession) -> Sequence[DetailRole]:
+    return await role_registry.roles(db)
 
-def get_role_by_id(db: Session, role_id: int) -> Role:
+async def get_role_by_id(db: AsyncSession, role_id: int) -> Role:
     query = select(Role).filter_by(id=role_id)
-    return db.execute(query).scalar()
+    return (await db.execute(query)).scalar()
 
-def create_role(db: Session, new_role: Role):
-    db.add(new_role)
-    db.commit()
-    db.refresh(new_role)
+async def get_detail_role(db: AsyncSession, role_id: int) -> DetailRole:
+    return await role_registry.get(db, role_id)
 
-def update_role(db: Session, role: Role):
-    db.commit()
-    db.refresh(role)
+async def role_exists(db: AsyncSession, role_id: int) -> bool:
+    return await role_registry.get(db, role_id) is not None
 
-def is_role_exists(db: Session, role_name: str) -> bool:
-    return db.query(Role).filter_by(name=role_name).count() > 0
+async def create_role(db: AsyncSession, new_role: Role):
+    db.add(new_role)
+    await role_registry.notify(db)
+    await db.commit()
+    await db.refresh(new_role)
+    await role_registry.load(db)
+
+async def update_role(db: AsyncSession, role: Role, renamed: bool = False):
+    if renamed and settings.JWT_STATELESS_AUTH:
+        # Stateless access tokens carry the role name, so members must re-authenticate
+        await db.execute(
+            update(User)
+            .where(User.role_id == role.id)
+            .values(token_version=User.token_version + 1)
+        )
+    await role_registry.notify(db)
+    await db.commit()
+    # Cached users embed their role, drop them all rather than track membership
+    user_cache.clear()
+    token_version_cache.clear()
+    await db.refresh(role)
+    await role_registry.load(db)
+
+async def is_role_exists(db: AsyncSession, role_name: str) -> bool:
+    query = select(func.count()).select_from(Role).filter_by(name=role_name)
+    return (await db.execute(query)).scalar() > 0
 
@@ -1,45 +1,172 @@
-from typing import Optional, Sequence
+from typing import Iterable, List, Optional, Set, Tuple
 
-from sqlalchemy import select, and_
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import select, and_, update, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
-from app.models import User
+from app.core.cache import user_cache, token_version_cache
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models import User, Role
+from app.schemas.user import UserSort, UserStatus
 
-def get_user_by_id(
-    db: Session,
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Keyset columns per sort field with the type their cursor values decode to;
+# the key always ends in a unique column so every row has a distinct position
+SORT_KEYS = {
+    "id": ((User.id, int),),
+    "username": ((User.username, str),),
+    "name": ((User.name, str), (User.id, int)),
+}
+
+async def get_user_by_id(
+    db: AsyncSession,
     user_id: int,
 ) -> User:
-    q = select(User).filter_by(id=user_id)
-    return db.execute(q).scalar()
+    q = select(User).options(joinedload(User.role)).filter_by(id=user_id)
+    return (await db.execute(q)).scalar()
+
+async def get_user_by_username(db: AsyncSession, username: str) -> Optional[User]:
+    query = (
+        select(User)
+        .options(joinedload(User.role))
+        .filter(and_(User.username == username, User.deleted_at.is_(None)))
+    )
+    return (await db.execute(query)).scalar()
+
+async def get_user_token_version(db: AsyncSession, user_id: int) -> Optional[int]:
+    query = select(User.token_version).filter(and_(User.id == user_id, User.deleted_at.is_(None)))
+    return (await db.execute(query)).scalar()
+
+async def get_existing_user_ids(db: AsyncSession, user_ids: Iterable[int]) -> Set[int]:
+    query = select(User.id).filter(User.id.in_(set(user_ids)))
+    return set((await db.execute(query)).scalars().all())
+
+def sort_key(sort: UserSort) -> tuple:
+    return SORT_KEYS[sort.value.lstrip("-")]
+
+def decode_user_cursor(cursor: str, sort: UserSort) -> tuple:
+    """The position a get_users cursor points at; raises ValueError unless it fits the sort."""
+    key = sort_key(sort)
+    values = decode_cursor(cursor, len(key))
+    if any(type(value) is not value_type for value, (_, value_type) in zip(values, key)):
+        raise ValueError("Invalid cursor")
+    return tuple(values)
 
-def get_user_by_username(db: Session, username: str) -> Optional[User]:
-    query = select(User).filter(and_(User.username == username, User.deleted_at.is_(None)))
-    return db.execute(query).scalar()
+async def get_users(
+    db: AsyncSession,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[tuple] = None,
+    sort: UserSort = UserSort.ID,
+    role_id: Optional[int] = None,
+    status: UserStatus = UserStatus.ALL,
+    username_prefix: Optional[str] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    """Read-only keyset page mapped from plain columns to the DetailUser shape.
 
-def get_users(db: Session) -> Sequence[User]:
-    query = select(User).options(selectinload(User.role))
-    return db.execute(query).scalars().all()
+    Each sort walks an index in key order (see the User model), so a page
+    costs the same wherever it is in the listing.
+    """
+    columns = [column for column, _ in sort_key(sort)]
+    descending = sort.value.startswith("-")
 
-def create_user(db: Session, new_user: User) -> User:
+    query = (
+        select(
+            User.id,
+            User.name,
+            User.username,
+            User.created_at,
+            User.updated_at,
+            User.deleted_at,
+            Role.id.label("role_id"),
+            Role.name.label("role_name"),
+        )
+        .join(Role, Role.id == User.role_id)
+    )
+    if role_id is not None:
+        query = query.filter(User.role_id == role_id)
+    if status == UserStatus.ACTIVE:
+        query = query.filter(User.deleted_at.is_(None))
+    elif status == UserStatus.DELETED:
+        query = query.filter(User.deleted_at.is_not(None))
+    if username_prefix:
+        query = query.filter(User.username.startswith(username_prefix, autoescape=True))
+    if cursor is not None:
+        position = tuple_(*columns)
+        query = query.filter(position < tuple_(*cursor) if descending else position > tuple_(*cursor))
+
+    order = [column.desc() if descending else column for column in columns]
+    rows = (await db.execute(query.order_by(*order).limit(limit + 1))).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(*(getattr(rows[-1], column.key) for column in columns))
+
+    return [
+        {
+            "id": row.id,
+            "name": row.name,
+            "username": row.username,
+            "created_at": row.created_at,
+            "updated_at": row.updated_at,
+            "deleted_at": row.deleted_at,
+            "role": {"id": row.role_id, "name": row.role_name},
+        }
+        for row in rows
+    ], next_cursor
+
+async def get_approximate_user_count(db: AsyncSession) -> Optional[int]:
+    """Size of the users table as the planner estimates it, without counting rows.
+
+    Scales the reltuples density from the last VACUUM/ANALYZE by the table's
+    current size, like the planner does; None until the table was analyzed.
+    """
+    query = text(
+        "SELECT CASE WHEN relpages > 0"
+        " THEN reltuples / relpages * (pg_relation_size(oid) / current_setting('block_size')::int)"
+        " ELSE reltuples END"
+        " FROM pg_class WHERE oid = CAST(:table AS regclass) AND reltuples >= 0"
+    )
+    estimate = (await db.execute(query, {"table": User.__tablename__})).scalar()
+    return None if estimate is None else round(estimate)
+
+async def create_user(db: AsyncSession, new_user: User) -> User:
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     return new_user
 
-def update_user(db: Session, user: User):
-    db.commit()
-    db.refresh(user)
+async def update_user(db: AsyncSession, user: User):
+    await db.commit()
+    user_cache.delete(user.id)
+    token_version_cache.delete(user.id)
+    await db.refresh(user)
+
+async def update_password_hash(db: AsyncSession, user_id: int, old_hash: str, new_hash: str):
+    """Swap in a rehashed password unless the password was changed in the meantime."""
+    await db.execute(
+        update(User).where(User.id == user_id, User.password == old_hash).values(password=new_hash)
+    )
+    await db.commit()
 
-def soft_delete_user(db: Session, user: User):
+async def soft_delete_user(db: AsyncSession, user: User):
     user.soft_delete()
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    user_cache.delete(user.id)
+    token_version_cache.delete(user.id)
+    await db.refresh(user)
 
-def restore_user(db: Session, user: User):
+async def restore_user(db: AsyncSession, user: User):
     user.restore()
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    user_cache.delete(user.id)
+    token_version_cache.delete(user.id)
+    await db.refresh(user)
 
-def delete_user(db: Session, user: User):
-    db.delete(user)
-    db.commit()
\ No newline at end of file
+async def delete_user(db: AsyncSession, user: User):
+    await db.delete(user)
+    await db.commit()
+    user_cache.delete(user.id)
+    token_version_cache.delete(user.id)
@@ -3,9 +3,11 @@ from .auth import router as AuthRouter
 from .user import router as UserRouter
 from .content import router as ContentRouter
 from .role import router as RoleRouter
+from .system import router as SystemRouter
 
 routers = APIRouter()
 routers.include_router(AuthRouter)
 routers.include_router(UserRouter)
 routers.include_router(ContentRouter)
-routers.include_router(RoleRouter)
\ No newline at end of file
+routers.include_router(RoleRouter)
+routers.include_router(SystemRouter)
\ No newline at end of file
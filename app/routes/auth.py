@@ -1,26 +1,35 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.hashing import password_hasher
+from app.core.rate_limit import check_login_attempt, reset_login_attempts
 from app.core.response import InternalServerError, BadRequest, Ok, Unauthorized
-from app.core.security import verify_password, create_token, get_user_from_token
-from app.repository.user import get_user_by_username
+from app.core.security import create_token, get_user_from_token
+from app.repository.user import get_user_by_username, update_password_hash
 from app.schemas.auth import LoginRequest, LoginResponse, RefreshTokenResponse
 
 router = APIRouter(tags=["auth"])
 
 @router.post("/login", response_model=LoginResponse)
-def login(req: LoginRequest, db: Session = Depends(get_db)):
+async def login(req: LoginRequest, request: Request, db: AsyncSession = Depends(get_async_db)):
     try:
-        user = get_user_by_username(db=db, username=req.username)
+        await check_login_attempt(req.username, request.client.host if request.client else None)
+
+        user = await get_user_by_username(db=db, username=req.username)
 
         if not user:
+            await password_hasher.dummy_verify()
             raise BadRequest(message="Invalid credentials").http_exception()
 
-        if not verify_password(req.password, user.password):
+        valid, new_hash = await password_hasher.verify(req.password, user.password)
+        if not valid:
             raise BadRequest(message="Invalid credentials").http_exception()
+        if new_hash:
+            await update_password_hash(db, user.id, user.password, new_hash)
+        await reset_login_attempts(user.username)
 
         access_token = create_token(user=user)
         refresh_token = create_token(user=user, is_refresh=True)
@@ -44,15 +53,22 @@ def login(req: LoginRequest, db: Session = Depends(get_db)):
 
 
 @router.post("/token")
-def token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def token(request: Request, form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
     try:
-        user = get_user_by_username(db=db, username=form_data.username)
+        await check_login_attempt(form_data.username, request.client.host if request.client else None)
+
+        user = await get_user_by_username(db=db, username=form_data.username)
 
         if not user:
+            await password_hasher.dummy_verify()
             raise BadRequest(message="Invalid credentials").http_exception()
 
-        if not verify_password(form_data.password, user.password):
+        valid, new_hash = await password_hasher.verify(form_data.password, user.password)
+        if not valid:
             raise BadRequest(message="Invalid credentials").http_exception()
+        if new_hash:
+            await update_password_hash(db, user.id, user.password, new_hash)
+        await reset_login_attempts(user.username)
 
         access_token = create_token(user=user)
 
@@ -65,13 +81,13 @@ def token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
         return InternalServerError(error="Internal Server Error").http_exception()
 
 @router.post("/refresh", response_model=RefreshTokenResponse)
-def refresh(request: Request, db: Session = Depends(get_db)):
+async def refresh(request: Request, db: AsyncSession = Depends(get_async_db)):
     try:
         refresh_token = request.cookies.get("refresh_token")
         if not refresh_token:
             raise Unauthorized(message="Refresh token missing.").http_exception()
 
-        user = get_user_from_token(db, refresh_token, is_refresh=True)
+        user = await get_user_from_token(db, refresh_token, is_refresh=True)
 
         access_token = create_token(user=user)
         refresh_token = create_token(user=user, is_refresh=True)
@@ -95,7 +111,7 @@ def refresh(request: Request, db: Session = Depends(get_db)):
 
 
 @router.post("/logout")
-def logout(request: Request):
+async def logout(request: Request):
     response = Ok(message="Logout successful").json()
     response.delete_cookie(key="refresh_token")
 
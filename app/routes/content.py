@@ -1,77 +1,186 @@
-from datetime import datetime
 from typing import Optional
-
-from fastapi import APIRouter, Depends, Form, File, UploadFile, HTTPException
-import os
-
-from sqlalchemy.orm import Session
-
-from app.core.database import get_db
+from uuid import UUID
+
+from fastapi import APIRouter, BackgroundTasks, Depends, Form, File, UploadFile, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from slugify import slugify
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_async_db
+from app.core.http_cache import make_etag, validator_headers, is_not_modified, not_modified
+from app.core.images import process_thumbnail
+from app.core.ndjson import MEDIA_TYPE as NDJSON_MEDIA_TYPE, NDJSONError, iter_ndjson
+from app.core.pagination import decode_cursor
 from app.core.response import InternalServerError, Ok, NotFound, BadRequest
-from app.core.security import get_current_user
+from app.core.security import get_current_user, check_user_admin
+from app.core.storage import save_uploaded_file, discard_stored_file
 from app.models import Article, File as FileModel
-from app.schemas.article import ListArticleResponse, DetailArticleResponse, CreateArticleResponse
+from app.schemas.article import ListArticleResponse, DetailArticleResponse, CreateArticleResponse, ArticleView, \
+    SearchArticleResponse, ImportArticle, ImportArticleResponse
+from app.schemas.auth import CurrentUser
 from app.schemas.base import BaseResponse
-from app.schemas.user import User
 import app.repository.file as file_repo
 import app.repository.article as article_repo
+import app.repository.user as user_repo
 
 router = APIRouter(prefix="/content", tags=["content"])
 
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+@router.get("/", dependencies=[Depends(get_current_user)], response_model=ListArticleResponse)
+async def get_content(
+    limit: int = Query(article_repo.DEFAULT_PAGE_SIZE, ge=1, le=article_repo.MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    view: ArticleView = Query(ArticleView.FULL),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    try:
+        position = None
+        if cursor:
+            try:
+                article_id, = decode_cursor(cursor, 1)
+                position = UUID(article_id)
+            except (ValueError, TypeError, AttributeError):
+                return BadRequest(message="Invalid cursor").http_exception()
 
-ALLOWED_FILE_TYPES = {"image/jpeg", "image/png"}
-MAX_FILE_SIZE = 5 * 1024 * 1024
+        articles, next_cursor = await article_repo.get_articles(
+            db, current_user.id, limit=limit, cursor=position, view=view
+        )
 
-def save_uploaded_file(file: UploadFile) -> str:
-    if file.content_type not in ALLOWED_FILE_TYPES:
-        raise BadRequest(message="File type not allowed. Only JPEG and PNG are allowed.").http_exception()
+        return Ok(
+            data={"items": articles, "next_cursor": next_cursor},
+            message="Articles retrieved successfully"
+        ).json()
+    except HTTPException as error:
+        raise error
+    except Exception:
+        import traceback
+        traceback.print_exc()
+        return InternalServerError(error="Internal Server Error").http_exception()
 
-    if file.size > MAX_FILE_SIZE:
-        raise BadRequest(message=f"File size exceeds the maximum limit of {MAX_FILE_SIZE // (1024 * 1024)} MB.").http_exception()
+@router.get("/search", dependencies=[Depends(get_current_user)], response_model=SearchArticleResponse)
+async def search_content(
+    q: str = Query(min_length=1, max_length=200),
+    limit: int = Query(article_repo.DEFAULT_PAGE_SIZE, ge=1, le=article_repo.MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    try:
+        position = None
+        if cursor:
+            try:
+                rank, article_id = decode_cursor(cursor, 2)
+                position = (float(rank), UUID(article_id))
+            except (ValueError, TypeError, AttributeError):
+                return BadRequest(message="Invalid cursor").http_exception()
 
-    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-    file_ext = file.filename.split(".")[-1]
-    filename = f"{timestamp}.{file_ext}"
-    file_path = os.path.join(UPLOAD_DIR, filename)
+        articles, next_cursor = await article_repo.search_articles(
+            db, current_user.id, q, limit=limit, cursor=position
+        )
 
-    with open(file_path, "wb") as buffer:
-        buffer.write(file.file.read())
+        return Ok(
+            data={"items": articles, "next_cursor": next_cursor},
+            message="Articles retrieved successfully"
+        ).json()
+    except HTTPException as error:
+        raise error
+    except Exception:
+        import traceback
+        traceback.print_exc()
+        return InternalServerError(error="Internal Server Error").http_exception()
 
-    return file_path
+@router.get("/export", dependencies=[Depends(get_current_user)], response_class=StreamingResponse)
+async def export_content(
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    try:
+        check_user_admin(current_user)
 
-def delete_uploaded_file(file_path: str):
-    os.remove(file_path)
+        return StreamingResponse(
+            article_repo.export_articles(),
+            media_type=NDJSON_MEDIA_TYPE,
+            headers={"Content-Disposition": 'attachment; filename="articles.ndjson"'}
+        )
+    except HTTPException as error:
+        raise error
+    except Exception:
+        import traceback
+        traceback.print_exc()
+        return InternalServerError(error="Internal Server Error").http_exception()
 
-@router.get("/", dependencies=[Depends(get_current_user)], response_model=ListArticleResponse)
-def get_content(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+@router.post("/import", dependencies=[Depends(get_current_user)], response_model=ImportArticleResponse)
+async def import_content(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     try:
-        articles = article_repo.get_articles(db, current_user.id)
-
-        return Ok(data=articles, message="Articles retrieved successfully").json()
+        check_user_admin(current_user)
+
+        # One ImportArticle per NDJSON line, committed all or nothing
+        imported = 0
+        batch: list[tuple[int, ImportArticle]] = []
+
+        async def flush():
+            author_ids = {article.author_id for _, article in batch if article.author_id is not None}
+            missing = author_ids - await user_repo.get_existing_user_ids(db, author_ids)
+            for line_number, article in batch:
+                if article.author_id in missing:
+                    raise NDJSONError(line_number, f"author {article.author_id} does not exist")
+
+            return await article_repo.import_articles(db, [article for _, article in batch], current_user.id)
+
+        try:
+            async for line_number, value in iter_ndjson(request.stream()):
+                try:
+                    batch.append((line_number, ImportArticle.model_validate(value)))
+                except ValidationError as error:
+                    raise NDJSONError(line_number, error.errors()[0]["msg"])
+
+                if len(batch) >= article_repo.IMPORT_BATCH_SIZE:
+                    imported += await flush()
+                    batch = []
+            if batch:
+                imported += await flush()
+        except NDJSONError as error:
+            await db.rollback()
+            return BadRequest(message=str(error)).http_exception()
+
+        await db.commit()
+        return Ok(data={"imported": imported}, message="Articles imported successfully").json()
     except HTTPException as error:
+        await db.rollback()
         raise error
     except Exception:
+        await db.rollback()
         import traceback
         traceback.print_exc()
         return InternalServerError(error="Internal Server Error").http_exception()
 
 @router.get("/{content_id}", dependencies=[Depends(get_current_user)], response_model=DetailArticleResponse)
-def get_content_by_id(
+async def get_content_by_id(
     content_id: str,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
 ):
     try:
-        article = article_repo.get_article_by_id(db, content_id)
+        version = await article_repo.get_article_version(db, content_id)
+
+        if not version:
+            return NotFound(message="Article not found").http_exception()
+
+        last_modified = article_repo.article_last_modified(version)
+        headers = validator_headers(make_etag(*version), last_modified)
+        if is_not_modified(request, headers["ETag"], last_modified):
+            return not_modified(headers)
+
+        article = await article_repo.get_cached_article(db, version.id, headers["ETag"])
 
         if not article:
             return NotFound(message="Article not found").http_exception()
 
-        return Ok(data=article, message="Article retrieved successfully").json()
+        return Ok(data=article, message="Article retrieved successfully", headers=headers).json()
     except HTTPException as error:
         raise error
     except Exception:
@@ -80,32 +189,31 @@ def get_content_by_id(
         return InternalServerError(error="Internal Server Error").http_exception()
 
 @router.post("/", dependencies=[Depends(get_current_user)], response_model=CreateArticleResponse)
-def create_content(
+async def create_content(
+    background_tasks: BackgroundTasks,
     title: str = Form(min_length=1, max_length=255),
     content: str = Form(min_length=1),
     thumbnail: Optional[UploadFile] = File(None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     thumbnail_file = None
-    file_path = None
+    stored_file = None
     try:
         if thumbnail:
             try:
-                file_path = save_uploaded_file(thumbnail)
-
-                new_file = FileModel(file_path=file_path)
-                thumbnail_file = file_repo.create_file(db, new_file)
+                stored_file = await save_uploaded_file(thumbnail)
+                thumbnail_file = await file_repo.acquire_file(db, stored_file)
             except HTTPException as error:
-                db.rollback()
-                if file_path:
-                    delete_uploaded_file(file_path)
+                await db.rollback()
+                if stored_file:
+                    discard_stored_file(stored_file)
 
                 raise error
             except Exception:
-                db.rollback()
-                if file_path:
-                    delete_uploaded_file(file_path)
+                await db.rollback()
+                if stored_file:
+                    discard_stored_file(stored_file)
 
                 import traceback
                 traceback.print_exc()
@@ -117,38 +225,42 @@ def create_content(
             thumbnail_file_id=thumbnail_file.id if thumbnail_file else None,
             author_id=current_user.id
         )
-        new_article.slug = new_article.generate_slug(db)
-        article = article_repo.create_article(db, new_article)
+        article = await article_repo.create_article(db, new_article)
+
+        await db.commit()
+        if thumbnail_file:
+            background_tasks.add_task(process_thumbnail, thumbnail_file.id)
 
-        db.commit()
         return Ok(data={"id": str(article.id)}, message="Article created successfully").json()
     except HTTPException as error:
-        db.rollback()
-        if file_path:
-            delete_uploaded_file(file_path)
+        await db.rollback()
+        if stored_file:
+            discard_stored_file(stored_file)
 
         raise error
     except Exception:
-        db.rollback()
-        if file_path:
-            delete_uploaded_file(file_path)
+        await db.rollback()
+        if stored_file:
+            discard_stored_file(stored_file)
 
         import traceback
         traceback.print_exc()
         return InternalServerError(error="Internal Server Error").http_exception()
 
 @router.put("/{content_id}", dependencies=[Depends(get_current_user)], response_model=BaseResponse)
-def update_content(
+async def update_content(
     content_id: str,
+    background_tasks: BackgroundTasks,
     title: Optional[str] = Form(None, min_length=1, max_length=255),
     content: Optional[str] = Form(None, min_length=1),
     thumbnail: Optional[UploadFile] = File(None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    file_path = None
+    thumbnail_file = None
+    stored_file = None
     try:
-        article = article_repo.get_article_by_id_db(db, content_id)
+        article = await article_repo.get_article_by_id_db(db, content_id)
 
         if not article:
             return NotFound(message="Article not found").http_exception()
@@ -160,63 +272,67 @@ def update_content(
         old_thumbnail: FileModel | None = None
         if thumbnail:
             try:
-                file_path = save_uploaded_file(thumbnail)
-                new_file = FileModel(file_path=file_path)
-                thumbnail_file = file_repo.create_file(db, new_file)
+                stored_file = await save_uploaded_file(thumbnail)
+                thumbnail_file = await file_repo.acquire_file(db, stored_file)
 
-                if article.thumbnail_file:
+                if article.thumbnail_file and article.thumbnail_file.id != thumbnail_file.id:
                     old_thumbnail = article.thumbnail_file
 
                 article.thumbnail_file_id = thumbnail_file.id
             except HTTPException as error:
-                db.rollback()
-                if file_path:
-                    delete_uploaded_file(file_path)
+                await db.rollback()
+                if stored_file:
+                    discard_stored_file(stored_file)
                 raise error
             except Exception:
-                db.rollback()
-                if file_path:
-                    delete_uploaded_file(file_path)
+                await db.rollback()
+                if stored_file:
+                    discard_stored_file(stored_file)
                 import traceback
                 traceback.print_exc()
                 raise HTTPException(status_code=500, detail="Failed to save the uploaded file.")
 
         if title is not None:
+            # A title with the same slug keeps the article's slug, whatever its suffix
+            retitled = slugify(title) != slugify(article.title)
             article.title = title
-            article.slug = article.generate_slug(db)
+            if retitled:
+                await article_repo.assign_slug(db, article)
         if content is not None:
             article.content = content
 
-        article_repo.update_article(db, article)
+        await article_repo.update_article(db, article)
         if old_thumbnail:
-            delete_uploaded_file(old_thumbnail.file_path)
-            file_repo.delete_file(db, old_thumbnail)
+            await file_repo.release_file(db, old_thumbnail)
+
+        await db.commit()
+        if thumbnail_file:
+            background_tasks.add_task(process_thumbnail, thumbnail_file.id)
 
-        db.commit()
         return Ok(message="Article updated successfully").json()
     except HTTPException as error:
-        db.rollback()
-        if file_path:
-            delete_uploaded_file(file_path)
+        await db.rollback()
+        if stored_file:
+            discard_stored_file(stored_file)
 
         raise error
     except Exception:
-        db.rollback()
-        if file_path:
-            delete_uploaded_file(file_path)
+        await db.rollback()
+        if stored_file:
+            discard_stored_file(stored_file)
 
         import traceback
         traceback.print_exc()
         return InternalServerError(error="Internal Server Error").http_exception()
 
 @router.patch("/{content_id}/restore", dependencies=[Depends(get_current_user)], response_model=BaseResponse)
-def restore_content(
+async def restore_content(
     content_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     try:
-        article = article_repo.get_article_by_id_db(db, content_id)
+        article = await article_repo.get_article_by_id_db(db, content_id)
 
         if not article:
             return NotFound(message="Article not found").http_exception()
@@ -224,9 +340,9 @@ def restore_content(
         if article.author.id != current_user.id:
             return BadRequest(message="You are not allowed to restore this content").http_exception()
 
-        article_repo.restore_article(db, article)
+        await article_repo.restore_article(db, article)
 
-        db.commit()
+        await db.commit()
         return Ok(message="Article restored successfully").json()
     except HTTPException as error:
         raise error
@@ -236,13 +352,13 @@ def restore_content(
         return InternalServerError(error="Internal Server Error").http_exception()
 
 @router.delete("/{content_id}", dependencies=[Depends(get_current_user)], response_model=BaseResponse)
-def delete_content(
+async def delete_content(
     content_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     try:
-        article = article_repo.get_article_by_id_db(db, content_id)
+        article = await article_repo.get_article_by_id_db(db, content_id)
 
         if not article:
             return NotFound(message="Article not found").http_exception()
@@ -250,9 +366,9 @@ def delete_content(
         if article.author.id != current_user.id:
             return BadRequest(message="You are not allowed to delete this content").http_exception()
 
-        article_repo.soft_delete_article(db, article)
+        await article_repo.soft_delete_article(db, article)
 
-        db.commit()
+        await db.commit()
         return Ok(message="Article deleted successfully").json()
     except HTTPException as error:
         raise error
@@ -262,13 +378,13 @@ def delete_content(
         return InternalServerError(error="Internal Server Error").http_exception()
 
 @router.delete("/{content_id}/permanently", dependencies=[Depends(get_current_user)], response_model=BaseResponse)
-def delete_content(
+async def delete_content_permanently(
     content_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     try:
-        article = article_repo.get_article_by_id_db(db, content_id)
+        article = await article_repo.get_article_by_id_db(db, content_id)
 
         if not article:
             return NotFound(message="Article not found").http_exception()
@@ -276,12 +392,12 @@ def delete_content(
         if article.author.id != current_user.id:
             return BadRequest(message="You are not allowed to delete this content").http_exception()
 
-        article_repo.delete_article(db, article)
-        if article.thumbnail_file:
-            file_repo.delete_file(db, article.thumbnail_file)
-            delete_uploaded_file(article.thumbnail.file_path)
+        thumbnail_file = article.thumbnail_file
+        await article_repo.delete_article(db, article)
+        if thumbnail_file:
+            await file_repo.release_file(db, thumbnail_file)
 
-        db.commit()
+        await db.commit()
         return Ok(message="Article deleted successfully").json()
     except HTTPException as error:
         raise error
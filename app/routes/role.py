@@ -1,28 +1,28 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.response import InternalServerError, Ok, BadRequest, NotFound
 from app.core.security import get_current_user, check_user_admin
-from app.models import User, Role
+from app.models import Role
 import app.repository.role as role_repo
+from app.schemas.auth import CurrentUser
 from app.schemas.base import BaseResponse
-from app.schemas.role import CreateRoleRequest, ListRoleResponse, DetailRoleResponse, UpdateRoleRequest, DetailRole
+from app.schemas.role import CreateRoleRequest, ListRoleResponse, DetailRoleResponse, UpdateRoleRequest
 
 router = APIRouter(prefix="/roles", tags=["roles"])
 
 @router.get("/", dependencies=[Depends(get_current_user)], response_model=ListRoleResponse)
-def get_roles(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+async def get_roles(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     try:
         check_user_admin(current_user)
 
-        roles = role_repo.get_roles(db)
-        role_list = [DetailRole.model_validate(role).to_dict() for role in roles]
+        roles = await role_repo.get_roles(db)
 
-        return Ok(data=role_list, message="Roles retrieved successfully").json()
+        return Ok(data=roles, message="Roles retrieved successfully").json()
     except HTTPException as error:
         raise error
     except Exception:
@@ -31,15 +31,15 @@ def get_roles(
         return InternalServerError(error="Internal Server Error").http_exception()
 
 @router.get("/{role_id}", dependencies=[Depends(get_current_user)], response_model=DetailRoleResponse)
-def get_role(
+async def get_role(
     role_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     try:
         check_user_admin(current_user)
 
-        role = role_repo.get_role_by_id(db, role_id)
+        role = await role_repo.get_detail_role(db, role_id)
         if not role:
             raise NotFound(message="Role not found").http_exception()
 
@@ -52,15 +52,15 @@ def get_role(
         return InternalServerError(error="Internal Server Error").http_exception()
 
 @router.post("/", dependencies=[Depends(get_current_user)], response_model=BaseResponse)
-def create_role(
+async def create_role(
     req: CreateRoleRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     try:
         check_user_admin(current_user)
 
-        is_role_name_exists = role_repo.is_role_exists(db, req.name)
+        is_role_name_exists = await role_repo.is_role_exists(db, req.name)
         if is_role_name_exists:
             raise BadRequest(message="Role name already exists").http_exception()
 
@@ -68,7 +68,7 @@ def create_role(
             name=req.name
         )
 
-        role_repo.create_role(db, new_role)
+        await role_repo.create_role(db, new_role)
 
         return Ok(message="Role created successfully").json()
     except HTTPException as error:
@@ -79,26 +79,27 @@ def create_role(
         return InternalServerError(error="Internal Server Error").http_exception()
 
 @router.put("/{role_id}", dependencies=[Depends(get_current_user)], response_model=BaseResponse)
-def update_role(
+async def update_role(
     role_id: int,
     req: UpdateRoleRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     try:
         check_user_admin(current_user)
 
-        role = role_repo.get_role_by_id(db, role_id)
+        role = await role_repo.get_role_by_id(db, role_id)
         if not role:
             raise NotFound(message="Role not found").http_exception()
 
-        if role.name != req.name:
-            is_role_name_exists = role_repo.is_role_exists(db, req.name)
+        renamed = role.name != req.name
+        if renamed:
+            is_role_name_exists = await role_repo.is_role_exists(db, req.name)
             if is_role_name_exists:
                 raise BadRequest(message="Role name already exists").http_exception()
 
         role.name = req.name
-        role_repo.update_role(db, role)
+        await role_repo.update_role(db, role, renamed=renamed)
 
         return Ok(message="Role updated successfully").json()
     except HTTPException as error:
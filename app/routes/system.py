@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.core.cache import user_cache, token_version_cache, token_cache, article_cache
+from app.core.hashing import password_hasher
+from app.core.rate_limit import login_rate_limiter
+from app.core.response import InternalServerError, Ok
+from app.core.roles import role_registry
+from app.core.security import get_current_user, check_user_admin
+from app.schemas.auth import CurrentUser
+from app.schemas.base import BaseResponse
+from app.schemas.system import SystemStats
+
+router = APIRouter(prefix="/system", tags=["system"])
+
+@router.get("/stats", dependencies=[Depends(get_current_user)], response_model=BaseResponse[SystemStats])
+async def get_stats(
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    try:
+        check_user_admin(current_user)
+
+        stats = SystemStats(caches={
+            "user": user_cache.stats(),
+            "token_version": token_version_cache.stats(),
+            "token": token_cache.stats(),
+            "article": article_cache.stats(),
+        }, password_hashing=password_hasher.stats(), login_rate_limit=login_rate_limiter.stats(), roles=role_registry.stats())
+
+        return Ok(data=stats, message="Stats retrieved successfully").json()
+    except HTTPException as error:
+        raise error
+    except Exception:
+        import traceback
+        traceback.print_exc()
+        return InternalServerError(error="Internal Server Error").http_exception()
@@ -1,30 +1,73 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
-from pydantic import ValidationError
-from sqlalchemy.orm import Session
+from typing import Optional
 
-from app.core.database import get_db
-from app.core.response import InternalServerError, Ok, NotFound, BadRequest
-from app.core.security import get_current_user, check_user_admin, get_password_hash, verify_password
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_async_db, is_foreign_key_violation, is_unique_violation
+from app.core.response import InternalServerError, Ok, NotFound, BadRequest, UnprocessableEntity
+from app.core.hashing import password_hasher
+from app.core.security import TOKEN_CLAIM_FIELDS, get_current_user, check_user_admin
 from app.models import User
+from app.schemas.auth import CurrentUser
 from app.schemas.base import BaseResponse
 from app.schemas.user import ListUserResponse, DetailUser, DetailUserResponse, CreateUserRequest, UpdateUserRequest, \
-    validate_username, CreateUserResponse
+    CreateUserResponse, UserSort, UserStatus
+import app.repository.role as role_repo
 import app.repository.user as user_repo
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+async def check_role(db: AsyncSession, role_id: int):
+    # Fails before the password is hashed; the foreign key still has the final say
+    if not await role_repo.role_exists(db, role_id):
+        raise UnprocessableEntity("role", "Role does not exist.", role_id).http_exception()
+
+def raise_integrity_error(error: IntegrityError, username: str, role_id: int):
+    if is_unique_violation(error, "users_username_key"):
+        raise UnprocessableEntity("username", "Username is already taken.", username).http_exception()
+    if is_foreign_key_violation(error, "users_role_id_fkey"):
+        raise UnprocessableEntity("role", "Role does not exist.", role_id).http_exception()
+    raise error
+
 @router.get("/", dependencies=[Depends(get_current_user)], response_model=ListUserResponse)
-def get_users(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+async def get_users(
+    limit: int = Query(user_repo.DEFAULT_PAGE_SIZE, ge=1, le=user_repo.MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    sort: UserSort = Query(UserSort.ID),
+    role: Optional[int] = Query(None),
+    status: UserStatus = Query(UserStatus.ALL),
+    username: Optional[str] = Query(None, min_length=1, max_length=20, description="Username prefix"),
+    include_total: bool = Query(False, description="Add an approximate total for unfiltered listings"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     try:
         check_user_admin(current_user)
 
-        users = user_repo.get_users(db)
-        user_list = [DetailUser.model_validate(user).to_dict() for user in users]
+        position = None
+        if cursor:
+            try:
+                position = user_repo.decode_user_cursor(cursor, sort)
+            except ValueError:
+                return BadRequest(message="Invalid cursor").http_exception()
+
+        users, next_cursor = await user_repo.get_users(
+            db, limit=limit, cursor=position, sort=sort, role_id=role, status=status, username_prefix=username
+        )
+
+        # A planner estimate, never a COUNT(*); it says nothing about filtered listings
+        approximate_total = None
+        if include_total and role is None and status == UserStatus.ALL and not username:
+            approximate_total = await user_repo.get_approximate_user_count(db)
 
-        return Ok(data=user_list, message="Users retrieved successfully").json()
+        return Ok(
+            data={"items": users, "next_cursor": next_cursor, "approximate_total": approximate_total},
+            message="Users retrieved successfully"
+        ).json()
     except HTTPException as error:
         raise error
     except Exception:
@@ -33,19 +76,19 @@ def get_users(
         return InternalServerError(error="Internal Server Error").http_exception()
 
 @router.get("/{user_id}", dependencies=[Depends(get_current_user)], response_model=DetailUserResponse)
-def get_user(
+async def get_user(
     user_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     try:
         check_user_admin(current_user)
 
-        user = user_repo.get_user_by_id(db, user_id)
+        user = await user_repo.get_user_by_id(db, user_id)
         if not user:
             raise NotFound(message="User not found").http_exception()
 
-        return Ok(data=DetailUser.model_validate(user).to_dict(), message="User retrieved successfully").json()
+        return Ok(data=DetailUser.model_validate(user), message="User retrieved successfully").json()
     except HTTPException as error:
         raise error
     except Exception:
@@ -54,15 +97,16 @@ def get_user(
         return InternalServerError(error="Internal Server Error").http_exception()
 
 @router.post("/", dependencies=[Depends(get_current_user)], response_model=CreateUserResponse)
-def create_user(
+async def create_user(
     req: CreateUserRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     try:
         check_user_admin(current_user)
+        await check_role(db, req.role)
 
-        hashed_password = get_password_hash(req.password)
+        hashed_password = await password_hasher.hash(req.password)
         new_user = User(
             name=req.name,
             username=req.username,
@@ -70,10 +114,14 @@ def create_user(
             role_id=req.role,
         )
 
-        user = user_repo.create_user(db, new_user)
+        try:
+            user = await user_repo.create_user(db, new_user)
+        except IntegrityError as error:
+            await db.rollback()
+            raise_integrity_error(error, req.username, req.role)
 
         return Ok(data={"id":user.id}, message="User created successfully").json()
-    except HTTPException as error:
+    except (HTTPException, RequestValidationError) as error:
         raise error
     except Exception:
         import traceback
@@ -84,19 +132,20 @@ def create_user(
 async def update_user(
     user_id: int,
     req: UpdateUserRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     try:
         check_user_admin(current_user)
 
-        user = user_repo.get_user_by_id(db, user_id)
+        user = await user_repo.get_user_by_id(db, user_id)
         if not user:
             raise NotFound(message="User not found").http_exception()
         if user.deleted_at:
             raise BadRequest(message="User is deleted").http_exception()
 
-        validate_username(req.username, exclude_user_id=user_id)
+        if req.role is not None:
+            await check_role(db, req.role)
 
         update_data = {}
 
@@ -110,20 +159,30 @@ async def update_user(
             if not req.old_password:
                 raise BadRequest(message="Old password is required to change password.").http_exception()
 
-            if not verify_password(req.old_password, user.password):
+            valid, _ = await password_hasher.verify(req.old_password, user.password)
+            if not valid:
                 raise BadRequest(message="Old password is incorrect.").http_exception()
 
-            update_data["password"] = get_password_hash(req.new_password)
+            update_data["password"] = await password_hasher.hash(req.new_password)
 
         if update_data:
+            # Sessions end on a password change, and in stateless mode when a
+            # field carried in the access token changes
+            revoke = "password" in update_data or settings.JWT_STATELESS_AUTH and any(
+                getattr(user, key) != value for key, value in update_data.items() if key in TOKEN_CLAIM_FIELDS
+            )
             for key, value in update_data.items():
                 setattr(user, key, value)
-            user_repo.update_user(db, user)
+            if revoke:
+                user.revoke_tokens()
+            try:
+                await user_repo.update_user(db, user)
+            except IntegrityError as error:
+                await db.rollback()
+                raise_integrity_error(error, req.username, req.role)
 
         return Ok(message="User updated successfully").json()
-    except ValueError as error:
-        raise HTTPException(status_code=422, detail={"loc": ["body", "username"], "msg": str(error), "type": "value_error"})
-    except HTTPException as error:
+    except (HTTPException, RequestValidationError) as error:
         raise error
     except Exception:
         import traceback
@@ -131,19 +190,19 @@ async def update_user(
         return InternalServerError(error="Internal Server Error").http_exception()
 
 @router.patch("/{user_id}/restore", dependencies=[Depends(get_current_user)], response_model=BaseResponse)
-def restore_user(
+async def restore_user(
     user_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     try:
         check_user_admin(current_user)
 
-        user = user_repo.get_user_by_id(db, user_id)
+        user = await user_repo.get_user_by_id(db, user_id)
         if not user:
             raise NotFound(message="User not found").http_exception()
 
-        user_repo.restore_user(db, user)
+        await user_repo.restore_user(db, user)
 
         return Ok(message="User restored successfully").json()
     except HTTPException as error:
@@ -154,19 +213,19 @@ def restore_user(
         return InternalServerError(error="Internal Server Error").http_exception()
 
 @router.delete("/{user_id}", dependencies=[Depends(get_current_user)], response_model=BaseResponse)
-def delete_user(
+async def delete_user(
     user_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     try:
         check_user_admin(current_user)
 
-        user = user_repo.get_user_by_id(db, user_id)
+        user = await user_repo.get_user_by_id(db, user_id)
         if not user:
             raise NotFound(message="User not found").http_exception()
 
-        user_repo.soft_delete_user(db, user)
+        await user_repo.soft_delete_user(db, user)
 
         return Ok(message="User deleted successfully").json()
     except HTTPException as error:
@@ -177,19 +236,19 @@ def delete_user(
         return InternalServerError(error="Internal Server Error").http_exception()
 
 @router.delete("/{user_id}/permanently", dependencies=[Depends(get_current_user)], response_model=BaseResponse)
-def delete_user_permanently(
+async def delete_user_permanently(
     user_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     try:
         check_user_admin(current_user)
 
-        user = user_repo.get_user_by_id(db, user_id)
+        user = await user_repo.get_user_by_id(db, user_id)
         if not user:
             raise NotFound(message="User not found").http_exception()
 
-        user_repo.delete_user(db, user)
+        await user_repo.delete_user(db, user)
 
         return Ok(message="User deleted permanently").json()
     except HTTPException as error:
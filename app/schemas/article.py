@@ -1,10 +1,11 @@
 from datetime import datetime
-from typing import Optional, Annotated, List
+from enum import Enum
+from typing import Optional, Annotated, Union
 
 from fastapi import UploadFile
 from pydantic import BaseModel, StringConstraints, Field, ConfigDict
 
-from app.schemas.base import BaseResponse
+from app.schemas.base import BaseResponse, CursorPage
 
 
 class CreateArticleRequest(BaseModel):
@@ -23,6 +24,22 @@ class UpdateArticleRequest(BaseModel):
     content: Optional[Annotated[str, StringConstraints(min_length=1)]]
     thumbnail: Optional[UploadFile] = None
 
+class ImportArticle(BaseModel):
+    title: Annotated[str, StringConstraints(min_length=1, max_length=255)]
+    content: Annotated[str, StringConstraints(min_length=1)]
+    author_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    deleted_at: Optional[datetime] = None
+
+    model_config = ConfigDict(extra="ignore")
+
+class ImportArticleResult(BaseModel):
+    imported: int
+
+class ImportArticleResponse(BaseResponse[ImportArticleResult]):
+    pass
+
 class DetailAuthor(BaseModel):
     id: int
     name: str
@@ -40,6 +57,7 @@ class DetailArticle(BaseModel):
     title: str
     content: str
     thumbnail_url: Optional[str] = None
+    thumbnail_srcset: Optional[str] = None
     created_at: datetime
     updated_at: datetime
     deleted_at: Optional[datetime] = None
@@ -53,14 +71,46 @@ class DetailArticle(BaseModel):
             'title': self.title,
             'content': self.content,
             'thumbnail_url': self.thumbnail_url,
+            'thumbnail_srcset': self.thumbnail_srcset,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'deleted_at': self.deleted_at.isoformat() if self.deleted_at else None,
             'author': self.author.to_dict() if self.author else None
         }
 
+class ArticleView(str, Enum):
+    FULL = "full"
+    SUMMARY = "summary"
+
+class SummaryArticle(BaseModel):
+    id: str
+    title: str
+    excerpt: str
+    thumbnail_url: Optional[str] = None
+    thumbnail_srcset: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    deleted_at: Optional[datetime] = None
+    author: DetailAuthor
+
+    model_config = ConfigDict(from_attributes=True)
+
+class SearchArticle(BaseModel):
+    id: str
+    title: str
+    snippet: str
+    rank: float
+    thumbnail_url: Optional[str] = None
+    thumbnail_srcset: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    author: DetailAuthor
+
 class DetailArticleResponse(BaseResponse[DetailArticle]):
     pass
 
-class ListArticleResponse(BaseResponse[List[DetailArticle]]):
-    pass
\ No newline at end of file
+class ListArticleResponse(BaseResponse[CursorPage[Union[DetailArticle, SummaryArticle]]]):
+    pass
+
+class SearchArticleResponse(BaseResponse[CursorPage[SearchArticle]]):
+    pass
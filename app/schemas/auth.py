@@ -1,8 +1,9 @@
 from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 from .base import BaseResponse
+from .role import DetailRole
 
 class LoginRequest(BaseModel):
     username: str
@@ -16,6 +17,17 @@ class TokenData(BaseModel):
     user_id: int
     exp: int
     is_refresh: Optional[bool] = False
+    token_version: Optional[int] = None
+
+class CurrentUser(BaseModel):
+    id: int
+    username: str
+    name: str
+    role_id: int
+    role: DetailRole
+    token_version: int = 0
+
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 class LoginResponse(BaseResponse[Token]):
     pass
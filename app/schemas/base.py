@@ -7,4 +7,8 @@ class BaseResponse(BaseModel, Generic[T]):
     status: str
     message: str
     errors: Optional[List[dict]] = None
-    data: Optional[T] = None
\ No newline at end of file
+    data: Optional[T] = None
+
+class CursorPage(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
\ No newline at end of file
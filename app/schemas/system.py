@@ -0,0 +1,40 @@
+from typing import Dict, Optional
+
+from pydantic import BaseModel
+
+class CacheStats(BaseModel):
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    evictions: int
+    hit_ratio: float
+
+class PasswordHashingStats(BaseModel):
+    workers: int
+    queue_depth: int
+    in_flight: int
+    queued: int
+    completed: int
+    rejected: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+class RateLimitStats(BaseModel):
+    backend: str
+    keys: Optional[int]
+    allowed: int
+    rejected: int
+
+class RoleRegistryStats(BaseModel):
+    roles: int
+    listening: bool
+    reloads: int
+    loaded_at: Optional[float]
+
+class SystemStats(BaseModel):
+    caches: Dict[str, CacheStats]
+    password_hashing: PasswordHashingStats
+    login_rate_limit: RateLimitStats
+    roles: RoleRegistryStats
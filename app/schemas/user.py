@@ -1,21 +1,19 @@
 from datetime import datetime
-from typing import Optional, List
+from enum import Enum
+from typing import Optional
 
 from pydantic import BaseModel, StringConstraints, field_validator, ConfigDict
 from typing_extensions import Annotated
 
-from app.core.database import factory_session
-from app.models import User, Role
 from .role import DetailRole
-from .base import BaseResponse
+from .base import BaseResponse, CursorPage
+
+# Validators only look at the request itself; whether the role exists and the
+# username is free is checked by the route on its own session
 
 def validate_role(role_id: int) -> int:
     if not role_id:
         raise ValueError("Role must not be empty.")
-    with factory_session() as session:
-        existing_role = session.query(Role).filter_by(id=role_id).first()
-        if not existing_role:
-            raise ValueError("Role does not exist.")
     return role_id
 
 def validate_password(password: str) -> str:
@@ -33,16 +31,9 @@ def validate_password(password: str) -> str:
         raise ValueError("Password must contain at least one special character.")
     return password
 
-def validate_username(username: str, exclude_user_id: Optional[int] = None) -> str:
+def validate_username(username: str) -> str:
     if not username:
         raise ValueError("Username must not be empty.")
-    with factory_session() as session:
-        query = session.query(User).filter(User.username == username)
-        if exclude_user_id:
-            query = query.filter(User.id != exclude_user_id)
-        existing_username = query.first()
-        if existing_username:
-            raise ValueError("Username is already taken.")
     return username
 
 class BaseUserRequest(BaseModel):
@@ -117,5 +108,21 @@ class DetailUser(BaseModel):
 class DetailUserResponse(BaseResponse[DetailUser]):
     pass
 
-class ListUserResponse(BaseResponse[List[DetailUser]]):
+class UserSort(str, Enum):
+    ID = "id"
+    ID_DESC = "-id"
+    USERNAME = "username"
+    USERNAME_DESC = "-username"
+    NAME = "name"
+    NAME_DESC = "-name"
+
+class UserStatus(str, Enum):
+    ACTIVE = "active"
+    DELETED = "deleted"
+    ALL = "all"
+
+class UserPage(CursorPage[DetailUser]):
+    approximate_total: Optional[int] = None
+
+class ListUserResponse(BaseResponse[UserPage]):
     pass
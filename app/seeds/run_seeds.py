@@ -1,13 +1,28 @@
+import argparse
+
 from .seed_roles import seed_roles
 from .seed_users import seed_users
 from .seed_articles import seed_articles
+from .seed_scale import seed_scale
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="seed", description="Seed the database.")
+    parser.add_argument("--scale", action="store_true", help="also bulk-load synthetic data for performance testing")
+    parser.add_argument("--users", type=int, default=10_000, help="synthetic users to generate with --scale")
+    parser.add_argument("--articles", type=int, default=1_000_000, help="synthetic articles to generate with --scale")
+    parser.add_argument("--deleted-ratio", type=float, default=0.05, help="share of soft-deleted users and articles")
+    parser.add_argument("--random-seed", type=int, default=0, help="seed for reproducible synthetic data")
+    return parser.parse_args(argv)
 
-def run_seeds():
+def run_seeds(argv=None):
+    args = parse_args(argv)
     print("Running all seeds...")
     seed_roles()
     seed_users()
     seed_articles()
+    if args.scale:
+        seed_scale(args.users, args.articles, args.deleted_ratio, args.random_seed)
     print("All seeds completed.")
 
 if __name__ == "__main__":
-    run_seeds()
\ No newline at end of file
+    run_seeds()
@@ -0,0 +1,208 @@
+import io
+import random
+import threading
+import time
+from queue import Queue
+from datetime import datetime, timedelta, UTC
+
+from slugify import slugify
+from sqlalchemy import text
+from uuid_utils import uuid7
+
+from app.core.database import engine
+from app.core.security import get_password_hash
+from app.models import Article, User
+
+COPY_CHUNK_SIZE = 100_000
+
+# Every generated user logs in with this password; it is hashed once per run
+SCALE_PASSWORD = "password123"
+
+HISTORY_DAYS = 2 * 365
+
+WORDS = (
+    "python postgres fastapi query index cache latency throughput async worker "
+    "release deploy schema migration backup replica cluster metrics tracing "
+    "review design pattern refactor benchmark profile memory network storage "
+    "panduan belajar pemula lengkap cara membuat aplikasi sederhana tutorial"
+).split()
+
+TOPICS = (
+    "Weekly update", "Release notes", "Getting started", "Performance tips",
+    "Panduan Lengkap SQLAlchemy", "Pengenalan Python untuk Pemula", "Tutorial FastAPI",
+    "Postmortem", "Roadmap", "Changelog",
+)
+
+NULL = "\\N"
+
+LOREM = " ".join(random.Random(0).choice(WORDS) for _ in range(200_000))
+
+
+class ScaleGenerator:
+    """Deterministic rows for `seed --scale` as COPY text format lines.
+
+    Generated values never contain tabs, newlines or backslashes, so lines
+    are joined without escaping.
+    """
+
+    def __init__(self, users: int, articles: int, deleted_ratio: float, random_seed: int):
+        self.users = users
+        self.articles = articles
+        self.deleted_ratio = deleted_ratio
+        self.random = random.Random(random_seed)
+        self.now = datetime.now(UTC)
+        # Zipf-like title popularity: a few titles repeat thousands of times and
+        # most appear once or twice, which is what slug allocation has to cope with
+        self.title_weights = [1 / (rank + 1) for rank in range(max(articles // 20, len(TOPICS)))]
+
+    def timestamp(self) -> datetime:
+        return self.now - timedelta(seconds=self.random.random() * HISTORY_DAYS * 86400)
+
+    def deleted_at(self, created_at: datetime) -> str:
+        if self.random.random() >= self.deleted_ratio:
+            return NULL
+        return str(created_at + (self.now - created_at) * self.random.random())
+
+    def content(self) -> str:
+        # Log-normal length: median ~500 characters with a long tail of ~10 KB posts
+        length = min(int(self.random.lognormvariate(6.2, 0.9)), len(LOREM) // 2)
+        start = self.random.randrange(len(LOREM) - length)
+        return LOREM[start:start + length].strip() or "-"
+
+    def titles(self):
+        ranks = self.random.choices(range(len(self.title_weights)), weights=self.title_weights, k=self.articles)
+        for rank in ranks:
+            topic = TOPICS[rank % len(TOPICS)]
+            yield topic if rank < len(TOPICS) else f"{topic} {rank // len(TOPICS)}"
+
+    def user_rows(self, user_ids, role_ids, usernames):
+        # One bcrypt hash for the whole run instead of one per user
+        password = get_password_hash(SCALE_PASSWORD)
+        for user_id, username in zip(user_ids, usernames):
+            created_at = self.timestamp()
+            yield (
+                f"{user_id}\t{username}\tSeed User {user_id}\t{password}\t{self.random.choice(role_ids)}\t"
+                f"{created_at}\t{created_at}\t{self.deleted_at(created_at)}\n"
+            )
+
+    def article_rows(self, author_ids, used_slugs):
+        base_slugs = {}
+        suffixes = {}
+        for title in self.titles():
+            base_slug = base_slugs.get(title)
+            if base_slug is None:
+                base_slug = base_slugs[title] = slugify(title)
+            slug = base_slug
+            while slug in used_slugs:
+                suffixes[base_slug] = suffixes.get(base_slug, 0) + 1
+                slug = f"{base_slug}-{suffixes[base_slug]}"
+            used_slugs.add(slug)
+
+            created_at = self.timestamp()
+            updated_at = created_at + (self.now - created_at) * self.random.random() ** 4
+            article_id = uuid7(timestamp=int(created_at.timestamp()), nanos=created_at.microsecond * 1000)
+            yield (
+                f"{article_id}\t{title}\t{slug}\t{self.content()}\t{self.random.choice(author_ids)}\t"
+                f"{created_at}\t{updated_at}\t{self.deleted_at(created_at)}\n"
+            )
+
+
+def chunks(lines, size: int):
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def copy_rows(cursor, table: str, columns, lines) -> int:
+    """COPY text-format lines into table, returning the row count.
+
+    The next chunk is generated on a thread while Postgres ingests the
+    current one; psycopg2 releases the GIL while it waits on the server.
+    """
+    statement = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+    pending = Queue(maxsize=2)
+
+    def produce():
+        try:
+            for chunk in chunks(lines, COPY_CHUNK_SIZE):
+                pending.put(chunk)
+            pending.put(None)
+        except Exception as error:
+            pending.put(error)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    count = 0
+    try:
+        while (chunk := pending.get()) is not None:
+            if isinstance(chunk, Exception):
+                raise chunk
+            cursor.copy_expert(statement, io.StringIO("".join(chunk)))
+            count += len(chunk)
+    finally:
+        # Unblock and drain the producer if COPY failed halfway
+        while producer.is_alive():
+            pending.get()
+    return count
+
+def seed_scale(users: int, articles: int, deleted_ratio: float = 0.05, random_seed: int = 0):
+    """Bulk-load synthetic users and articles for performance testing.
+
+    Runs in a single transaction on top of whatever is already in the
+    database; run seed_roles first so the generated users have roles.
+    """
+    generator = ScaleGenerator(users, articles, deleted_ratio, random_seed)
+    started = time.perf_counter()
+
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+
+        cursor.execute("SELECT id FROM roles")
+        role_ids = [row[0] for row in cursor.fetchall()]
+        if not role_ids:
+            print("No roles found. Run the regular seeds first.")
+            return
+
+        # Reserve ids from the serial so articles can reference users without reading them back
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence('users', 'id')) FROM generate_series(1, %s)",
+            (users,),
+        )
+        user_ids = [row[0] for row in cursor.fetchall()]
+        # Fresh ids make seed<id> unique unless someone registered such a name by hand
+        cursor.execute("SELECT username FROM users WHERE username ~ '^seed[0-9]+'")
+        taken = {row[0] for row in cursor.fetchall()}
+        usernames = [f"seed{user_id}" if f"seed{user_id}" not in taken else f"seed{user_id}-{random_seed}" for user_id in user_ids]
+
+        user_count = copy_rows(
+            cursor, User.__tablename__,
+            ("id", "username", "name", "password", "role_id", "created_at", "updated_at", "deleted_at"),
+            generator.user_rows(user_ids, role_ids, usernames),
+        )
+        print(f"Copied {user_count} users ({time.perf_counter() - started:.1f}s).")
+
+        cursor.execute("SELECT slug FROM articles")
+        used_slugs = {row[0] for row in cursor.fetchall()}
+        article_count = copy_rows(
+            cursor, Article.__tablename__,
+            ("id", "title", "slug", "content", "author", "created_at", "updated_at", "deleted_at"),
+            generator.article_rows(user_ids, used_slugs),
+        )
+        print(f"Copied {article_count} articles ({time.perf_counter() - started:.1f}s).")
+
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+    # Fresh statistics so the planner sees the new row counts straight away
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text(f"ANALYZE {User.__tablename__}, {Article.__tablename__}"))
+    print(f"Scale seed completed in {time.perf_counter() - started:.1f}s.")
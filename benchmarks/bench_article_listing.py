@@ -0,0 +1,111 @@
+"""Per-row cost of listing articles through ORM instances vs Core row projections.
+
+Inserts 1,000 articles with thumbnails into the configured database, lists
+them through the previous ORM path and through get_articles, and removes
+them afterwards.
+
+    python -m benchmarks.bench_article_listing
+"""
+import asyncio
+import time
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import joinedload
+from uuid_utils import uuid7
+
+from app.core.database import AsyncSession, Session, async_engine
+from app.models import Article, File, User, Role
+from app.repository.article import get_articles, thumbnail_url, thumbnail_srcset
+from app.schemas.article import DetailArticle, DetailAuthor
+
+ARTICLES = 1000
+REPEAT = 10
+
+
+async def orm_listing(db, author_id: int) -> list[DetailArticle]:
+    query = (
+        select(Article)
+        .options(joinedload(Article.thumbnail_file).selectinload(File.variants), joinedload(Article.author))
+        .filter_by(author_id=author_id)
+        .order_by(Article.id.desc())
+        .limit(ARTICLES)
+    )
+    articles = (await db.execute(query)).scalars().all()
+    return [
+        DetailArticle(
+            id=str(article.id),
+            title=article.title,
+            content=article.content,
+            thumbnail_url=thumbnail_url(article.thumbnail_file),
+            thumbnail_srcset=thumbnail_srcset(article.thumbnail_file),
+            created_at=article.created_at,
+            updated_at=article.updated_at,
+            deleted_at=article.deleted_at,
+            author=DetailAuthor(id=article.author.id, name=article.author.name)
+        )
+        for article in articles
+    ]
+
+async def projection_listing(db, author_id: int) -> list[dict]:
+    articles, _ = await get_articles(db, author_id, limit=ARTICLES)
+    return articles
+
+async def measure(listing, author_id: int) -> float:
+    timings = []
+    for _ in range(REPEAT):
+        async with AsyncSession() as db:
+            start = time.perf_counter()
+            rows = await listing(db, author_id)
+            timings.append(time.perf_counter() - start)
+        assert len(rows) == ARTICLES
+    return min(timings)
+
+async def run(author_id: int):
+    try:
+        orm = await measure(orm_listing, author_id)
+        projection = await measure(projection_listing, author_id)
+    finally:
+        await async_engine.dispose()
+
+    print(f"ORM instances:     {orm * 1e3:8.2f} ms ({orm / ARTICLES * 1e6:.1f} us/row)")
+    print(f"Core projection:   {projection * 1e3:8.2f} ms ({projection / ARTICLES * 1e6:.1f} us/row, {orm / projection:.1f}x faster)")
+
+def main():
+    db = Session()
+    role = Role(name="listing-benchmark")
+    db.add(role)
+    db.flush()
+    author = User(username="listing-benchmark", name="Listing Benchmark", password="-", role_id=role.id)
+    db.add(author)
+    db.flush()
+    thumbnail = File(file_path="uploads/listing-benchmark.png")
+    db.add(thumbnail)
+    db.flush()
+
+    try:
+        db.execute(insert(Article), [
+            {
+                "id": str(uuid7()),
+                "title": f"Listing benchmark {index}",
+                "slug": f"listing-benchmark-{index}",
+                "content": "Lorem ipsum dolor sit amet. " * 40,
+                "thumbnail_file_id": thumbnail.id,
+                "author_id": author.id,
+            }
+            for index in range(ARTICLES)
+        ])
+        db.commit()
+
+        asyncio.run(run(author.id))
+    finally:
+        db.rollback()
+        db.execute(delete(Article).where(Article.author_id == author.id))
+        db.execute(delete(File).where(File.id == thumbnail.id))
+        db.execute(delete(User).where(User.id == author.id))
+        db.execute(delete(Role).where(Role.id == role.id))
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Rows per second of the bulk NDJSON import vs creating articles one by one.
+
+Imports 2,000 articles with repeating titles into the configured database
+through create_article and through import_articles, and removes them
+afterwards.
+
+    python -m benchmarks.bench_bulk_import
+"""
+import asyncio
+import time
+
+from sqlalchemy import delete
+
+from app.core.database import AsyncSession, Session, async_engine
+from app.models import Article, User, Role
+from app.repository.article import IMPORT_BATCH_SIZE, create_article, import_articles
+from app.schemas.article import ImportArticle
+
+ARTICLES = 2000
+TITLES = 50
+
+
+def payloads(prefix: str) -> list[ImportArticle]:
+    return [
+        ImportArticle(title=f"{prefix} {index % TITLES}", content="Lorem ipsum dolor sit amet. " * 40)
+        for index in range(ARTICLES)
+    ]
+
+async def per_article(author_id: int) -> float:
+    articles = payloads("Single import benchmark")
+    async with AsyncSession() as db:
+        start = time.perf_counter()
+        for article in articles:
+            await create_article(db, Article(title=article.title, content=article.content, author_id=author_id))
+        return time.perf_counter() - start
+
+async def bulk(author_id: int) -> float:
+    articles = payloads("Bulk import benchmark")
+    async with AsyncSession() as db:
+        start = time.perf_counter()
+        for offset in range(0, ARTICLES, IMPORT_BATCH_SIZE):
+            await import_articles(db, articles[offset:offset + IMPORT_BATCH_SIZE], author_id)
+        await db.commit()
+        return time.perf_counter() - start
+
+async def run(author_id: int):
+    try:
+        single = await per_article(author_id)
+        batched = await bulk(author_id)
+    finally:
+        await async_engine.dispose()
+
+    print(f"create_article:    {single * 1e3:9.2f} ms ({ARTICLES / single:8.0f} rows/s)")
+    print(f"import_articles:   {batched * 1e3:9.2f} ms ({ARTICLES / batched:8.0f} rows/s, {single / batched:.1f}x faster)")
+
+def main():
+    db = Session()
+    role = Role(name="import-benchmark")
+    db.add(role)
+    db.flush()
+    author = User(username="import-benchmark", name="Import Benchmark", password="-", role_id=role.id)
+    db.add(author)
+    db.commit()
+
+    try:
+        asyncio.run(run(author.id))
+    finally:
+        db.rollback()
+        db.execute(delete(Article).where(Article.author_id == author.id))
+        db.execute(delete(User).where(User.id == author.id))
+        db.execute(delete(Role).where(Role.id == role.id))
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
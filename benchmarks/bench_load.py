@@ -0,0 +1,317 @@
+"""End-to-end load benchmark for the main API routes, with stored baselines.
+
+Drives the application in-process through httpx's ASGI transport, or a
+running server when --url is given, and reports throughput and p50/p95/p99
+latency per scenario. In-process runs create a temporary admin user and
+remove it, and everything it created, afterwards; against a server, pass
+the credentials of an existing admin (the seeded one by default).
+
+    python -m benchmarks.bench_load run --output results.json
+    python -m benchmarks.bench_load run --url http://localhost:8000 --concurrency 20
+    python -m benchmarks.bench_load compare benchmarks/baselines/load_inprocess.json results.json
+
+In-process runs also include background tasks (thumbnail variants) in the
+upload latency, because the ASGI transport waits for the app to finish.
+Baselines are only comparable on the machine that recorded them.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import struct
+import sys
+import time
+import zlib
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+from datetime import datetime, UTC
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+DEFAULT_REQUESTS = 200
+DEFAULT_CONCURRENCY = 10
+DEFAULT_THRESHOLD = 0.15
+WARMUP_REQUESTS = 5
+
+BENCHMARK_USERNAME = "load-benchmark"
+BENCHMARK_PASSWORD = "load-benchmark"
+
+
+@dataclass
+class Context:
+    client: httpx.AsyncClient
+    username: str
+    password: str
+    headers: dict = field(default_factory=dict)
+    refresh_token: Optional[str] = None
+    article_id: Optional[str] = None
+    created_ids: list = field(default_factory=list)
+    uploads: int = 0
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    request: Callable[[Context], Awaitable[httpx.Response]]
+    expected_status: int = 200
+    # Share of --requests to run; bcrypt-bound routes are orders of magnitude slower
+    weight: float = 1.0
+
+
+def make_png(seed: int, width: int = 400, height: int = 300) -> bytes:
+    """A small valid PNG whose content, and so its sha256, differs per seed."""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    row = b"\x00" + bytes(x % 256 for x in range(width * 3))
+    first_row = b"\x00" + struct.pack(">Q", seed) + row[9:]
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(first_row + row * (height - 1)))
+        + chunk(b"IEND", b"")
+    )
+
+async def login(context: Context) -> httpx.Response:
+    return await context.client.post("/login", json={"username": context.username, "password": context.password})
+
+async def refresh(context: Context) -> httpx.Response:
+    # The cookie is Secure, so send it explicitly for plain-http targets
+    return await context.client.post("/refresh", headers={"Cookie": f"refresh_token={context.refresh_token}"})
+
+async def list_content(context: Context) -> httpx.Response:
+    return await context.client.get("/content/", headers=context.headers)
+
+async def get_content(context: Context) -> httpx.Response:
+    return await context.client.get(f"/content/{context.article_id}", headers=context.headers)
+
+async def create_content(context: Context) -> httpx.Response:
+    # Distinct titles: concurrent requests for one title contend on its slug by design
+    response = await context.client.post(
+        "/content/",
+        headers=context.headers,
+        data={"title": f"Load benchmark {time.time_ns()}", "content": "Lorem ipsum dolor sit amet. " * 40},
+    )
+    if response.status_code == 200:
+        context.created_ids.append(response.json()["data"]["id"])
+    return response
+
+async def create_content_with_upload(context: Context) -> httpx.Response:
+    context.uploads += 1
+    response = await context.client.post(
+        "/content/",
+        headers=context.headers,
+        data={"title": f"Load benchmark upload {context.uploads}", "content": "Lorem ipsum dolor sit amet. " * 40},
+        files={"thumbnail": ("thumbnail.png", make_png(time.time_ns() + context.uploads), "image/png")},
+    )
+    if response.status_code == 200:
+        context.created_ids.append(response.json()["data"]["id"])
+    return response
+
+async def list_users(context: Context) -> httpx.Response:
+    return await context.client.get("/users/", headers=context.headers)
+
+SCENARIOS = [
+    Scenario("login", login, weight=0.1),
+    Scenario("refresh", refresh),
+    Scenario("list_content", list_content),
+    Scenario("get_content", get_content),
+    Scenario("create_content", create_content),
+    Scenario("create_content_upload", create_content_with_upload, weight=0.25),
+    Scenario("list_users", list_users),
+]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(percentiles[49] * 1e3, 2),
+        "p95_ms": round(percentiles[94] * 1e3, 2),
+        "p99_ms": round(percentiles[98] * 1e3, 2),
+    }
+
+async def measure(scenario: Scenario, context: Context, requests: int, concurrency: int) -> dict:
+    for _ in range(WARMUP_REQUESTS):
+        await scenario.request(context)
+
+    latencies = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await scenario.request(context)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != scenario.expected_status:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+async def prepare(context: Context):
+    response = await login(context)
+    response.raise_for_status()
+    context.headers = {"Authorization": f"Bearer {response.json()['data']['access_token']}"}
+    context.refresh_token = response.cookies["refresh_token"]
+
+    response = await create_content(context)
+    response.raise_for_status()
+    context.article_id = context.created_ids[0]
+
+async def cleanup(context: Context):
+    for article_id in context.created_ids:
+        await context.client.delete(f"/content/{article_id}/permanently", headers=context.headers)
+
+def create_benchmark_user() -> tuple[Optional[int], int]:
+    """Temporary admin for in-process runs: (role id if the role was created, user id)."""
+    from sqlalchemy import select
+
+    from app.core.database import Session
+    from app.core.security import get_password_hash
+    from app.models import Role, User
+
+    with Session() as db:
+        role = db.scalars(select(Role).filter_by(name="admin").limit(1)).first()
+        created_role_id = None
+        if role is None:
+            role = Role(name="admin")
+            db.add(role)
+            db.flush()
+            created_role_id = role.id
+        user = User(
+            username=BENCHMARK_USERNAME, name="Load Benchmark",
+            password=get_password_hash(BENCHMARK_PASSWORD), role_id=role.id,
+        )
+        db.add(user)
+        db.commit()
+        return created_role_id, user.id
+
+def delete_benchmark_user(role_id: Optional[int], user_id: int):
+    from sqlalchemy import delete
+
+    from app.core.database import Session
+    from app.models import Article, Role, User
+
+    with Session() as db:
+        db.execute(delete(Article).where(Article.author_id == user_id))
+        db.execute(delete(User).where(User.id == user_id))
+        if role_id is not None:
+            db.execute(delete(Role).where(Role.id == role_id))
+        db.commit()
+
+async def run(args) -> dict:
+    async with AsyncExitStack() as stack:
+        if args.url:
+            client = httpx.AsyncClient(base_url=args.url, timeout=60)
+            username, password = args.username, args.password
+        else:
+            from app.main import app
+
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=60)
+            username, password = BENCHMARK_USERNAME, BENCHMARK_PASSWORD
+        await stack.enter_async_context(client)
+
+        context = Context(client=client, username=username, password=password)
+        await prepare(context)
+        results = {}
+        try:
+            for scenario in SCENARIOS:
+                if args.scenario and scenario.name not in args.scenario:
+                    continue
+                requests = max(int(args.requests * scenario.weight), 2)
+                results[scenario.name] = await measure(scenario, context, requests, args.concurrency)
+                print(format_row(scenario.name, results[scenario.name]), flush=True)
+        finally:
+            await cleanup(context)
+
+    return {
+        "meta": {
+            "target": args.url or "in-process",
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "recorded_at": datetime.now(UTC).isoformat(timespec="seconds"),
+        },
+        "scenarios": results,
+    }
+
+def format_row(name: str, result: dict) -> str:
+    return (
+        f"{name:<24}{result['throughput']:>10.1f} req/s  p50 {result['p50_ms']:>8.2f} ms  "
+        f"p95 {result['p95_ms']:>8.2f} ms  p99 {result['p99_ms']:>8.2f} ms  errors {result['errors']}"
+    )
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """Regressions of current against baseline, as printable lines."""
+    regressions = []
+    for name, base in baseline["scenarios"].items():
+        result = current["scenarios"].get(name)
+        if result is None:
+            continue
+        if result["errors"]:
+            regressions.append(f"{name}: {result['errors']} failed requests")
+        if result["throughput"] < base["throughput"] * (1 - threshold):
+            regressions.append(f"{name}: throughput {base['throughput']:.1f} -> {result['throughput']:.1f} req/s")
+        for key in ("p95_ms", "p99_ms"):
+            if result[key] > base[key] * (1 + threshold):
+                regressions.append(f"{name}: {key[:3]} {base[key]:.2f} -> {result[key]:.2f} ms")
+    return regressions
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="bench_load", description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the scenarios and print (and optionally save) the results")
+    run_parser.add_argument("--url", help="base URL of a running server; in-process when omitted")
+    run_parser.add_argument("--username", default="admin", help="admin username for --url runs")
+    run_parser.add_argument("--password", default="admin123", help="admin password for --url runs")
+    run_parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS, help="measured requests per scenario")
+    run_parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    run_parser.add_argument("--scenario", action="append", choices=[scenario.name for scenario in SCENARIOS])
+    run_parser.add_argument("--output", help="write the results as JSON, e.g. to record a new baseline")
+
+    compare_parser = commands.add_parser("compare", help="exit non-zero if results regress against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("results")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="tolerated relative change")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        with open(args.baseline) as baseline_file, open(args.results) as results_file:
+            baseline, results = json.load(baseline_file), json.load(results_file)
+        if baseline["meta"]["target"] != results["meta"]["target"]:
+            print(f"warning: comparing {results['meta']['target']} against a {baseline['meta']['target']} baseline")
+        regressions = compare(baseline, results, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+        return 1 if regressions else 0
+
+    user = None if args.url else create_benchmark_user()
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        if user:
+            delete_benchmark_user(*user)
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+            output.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""Cost of rendering a 1,000-article list response.
+
+Compares the previous path (schema -> to_dict() -> stdlib json via
+JSONResponse) with passing the schema instances to Ok(), which encodes
+them with pydantic-core.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_response_serialization
+"""
+import timeit
+from datetime import datetime, UTC
+
+from fastapi.responses import JSONResponse
+from uuid_utils import uuid7
+
+from app.core.response import Ok
+from app.schemas.article import DetailArticle, DetailAuthor
+
+ARTICLES = 1000
+ITERATIONS = 20
+
+
+def make_articles() -> list[DetailArticle]:
+    now = datetime.now(UTC)
+    author = DetailAuthor(id=1, name="Benchmark Author")
+    return [
+        DetailArticle(
+            id=str(uuid7()),
+            title=f"Article {index}",
+            content="Lorem ipsum dolor sit amet. " * 40,
+            thumbnail_url=f"/static/{index:064x}.png",
+            created_at=now,
+            updated_at=now,
+            author=author,
+        )
+        for index in range(ARTICLES)
+    ]
+
+def render_dicts(articles: list[DetailArticle]) -> bytes:
+    data = {"items": [article.to_dict() for article in articles], "next_cursor": None}
+    return JSONResponse(content={"status": "success", "message": "Articles retrieved successfully", "data": data}).body
+
+def render_models(articles: list[DetailArticle]) -> bytes:
+    data = {"items": articles, "next_cursor": None}
+    return Ok(data=data, message="Articles retrieved successfully").json().body
+
+def bench(render, articles: list[DetailArticle]) -> float:
+    return min(timeit.repeat(lambda: render(articles), number=ITERATIONS, repeat=5)) / ITERATIONS
+
+def main():
+    articles = make_articles()
+
+    dicts = bench(render_dicts, articles)
+    models = bench(render_models, articles)
+
+    print(f"to_dict + json.dumps: {dicts * 1e3:8.2f} ms/response")
+    print(f"pydantic-core:        {models * 1e3:8.2f} ms/response ({dicts / models:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Round trips and latency of Article.generate_slug with 10k same-title articles.
+
+Compares the allocator against the previous probe-per-candidate loop. Rows are
+inserted into the configured database and removed afterwards.
+
+    python -m benchmarks.bench_slug_allocation
+"""
+import time
+
+from slugify import slugify
+from sqlalchemy import event, insert, delete
+
+from app.core.database import Session, engine
+from app.models import Article, User, Role
+
+ARTICLES = 10000
+TITLE = "Slug benchmark weekly update"
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args):
+        self.count += 1
+
+
+def legacy_generate_slug(article: Article, db) -> str:
+    base_slug = slugify(article.title)
+    slug = base_slug
+    counter = 1
+
+    while db.query(Article).filter(Article.slug == slug).first() is not None:
+        slug = f"{base_slug}-{counter}"
+        counter += 1
+
+    return slug
+
+def measure(db, fn) -> tuple[str, int, float]:
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        start = time.perf_counter()
+        slug = fn(Article(title=TITLE), db)
+        elapsed = time.perf_counter() - start
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+    return slug, counter.count, elapsed
+
+def main():
+    db = Session()
+    role = Role(name="slug-benchmark")
+    db.add(role)
+    db.flush()
+    author = User(username="slug-benchmark", name="Slug Benchmark", password="-", role_id=role.id)
+    db.add(author)
+    db.flush()
+
+    base_slug = slugify(TITLE)
+    try:
+        db.execute(insert(Article), [
+            {
+                "title": TITLE,
+                "slug": base_slug if index == 0 else f"{base_slug}-{index}",
+                "content": "benchmark",
+                "author_id": author.id,
+            }
+            for index in range(ARTICLES)
+        ])
+        db.commit()
+
+        for name, fn in (("allocator", Article.generate_slug), ("legacy loop", legacy_generate_slug)):
+            slug, queries, elapsed = measure(db, fn)
+            print(f"{name:12} -> {slug}: {queries} queries, {elapsed * 1000:.1f} ms")
+    finally:
+        db.rollback()
+        db.execute(delete(Article).where(Article.author_id == author.id))
+        db.execute(delete(User).where(User.id == author.id))
+        db.execute(delete(Role).where(Role.id == role.id))
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Per-request cost of verify_and_decode_jwt with and without the token cache.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_token_cache
+"""
+import timeit
+
+from app.core.cache import token_cache
+from app.core.security import create_token, verify_and_decode_jwt
+from app.models import User
+
+ITERATIONS = 20000
+
+
+def bench_uncached(token: str) -> float:
+    def run():
+        token_cache.clear()
+        verify_and_decode_jwt(token)
+
+    return min(timeit.repeat(run, number=ITERATIONS, repeat=5)) / ITERATIONS
+
+def bench_cached(token: str) -> float:
+    verify_and_decode_jwt(token)
+    return min(timeit.repeat(lambda: verify_and_decode_jwt(token), number=ITERATIONS, repeat=5)) / ITERATIONS
+
+def main():
+    token = create_token(User(id=1, token_version=0))
+
+    uncached = bench_uncached(token)
+    cached = bench_cached(token)
+
+    print(f"uncached: {uncached * 1e6:8.2f} us/request")
+    print(f"cached:   {cached * 1e6:8.2f} us/request ({uncached / cached:.1f}x faster)")
+    print(f"cache:    {token_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
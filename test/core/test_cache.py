@@ -0,0 +1,101 @@
+import os
+from unittest.mock import patch
+
+from app.core.cache import TTLCache, FileCache, create_cache
+
+
+def test_get_and_set():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+def test_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+@patch("app.core.cache.time.monotonic")
+def test_entries_expire(mock_monotonic):
+    mock_monotonic.return_value = 100.0
+    cache = TTLCache(maxsize=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=30)
+
+    mock_monotonic.return_value = 111.0
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+
+def test_delete_and_clear():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    cache.delete("a")
+    assert cache.get("a") is None
+    assert len(cache) == 1
+
+    cache.clear()
+    assert len(cache) == 0
+
+def test_file_cache_shared_between_instances(tmp_path):
+    writer = FileCache(str(tmp_path), maxsize=10, ttl=60)
+    reader = FileCache(str(tmp_path), maxsize=10, ttl=60)
+    writer.set("a", b"etag\npayload")
+
+    assert reader.get("a") == b"etag\npayload"
+    assert reader.get("b") is None
+    assert reader.stats()["hits"] == 1
+    assert reader.stats()["misses"] == 1
+
+    writer.delete("a")
+    assert reader.get("a") is None
+
+def test_file_cache_ignores_truncated_entries(tmp_path):
+    cache = FileCache(str(tmp_path), maxsize=10, ttl=60)
+    with open(cache._path("a"), "wb") as file:
+        file.write(b"abc")
+
+    assert cache.get("a") is None
+    assert cache.stats()["misses"] == 1
+
+@patch("app.core.cache.time.time")
+def test_file_cache_entries_expire(mock_time, tmp_path):
+    mock_time.return_value = 100.0
+    cache = FileCache(str(tmp_path), maxsize=10, ttl=10)
+    cache.set("a", b"1")
+
+    mock_time.return_value = 111.0
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+def test_file_cache_prune(tmp_path):
+    cache = FileCache(str(tmp_path), maxsize=2, ttl=60)
+    for index, key in enumerate(("a", "b", "c")):
+        cache.set(key, key.encode())
+        os.utime(cache._path(key), (index, index))
+
+    cache.prune()
+
+    assert cache.get("a") is None
+    assert cache.get("c") == b"c"
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size"] == 2
+
+def test_create_cache(tmp_path):
+    assert isinstance(create_cache("memory", maxsize=1, ttl=1), TTLCache)
+    assert isinstance(create_cache("file", maxsize=1, ttl=1, directory=str(tmp_path)), FileCache)
+
+    disabled = create_cache("none", maxsize=1, ttl=1)
+    disabled.set("a", 1)
+    assert disabled.get("a") is None
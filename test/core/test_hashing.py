@@ -0,0 +1,69 @@
+import asyncio
+import os
+import time
+
+import pytest
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+from app.core.hashing import PasswordHasher, hash_password, verify_and_update
+
+def test_verify_and_update():
+    current = hash_password("secret")
+
+    assert verify_and_update("secret", current) == (True, None)
+    assert verify_and_update("wrong", current) == (False, None)
+    assert verify_and_update("secret", "not-a-hash") == (False, None)
+
+def test_verify_and_update_rehashes_weaker_hash():
+    weak = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("secret")
+
+    valid, new_hash = verify_and_update("secret", weak)
+
+    assert valid
+    assert new_hash.startswith("$2b$12$")
+    assert verify_and_update("secret", new_hash) == (True, None)
+
+def test_password_hasher_rejects_when_saturated():
+    hasher = PasswordHasher(workers=0, queue_depth=1)
+
+    async def burst():
+        return await asyncio.gather(*(hasher._run(time.sleep, 0.2) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(burst())
+
+    rejected = [result for result in results if isinstance(result, HTTPException)]
+    assert len(rejected) == 1
+    assert rejected[0].status_code == 503
+    assert rejected[0].headers == {"Retry-After": "1"}
+
+    stats = hasher.stats()
+    assert stats["completed"] == 2
+    assert stats["rejected"] == 1
+    assert stats["in_flight"] == 0
+    assert stats["p50_ms"] >= 200
+
+@pytest.mark.parametrize("workers", [0, 1])
+def test_password_hasher(workers):
+    hasher = PasswordHasher(workers=workers, queue_depth=4)
+    try:
+        hashed = asyncio.run(hasher.hash("secret"))
+
+        assert asyncio.run(hasher.verify("secret", hashed)) == (True, None)
+        assert asyncio.run(hasher.verify("wrong", hashed)) == (False, None)
+    finally:
+        hasher.shutdown()
+
+def test_password_hasher_replaces_broken_pool():
+    hasher = PasswordHasher(workers=1, queue_depth=4)
+    try:
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(hasher._run(os._exit, 1))
+
+        assert error.value.status_code == 503
+        assert hasher._executor is None
+
+        assert asyncio.run(hasher.verify("secret", hash_password("secret"))) == (True, None)
+        assert hasher.stats()["completed"] == 1
+    finally:
+        hasher.shutdown()
@@ -0,0 +1,44 @@
+from datetime import datetime, UTC
+
+from starlette.requests import Request
+
+from app.core.http_cache import make_etag, http_date, is_not_modified
+
+UPDATED_AT = datetime(2024, 5, 6, 7, 8, 9, 123456, tzinfo=UTC)
+
+
+def make_request(**headers) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "headers": [(name.replace("_", "-").lower().encode(), value.encode()) for name, value in headers.items()],
+    })
+
+def test_make_etag():
+    etag = make_etag("id", UPDATED_AT)
+
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == make_etag("id", UPDATED_AT)
+    assert etag != make_etag("id", UPDATED_AT.replace(microsecond=0))
+
+def test_if_none_match():
+    etag = make_etag("id")
+
+    assert is_not_modified(make_request(if_none_match=etag), etag)
+    assert is_not_modified(make_request(if_none_match=f'"other", W/{etag}'), etag)
+    assert is_not_modified(make_request(if_none_match="*"), etag)
+    assert not is_not_modified(make_request(if_none_match='"other"'), etag)
+    assert not is_not_modified(make_request(), etag)
+
+def test_if_modified_since():
+    etag = make_etag("id")
+
+    assert http_date(UPDATED_AT) == "Mon, 06 May 2024 07:08:09 GMT"
+    assert is_not_modified(make_request(if_modified_since=http_date(UPDATED_AT)), etag, UPDATED_AT)
+    assert not is_not_modified(make_request(if_modified_since="Mon, 06 May 2024 07:08:08 GMT"), etag, UPDATED_AT)
+    assert not is_not_modified(make_request(if_modified_since="not a date"), etag, UPDATED_AT)
+
+def test_if_none_match_takes_precedence():
+    request = make_request(if_none_match='"other"', if_modified_since=http_date(UPDATED_AT))
+
+    assert not is_not_modified(request, make_etag("id"), UPDATED_AT)
@@ -0,0 +1,36 @@
+import os
+
+from PIL import Image
+
+from app.core.images import generate_variants, variant_path
+
+
+def make_image(path, width, height, mode="RGB"):
+    Image.new(mode, (width, height), color=0).save(path, format="PNG")
+    return str(path)
+
+def test_variant_path(tmp_path):
+    source = os.path.join(tmp_path, "abc.png")
+
+    assert variant_path(source, 320) == os.path.join(tmp_path, "abc-320w.webp")
+
+def test_generate_variants(tmp_path):
+    source = make_image(tmp_path / "large.png", 1000, 500)
+
+    variants = generate_variants(source)
+
+    assert [variant["width"] for variant in variants] == [320, 640]
+    for variant in variants:
+        assert variant["format"] == "webp"
+        assert variant["size"] == os.path.getsize(variant["file_path"])
+        with Image.open(variant["file_path"]) as image:
+            assert image.format == "WEBP"
+            assert image.width == variant["width"]
+            assert image.height == variant["width"] // 2
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".part")]
+
+def test_generate_variants_small_image(tmp_path):
+    source = make_image(tmp_path / "small.png", 200, 200, mode="P")
+
+    assert generate_variants(source) == []
+    assert os.listdir(tmp_path) == ["small.png"]
@@ -0,0 +1,35 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from app.core.ndjson import NDJSONError, iter_ndjson
+
+
+def decode(*chunks: bytes):
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    async def collect():
+        return [value async for value in iter_ndjson(stream())]
+
+    return asyncio.run(collect())
+
+def test_lines_split_across_chunks():
+    chunks = [b'{"a"', b': 1', b'}\n\n{"b":', b' [1, ', b'2]}\n3']
+
+    assert decode(*chunks) == [(1, {"a": 1}), (3, {"b": [1, 2]}), (4, 3)]
+
+def test_single_byte_chunks():
+    body = b'{"title": "one"}\n{"title": "two"}\n'
+
+    assert decode(*(body[index:index + 1] for index in range(len(body)))) == [
+        (1, {"title": "one"}),
+        (2, {"title": "two"}),
+    ]
+
+@patch("app.core.ndjson.MAX_LINE_SIZE", 8)
+def test_line_too_long():
+    with pytest.raises(NDJSONError, match="Line 2: line is too long"):
+        decode(b"1\n", b"[1, 2, ", b"3, 4]")
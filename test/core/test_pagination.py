@@ -0,0 +1,15 @@
+import pytest
+
+from app.core.pagination import encode_cursor, decode_cursor
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(0.0607927, "01890a5d-ac96-774b-bcce-b302099a8057")
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, 2) == [0.0607927, "01890a5d-ac96-774b-bcce-b302099a8057"]
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor(1), encode_cursor(1, 2, 3), "e30"])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, 2)
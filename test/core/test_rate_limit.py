@@ -0,0 +1,89 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.database import Session, async_engine, engine
+from app.core.rate_limit import MemoryRateLimiter, PostgresRateLimiter, check_login_attempt, create_rate_limiter
+from app.models import RateLimitBucket
+from app.models.base import Base
+
+
+@patch("app.core.rate_limit.time.monotonic")
+def test_memory_limiter_burst_and_refill(mock_monotonic):
+    mock_monotonic.return_value = 100.0
+    limiter = MemoryRateLimiter(maxsize=10)
+
+    results = [asyncio.run(limiter.acquire("key", burst=3, per_minute=6)) for _ in range(4)]
+
+    assert results[:3] == [None, None, None]
+    assert results[3] == pytest.approx(10.0)
+    assert asyncio.run(limiter.acquire("other", burst=3, per_minute=6)) is None
+
+    # One token comes back every 10 seconds
+    mock_monotonic.return_value = 110.0
+    assert asyncio.run(limiter.acquire("key", burst=3, per_minute=6)) is None
+    assert asyncio.run(limiter.acquire("key", burst=3, per_minute=6)) == pytest.approx(10.0)
+    assert limiter.stats() == {"backend": "memory", "keys": 2, "allowed": 5, "rejected": 2}
+
+    asyncio.run(limiter.reset("key"))
+    assert asyncio.run(limiter.acquire("key", burst=3, per_minute=6)) is None
+
+def test_memory_limiter_is_bounded():
+    limiter = MemoryRateLimiter(maxsize=2)
+    for key in ("a", "b", "c"):
+        asyncio.run(limiter.acquire(key, burst=1, per_minute=1))
+
+    assert limiter.stats()["keys"] == 2
+    # "a" was dropped, so it starts with a full bucket again
+    assert asyncio.run(limiter.acquire("a", burst=1, per_minute=1)) is None
+    assert asyncio.run(limiter.acquire("c", burst=1, per_minute=1)) is not None
+
+def test_postgres_limiter():
+    Base.metadata.create_all(bind=engine)
+    limiter = PostgresRateLimiter()
+
+    async def scenario():
+        # One event loop for the whole test, since the pooled asyncpg connections are bound to it
+        try:
+            results = await asyncio.gather(*(limiter.acquire("user:postgres", burst=3, per_minute=1) for _ in range(5)))
+            await limiter.reset("user:postgres")
+            return results, await limiter.acquire("user:postgres", burst=3, per_minute=1)
+        finally:
+            await async_engine.dispose()
+
+    try:
+        results, after_reset = asyncio.run(scenario())
+
+        assert results.count(None) == 3
+        assert all(55 < retry_after <= 60 for retry_after in results if retry_after is not None)
+        assert limiter.stats()["rejected"] == 2
+        assert after_reset is None
+    finally:
+        with Session() as db:
+            db.query(RateLimitBucket).delete()
+            db.commit()
+
+def test_check_login_attempt():
+    limiter = MemoryRateLimiter(maxsize=10)
+    with patch("app.core.rate_limit.login_rate_limiter", limiter), \
+            patch("app.core.rate_limit.settings.LOGIN_USERNAME_BURST", 2), \
+            patch("app.core.rate_limit.settings.LOGIN_IP_BURST", 3):
+        asyncio.run(check_login_attempt("alice", "10.0.0.1"))
+        asyncio.run(check_login_attempt("alice", "10.0.0.1"))
+
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(check_login_attempt("alice", "10.0.0.1"))
+        assert error.value.status_code == 429
+        assert int(error.value.headers["Retry-After"]) >= 1
+
+        # The client's own budget runs out regardless of the username
+        with pytest.raises(HTTPException):
+            asyncio.run(check_login_attempt("bob", "10.0.0.1"))
+        asyncio.run(check_login_attempt("bob", "10.0.0.2"))
+
+def test_create_rate_limiter():
+    assert asyncio.run(create_rate_limiter("none", 0).acquire("key", burst=1, per_minute=1)) is None
+    with pytest.raises(ValueError):
+        create_rate_limiter("redis", 0)
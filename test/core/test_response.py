@@ -1,7 +1,12 @@
+from datetime import datetime, UTC
+from uuid import UUID
+
 import pytest
 from fastapi.responses import JSONResponse
 from fastapi import HTTPException
-from app.core.response import Ok, Created, BadRequest, Unauthorized, InternalServerError, Forbidden, NotFound
+from pydantic import BaseModel
+from app.core.response import Ok, Created, BadRequest, Unauthorized, InternalServerError, Forbidden, NotFound, FastJSONResponse
+from app.schemas.base import CursorPage
 
 
 def test_ok_response():
@@ -10,6 +15,20 @@ def test_ok_response():
     assert response.status_code == 200
     assert response.body == b'{"status":"success","message":"OK","data":{"id":1}}'
 
+def test_ok_response_serializes_models():
+    class Item(BaseModel):
+        id: UUID
+        created_at: datetime
+
+    item = Item(id=UUID("01890a5d-ac96-774b-bcce-b302099a8057"), created_at=datetime(2024, 1, 2, 3, 4, 5, tzinfo=UTC))
+    response = Ok(data=CursorPage[Item](items=[item]), message="OK").json()
+
+    assert isinstance(response, FastJSONResponse)
+    assert response.body == (
+        b'{"status":"success","message":"OK","data":{"items":[{"id":"01890a5d-ac96-774b-bcce-b302099a8057",'
+        b'"created_at":"2024-01-02T03:04:05Z"}],"next_cursor":null}}'
+    )
+
 def test_created_response():
     response = Created(data={"id": 1}).json()
     assert isinstance(response, JSONResponse)
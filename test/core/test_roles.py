@@ -0,0 +1,109 @@
+import asyncio
+from unittest.mock import patch
+
+from app.core.config import settings
+from app.core.database import AsyncSession, Session, async_engine, clear_all_data_on_database, engine
+from app.core.roles import RoleRegistry
+from app.models import Role
+from app.models.base import Base
+import app.repository.role as role_repo
+
+
+def test_role_registry():
+    Base.metadata.create_all(bind=engine)
+    with Session() as db:
+        admin, editor = Role(name="admin"), Role(name="editor")
+        db.add_all([admin, editor])
+        db.commit()
+        admin_id, editor_id = admin.id, editor.id
+
+    registry = RoleRegistry()
+
+    async def scenario():
+        try:
+            async with AsyncSession() as db:
+                roles = await registry.roles(db)
+                unknown = await registry.get(db, editor_id + 100)
+                # Within MISS_RELOAD_SECONDS of the last miss, answered from the snapshot
+                await registry.get(db, editor_id + 101)
+                return roles, unknown
+        finally:
+            await async_engine.dispose()
+
+    try:
+        roles, unknown = asyncio.run(scenario())
+
+        assert [(role.id, role.name) for role in roles] == [(admin_id, "admin"), (editor_id, "editor")]
+        assert registry.is_admin(admin_id)
+        assert not registry.is_admin(editor_id)
+        assert unknown is None
+        # The initial load, then one reload for the unknown id
+        assert registry.reloads == 2
+    finally:
+        with Session() as db:
+            clear_all_data_on_database(db)
+
+def test_role_registry_follows_other_workers():
+    Base.metadata.create_all(bind=engine)
+    # Another worker's registry, kept up to date by notifications alone
+    registry = RoleRegistry()
+
+    async def scenario():
+        try:
+            await registry.start()
+            while not registry.listening or registry.reloads == 0:
+                await asyncio.sleep(0.01)
+
+            async with AsyncSession() as db:
+                role = Role(name="admin")
+                await role_repo.create_role(db, role)
+
+            for _ in range(500):
+                if registry.is_admin(role.id):
+                    break
+                await asyncio.sleep(0.01)
+            return role.id
+        finally:
+            await registry.stop()
+            await async_engine.dispose()
+
+    try:
+        role_id = asyncio.run(scenario())
+
+        assert registry.is_admin(role_id)
+        assert registry.stats()["roles"] == 1
+        assert not registry.listening
+    finally:
+        with Session() as db:
+            clear_all_data_on_database(db)
+
+@patch.object(settings, "ROLE_REGISTRY_REFRESH_SECONDS", 0.05)
+def test_role_registry_refreshes_without_listener():
+    Base.metadata.create_all(bind=engine)
+    registry = RoleRegistry()
+    # A listener that never manages to connect
+    registry._listen = lambda: asyncio.Event().wait()
+
+    async def scenario():
+        try:
+            await registry.start()
+            async with AsyncSession() as db:
+                db.add(Role(name="admin"))
+                await db.commit()
+
+            for _ in range(200):
+                if registry.stats()["roles"] == 1:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await registry.stop()
+            await async_engine.dispose()
+
+    try:
+        asyncio.run(scenario())
+
+        assert registry.stats()["roles"] == 1
+        assert not registry.listening
+    finally:
+        with Session() as db:
+            clear_all_data_on_database(db)
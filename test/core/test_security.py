@@ -1,17 +1,21 @@
+import asyncio
 from datetime import timedelta
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from fastapi import HTTPException
 import jwt
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import user_cache, token_version_cache, token_cache
 from app.core.config import settings
+from app.core.roles import role_registry
 from app.core.security import (
     verify_password,
     get_password_hash,
     create_token,
     get_user_from_token,
+    verify_and_decode_jwt,
 )
 from app.models import User, Role
 
@@ -32,10 +36,29 @@ mock_role = Role(
 mock_user = User(
     id=TEST_USER_ID,
     username=TEST_USERNAME,
+    name="Test User",
     password=TEST_HASHED_PASSWORD,
+    role_id=mock_role.id,
+    token_version=0,
     role=mock_role
 )
 
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    user_cache.clear()
+    token_version_cache.clear()
+    token_cache.clear()
+    yield
+    user_cache.clear()
+    token_version_cache.clear()
+    token_cache.clear()
+
+@pytest.fixture(autouse=True)
+def role_registry_get():
+    # The registry would query the mocked session for the user's role
+    with patch.object(role_registry, "get", new_callable=AsyncMock) as get:
+        yield get
+
 def test_verify_password():
     assert verify_password(TEST_PASSWORD, TEST_HASHED_PASSWORD) is True
 
@@ -58,47 +81,118 @@ def test_create_token():
     payload = jwt.decode(token_with_expiry, TEST_SECRET_KEY, algorithms=[TEST_ALGORITHM])
     assert "exp" in payload
 
-@patch('app.core.security.get_user_by_id')
+@patch('app.core.security.get_user_by_id', new_callable=AsyncMock)
 def test_get_current_user_valid_token(mock_get_user):
     valid_token = create_token(mock_user)
 
     mock_get_user.return_value = mock_user
 
-    mock_db = MagicMock(spec=Session)
-    user = get_user_from_token(mock_db, valid_token)
+    mock_db = MagicMock(spec=AsyncSession)
+    user = asyncio.run(get_user_from_token(mock_db, valid_token))
 
-    assert user == mock_user
     assert user.id == TEST_USER_ID
     assert user.username == TEST_USERNAME
 
-    mock_get_user.assert_called_once_with(mock_db, TEST_USER_ID)
+    mock_get_user.assert_awaited_once_with(mock_db, TEST_USER_ID)
 
-@patch('app.core.security.get_user_by_id')
+@patch('app.core.security.get_user_by_id', new_callable=AsyncMock)
 def test_get_current_user_invalid_token(mock_get_user):
     invalid_token = "invalid.token.string"
 
-    mock_db = MagicMock(spec=Session)
+    mock_db = MagicMock(spec=AsyncSession)
 
     with pytest.raises(HTTPException) as exc_info:
-        get_user_from_token(mock_db, invalid_token)
+        asyncio.run(get_user_from_token(mock_db, invalid_token))
 
     assert exc_info.value.status_code == 401
     assert exc_info.value.detail == {"status": "error", "message": "Could not validate credentials"}
 
     mock_get_user.assert_not_called()
 
-@patch('app.core.security.get_user_by_id')
+@patch('app.core.security.get_user_by_id', new_callable=AsyncMock)
 def test_get_current_user_user_not_found(mock_get_user):
     valid_token = create_token(mock_user)
 
     mock_get_user.return_value = None
 
-    mock_db = MagicMock(spec=Session)
+    mock_db = MagicMock(spec=AsyncSession)
 
     with pytest.raises(HTTPException) as exc_info:
-        get_user_from_token(mock_db, valid_token)
+        asyncio.run(get_user_from_token(mock_db, valid_token))
 
     assert exc_info.value.status_code == 401
     assert exc_info.value.detail == {"status": "error", "message": "Could not validate credentials"}
 
-    mock_get_user.assert_called_once_with(mock_db, TEST_USER_ID)
\ No newline at end of file
+    mock_get_user.assert_awaited_once_with(mock_db, TEST_USER_ID)
+
+@patch('app.core.security.get_user_by_id', new_callable=AsyncMock)
+def test_get_current_user_cached(mock_get_user):
+    valid_token = create_token(mock_user)
+
+    mock_get_user.return_value = mock_user
+
+    mock_db = MagicMock(spec=AsyncSession)
+    first = asyncio.run(get_user_from_token(mock_db, valid_token))
+    second = asyncio.run(get_user_from_token(mock_db, valid_token))
+
+    assert first == second
+    assert second.role.name == "admin"
+    mock_get_user.assert_awaited_once_with(mock_db, TEST_USER_ID)
+
+@patch('app.core.security.get_user_token_version', new_callable=AsyncMock)
+@patch('app.core.security.get_user_by_id', new_callable=AsyncMock)
+def test_get_current_user_stateless(mock_get_user, mock_get_token_version):
+    with patch.object(settings, "JWT_STATELESS_AUTH", True):
+        valid_token = create_token(mock_user)
+
+        mock_get_token_version.return_value = 0
+
+        mock_db = MagicMock(spec=AsyncSession)
+        user = asyncio.run(get_user_from_token(mock_db, valid_token))
+
+    assert user.id == TEST_USER_ID
+    assert user.role.name == "admin"
+    mock_get_user.assert_not_awaited()
+
+@patch('app.core.security.get_user_token_version', new_callable=AsyncMock)
+def test_get_current_user_stateless_revoked(mock_get_token_version):
+    with patch.object(settings, "JWT_STATELESS_AUTH", True):
+        valid_token = create_token(mock_user)
+
+        mock_get_token_version.return_value = 1
+
+        mock_db = MagicMock(spec=AsyncSession)
+        with pytest.raises(HTTPException) as exc_info:
+            asyncio.run(get_user_from_token(mock_db, valid_token))
+
+    assert exc_info.value.status_code == 401
+
+def test_verify_and_decode_jwt_cached():
+    valid_token = create_token(mock_user)
+
+    with patch('app.core.security.jwt.decode', wraps=jwt.decode) as mock_decode:
+        first = verify_and_decode_jwt(valid_token)
+        second = verify_and_decode_jwt(valid_token)
+
+    assert first == second
+    mock_decode.assert_called_once()
+    assert token_cache.stats()["hits"] >= 1
+
+def test_verify_and_decode_jwt_cached_token_expires():
+    valid_token = create_token(mock_user, expires_delta=timedelta(minutes=5))
+    payload = verify_and_decode_jwt(valid_token)
+
+    with patch('app.core.security.time.time', return_value=payload["exp"] + 1):
+        with pytest.raises(HTTPException) as exc_info:
+            verify_and_decode_jwt(valid_token)
+
+    assert exc_info.value.status_code == 401
+
+def test_verify_and_decode_jwt_cached_token_type():
+    access_token = create_token(mock_user)
+    verify_and_decode_jwt(access_token)
+
+    with pytest.raises(HTTPException) as exc_info:
+        verify_and_decode_jwt(access_token, is_refresh=True)
+
+    assert exc_info.value.detail == {"status": "error", "message": "Invalid token type"}
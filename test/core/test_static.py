@@ -0,0 +1,89 @@
+import hashlib
+import os
+
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+
+from app.core.static import UploadStaticFiles, IMMUTABLE_CACHE_CONTROL
+
+CONTENT = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 4
+HASHED_NAME = f"{hashlib.sha256(CONTENT).hexdigest()}.png"
+
+
+def make_client(directory, **options) -> TestClient:
+    app = Starlette(routes=[Mount("/static", UploadStaticFiles(directory=str(directory), **options))])
+    return TestClient(app)
+
+@pytest.fixture
+def upload_dir(tmp_path):
+    for name in (HASHED_NAME, "legacy.png"):
+        with open(os.path.join(tmp_path, name), "wb") as file:
+            file.write(CONTENT)
+    return tmp_path
+
+def test_hashed_upload_is_immutable(upload_dir):
+    client = make_client(upload_dir)
+
+    response = client.get(f"/static/{HASHED_NAME}")
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+
+    etag = response.headers["etag"]
+    assert etag == f'"{HASHED_NAME.removesuffix(".png")}"'
+
+    response = client.get(f"/static/{HASHED_NAME}", headers={"If-None-Match": '"stale"'})
+    assert response.status_code == 304
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert response.headers["etag"] == etag
+
+def test_legacy_upload_is_revalidated(upload_dir):
+    client = make_client(upload_dir)
+
+    response = client.get("/static/legacy.png")
+    assert response.status_code == 200
+    assert "cache-control" not in response.headers
+
+    response = client.get("/static/legacy.png", headers={"If-None-Match": '"stale"'})
+    assert response.status_code == 200
+
+def test_partial_uploads_are_hidden(upload_dir):
+    with open(os.path.join(upload_dir, ".upload-abc.part"), "wb") as file:
+        file.write(CONTENT)
+    client = make_client(upload_dir)
+
+    assert client.get("/static/.upload-abc.part").status_code == 404
+
+def test_range_request(upload_dir):
+    client = make_client(upload_dir)
+
+    response = client.get(f"/static/{HASHED_NAME}", headers={"Range": "bytes=8-15"})
+    assert response.status_code == 206
+    assert response.content == CONTENT[8:16]
+    assert response.headers["content-range"] == f"bytes 8-15/{len(CONTENT)}"
+
+def test_accel_redirect(upload_dir):
+    client = make_client(upload_dir, sendfile_header="X-Accel-Redirect", accel_prefix="/internal/uploads/")
+
+    response = client.get(f"/static/{HASHED_NAME}")
+    assert response.status_code == 200
+    assert response.content == b""
+    assert response.headers["x-accel-redirect"] == f"/internal/uploads/{HASHED_NAME}"
+    assert response.headers["content-type"] == "image/png"
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+
+    response = client.get(f"/static/{HASHED_NAME}", headers={"If-Modified-Since": "Mon, 06 May 2024 07:08:09 GMT"})
+    assert response.status_code == 304
+    assert response.headers["etag"] == f'"{HASHED_NAME.removesuffix(".png")}"'
+
+def test_sendfile(upload_dir):
+    client = make_client(upload_dir, sendfile_header="X-Sendfile")
+
+    response = client.get("/static/legacy.png")
+    assert response.headers["x-sendfile"] == os.path.join(upload_dir, "legacy.png")
+
+def test_unsupported_sendfile_header(tmp_path):
+    with pytest.raises(ValueError):
+        UploadStaticFiles(directory=str(tmp_path), sendfile_header="X-Unknown")
@@ -0,0 +1,69 @@
+import hashlib
+import io
+import os
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.storage import write_upload, delete_uploaded_file, publish_stored_file, discard_stored_file
+
+PNG_BYTES = b"\x89PNG\r\n\x1a\n" + b"\x00" * 1024
+JPEG_BYTES = b"\xff\xd8\xff\xe0" + b"\x00" * 1024
+
+
+@pytest.fixture
+def upload_dir(tmp_path):
+    with patch("app.core.storage.UPLOAD_DIR", str(tmp_path)):
+        yield tmp_path
+
+def test_write_upload_png(upload_dir):
+    stored_file = write_upload(io.BytesIO(PNG_BYTES))
+    sha256 = hashlib.sha256(PNG_BYTES).hexdigest()
+
+    assert stored_file.content_type == "image/png"
+    assert stored_file.path == os.path.join(upload_dir, f"{sha256}.png")
+    assert stored_file.size == len(PNG_BYTES)
+    assert stored_file.sha256 == sha256
+    assert not os.path.exists(stored_file.path)
+
+    publish_stored_file(stored_file)
+    with open(stored_file.path, "rb") as file:
+        assert file.read() == PNG_BYTES
+    assert os.listdir(upload_dir) == [os.path.basename(stored_file.path)]
+
+def test_write_upload_same_content_same_path(upload_dir):
+    first = write_upload(io.BytesIO(JPEG_BYTES))
+    second = write_upload(io.BytesIO(JPEG_BYTES))
+
+    assert first.content_type == "image/jpeg"
+    assert first.path == second.path
+    assert first.temp_path != second.temp_path
+
+    publish_stored_file(first)
+    publish_stored_file(second)
+    assert os.listdir(upload_dir) == [os.path.basename(first.path)]
+
+def test_discard_stored_file(upload_dir):
+    stored_file = write_upload(io.BytesIO(PNG_BYTES))
+    discard_stored_file(stored_file)
+
+    assert os.listdir(upload_dir) == []
+
+def test_write_upload_rejects_unknown_type(upload_dir):
+    with pytest.raises(HTTPException) as exc_info:
+        write_upload(io.BytesIO(b"GIF89a" + b"\x00" * 16))
+
+    assert exc_info.value.status_code == 400
+    assert os.listdir(upload_dir) == []
+
+def test_write_upload_rejects_oversized_file(upload_dir):
+    with patch("app.core.storage.MAX_FILE_SIZE", 512), patch("app.core.storage.CHUNK_SIZE", 256):
+        with pytest.raises(HTTPException) as exc_info:
+            write_upload(io.BytesIO(PNG_BYTES))
+
+    assert exc_info.value.status_code == 400
+    assert os.listdir(upload_dir) == []
+
+def test_delete_uploaded_file_missing(upload_dir):
+    delete_uploaded_file(os.path.join(upload_dir, "missing.png"))
@@ -0,0 +1,208 @@
+"""EXPLAIN every hot repository query against a seeded dataset.
+
+Each case runs a real repository call, captures the statements it sends and
+asks Postgres for their plans. A sequential scan over one of HOT_TABLES,
+or a case that stops using its index from EXPECTED_INDEXES, fails the test.
+"""
+import asyncio
+import json
+from types import SimpleNamespace
+from uuid import UUID
+
+import pytest
+from sqlalchemy import event, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession as SQLAlchemyAsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from uuid_utils import uuid7
+
+from app.core.database import DATABASE_ASYNC_URL, Session, clear_all_data_on_database, engine
+from app.core.pagination import decode_cursor
+from app.models import Article, File, FileVariant, User, Role
+from app.models.base import Base
+from app.schemas.article import ArticleView
+from app.schemas.user import UserSort, UserStatus
+import app.repository.article as article_repo
+import app.repository.file as file_repo
+import app.repository.user as user_repo
+
+HOT_TABLES = {"articles", "users", "files", "file_variants"}
+
+USERS = 2000
+FILES = 2000
+ARTICLES = 20000
+PROLIFIC_ARTICLES = 2000
+SLUG_TITLE = "Plan regression"
+
+# NullPool: every test runs its own event loop, so connections must not be reused
+plan_engine = create_async_engine(DATABASE_ASYNC_URL, poolclass=NullPool)
+PlanSession = sessionmaker(bind=plan_engine, class_=SQLAlchemyAsyncSession, expire_on_commit=False)
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    Base.metadata.create_all(bind=engine)
+    db = Session()
+    clear_all_data_on_database(db)
+    try:
+        roles = db.execute(insert(Role).returning(Role.id), [{"name": f"plan-role-{index}"} for index in range(3)]).scalars().all()
+        users = db.execute(insert(User).returning(User.id), [
+            {"username": f"plan-user-{index}", "name": f"Plan User {index}", "password": "-", "role_id": roles[index % 3]}
+            for index in range(USERS)
+        ]).scalars().all()
+        files = db.execute(insert(File).returning(File.id), [
+            {"file_path": f"uploads/{index:064x}.png", "sha256": f"{index:064x}", "size": 1024}
+            for index in range(FILES)
+        ]).scalars().all()
+        db.execute(insert(FileVariant), [
+            {"file_id": file_id, "width": width, "format": "webp", "file_path": f"uploads/{file_id:064x}-{width}w.webp", "size": 512}
+            for file_id in files for width in (320, 640)
+        ])
+
+        prolific = users[0]
+        articles = []
+        for index in range(ARTICLES):
+            if index < 50:
+                slug = "plan-regression" if index == 0 else f"plan-regression-{index}"
+            else:
+                slug = f"plan-article-{index}"
+            articles.append({
+                "id": str(uuid7()),
+                "title": SLUG_TITLE if index < 50 else f"Plan article {index}",
+                "slug": slug,
+                "content": "Plan regression body",
+                "thumbnail_file_id": files[index % FILES] if index % 2 else None,
+                "author_id": prolific if index < PROLIFIC_ARTICLES else users[index % USERS],
+            })
+        db.execute(insert(Article), articles)
+        db.commit()
+
+        # VACUUM also flushes the GIN pending list, which would otherwise skew search costs
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("VACUUM ANALYZE"))
+
+        yield SimpleNamespace(
+            author_id=users[1],
+            prolific_author_id=prolific,
+            article_id=articles[PROLIFIC_ARTICLES // 2]["id"],
+            username=f"plan-user-{USERS // 2}",
+            user_id=users[USERS // 2],
+            role_id=roles[0],
+            file_id=files[1],
+            sha256=f"{1:064x}",
+        )
+    finally:
+        clear_all_data_on_database(db)
+        db.close()
+
+def collect_nodes(plan: dict) -> list[dict]:
+    nodes = [plan]
+    for child in plan.get("Plans", []):
+        nodes += collect_nodes(child)
+    return nodes
+
+async def explain(call) -> list[tuple[str, dict]]:
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE", "WITH")):
+            statements.append((statement, parameters))
+
+    event.listen(plan_engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        async with PlanSession() as db:
+            await call(db)
+    finally:
+        event.remove(plan_engine.sync_engine, "before_cursor_execute", capture)
+
+    plans = []
+    async with plan_engine.connect() as conn:
+        for statement, parameters in statements:
+            result = (await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)).scalar()
+            if isinstance(result, str):
+                result = json.loads(result)
+            plans.append((statement, result[0]["Plan"]))
+        await conn.rollback()
+    return plans
+
+async def release_referenced_file(db, data):
+    file = await file_repo.get_file_by_id(db, data.file_id)
+    await file_repo.release_file(db, file)
+
+async def allocate_slug(db, data):
+    await db.run_sync(Article(title=SLUG_TITLE).generate_slug)
+
+async def second_page(db, data):
+    _, cursor = await article_repo.get_articles(db, data.prolific_author_id)
+    article_id, = decode_cursor(cursor, 1)
+    await article_repo.get_articles(db, data.prolific_author_id, cursor=UUID(article_id))
+
+async def second_user_page(db, data, sort):
+    _, cursor = await user_repo.get_users(db, sort=sort)
+    await user_repo.get_users(db, cursor=user_repo.decode_user_cursor(cursor, sort), sort=sort)
+
+CASES = {
+    "get_articles": lambda db, data: article_repo.get_articles(db, data.author_id),
+    "get_articles_cursor": second_page,
+    "get_articles_summary": lambda db, data: article_repo.get_articles(db, data.author_id, view=ArticleView.SUMMARY),
+    "search_articles": lambda db, data: article_repo.search_articles(db, data.prolific_author_id, "1234"),
+    "get_article_version": lambda db, data: article_repo.get_article_version(db, data.article_id),
+    "get_article_by_id": lambda db, data: article_repo.get_article_by_id(db, data.article_id),
+    "get_article_by_id_db": lambda db, data: article_repo.get_article_by_id_db(db, data.article_id),
+    "generate_slug": allocate_slug,
+    "allocate_slugs": lambda db, data: article_repo.allocate_slugs(db, [SLUG_TITLE, "Unused title"]),
+    "get_user_by_id": lambda db, data: user_repo.get_user_by_id(db, data.user_id),
+    "get_user_by_username": lambda db, data: user_repo.get_user_by_username(db, data.username),
+    "get_user_token_version": lambda db, data: user_repo.get_user_token_version(db, data.user_id),
+    "get_users": lambda db, data: user_repo.get_users(db),
+    "get_users_cursor": lambda db, data: second_user_page(db, data, UserSort.ID_DESC),
+    "get_users_by_name": lambda db, data: second_user_page(db, data, UserSort.NAME),
+    "get_users_by_username": lambda db, data: second_user_page(db, data, UserSort.USERNAME_DESC),
+    "get_users_role": lambda db, data: user_repo.get_users(db, role_id=data.role_id),
+    "get_users_deleted": lambda db, data: user_repo.get_users(db, status=UserStatus.DELETED),
+    "get_users_username_prefix": lambda db, data: user_repo.get_users(db, username_prefix="plan-user-100"),
+    "get_file_by_id": lambda db, data: file_repo.get_file_by_id(db, data.file_id),
+    "get_file_by_sha256": lambda db, data: file_repo.get_file_by_sha256(db, data.sha256, for_update=True),
+    "get_file_variant_count": lambda db, data: file_repo.get_file_variant_count(db, data.file_id),
+    "release_file": release_referenced_file,
+}
+
+# Indexes a case must keep using; a plan that avoids them without a
+# sequential scan (e.g. walking the primary key with a filter) is still a regression.
+# A tuple lists interchangeable indexes, any one of which will do
+EXPECTED_INDEXES = {
+    "get_articles": {"ix_articles_author_id"},
+    "get_articles_summary": {"ix_articles_author_id"},
+    "generate_slug": {"ix_articles_slug_pattern"},
+    "allocate_slugs": {"ix_articles_slug_pattern"},
+    "search_articles": {"ix_articles_search_vector"},
+    "get_user_by_username": {("users_username_key", "ix_users_username_pattern")},
+    "get_users": {"users_pkey"},
+    "get_users_cursor": {"users_pkey"},
+    "get_users_by_name": {"ix_users_name_id"},
+    "get_users_by_username": {"users_username_key"},
+    "get_users_deleted": {"ix_users_deleted_id"},
+    "get_users_username_prefix": {"ix_users_username_pattern"},
+    "get_file_by_sha256": {"files_sha256_key"},
+    "get_file_variant_count": {"file_variants_file_id_width_format_key"},
+    "release_file": {"ix_articles_thumbnail_file_id"},
+}
+
+@pytest.mark.parametrize("name", CASES)
+def test_query_plan_uses_indexes(dataset, name):
+    plans = asyncio.run(explain(lambda db: CASES[name](db, dataset)))
+
+    assert plans, f"{name} issued no queries"
+    used_indexes = set()
+    for statement, plan in plans:
+        nodes = collect_nodes(plan)
+        scans = {node["Relation Name"] for node in nodes if node["Node Type"] == "Seq Scan"} & HOT_TABLES
+        assert not scans, f"{name} scans {', '.join(sorted(scans))} sequentially:\n{statement}"
+        used_indexes |= {node["Index Name"] for node in nodes if "Index Name" in node}
+
+    missing = [
+        " or ".join(expected) if isinstance(expected, tuple) else expected
+        for expected in EXPECTED_INDEXES.get(name, set())
+        if not used_indexes & set(expected if isinstance(expected, tuple) else (expected,))
+    ]
+    assert not missing, f"{name} no longer uses {', '.join(sorted(missing))}, plans use {sorted(used_indexes)}"
@@ -1,7 +1,12 @@
+from unittest.mock import patch
+
 import pytest
 from fastapi.testclient import TestClient
+from passlib.context import CryptContext
 
 from app.core.database import Session, clear_all_data_on_database
+from app.core.hashing import password_hasher
+from app.core.rate_limit import login_rate_limiter
 from app.core.security import get_password_hash
 from app.main import app
 from app.models import User, Role
@@ -10,6 +15,12 @@ from app.core.database import engine
 
 client = TestClient(app)
 
+@pytest.fixture(scope="module", autouse=True)
+def client_lifespan():
+    # Keep one event loop for the whole module so pooled asyncpg connections stay usable
+    with client:
+        yield
+
 @pytest.fixture
 def db():
     Base.metadata.create_all(bind=engine)
@@ -128,4 +139,59 @@ def test_logout():
     response = client.post("/logout")
 
     assert response.status_code == 200
-    assert response.json()["message"] == "Logout successful"
\ No newline at end of file
+    assert response.json()["message"] == "Logout successful"
+
+def test_login_rehashes_outdated_password(db: Session, role: Role):
+    weak_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("testpassword")
+    user = User(username="legacyuser", password=weak_hash, name="Legacy User", role_id=role.id)
+    db.add(user)
+    db.commit()
+
+    response = client.post("/login", json={"username": "legacyuser", "password": "testpassword"})
+    assert response.status_code == 200
+
+    db.refresh(user)
+    assert user.password != weak_hash
+    assert user.password.startswith("$2b$12$")
+
+    response = client.post("/login", json={"username": "legacyuser", "password": "testpassword"})
+    assert response.status_code == 200
+
+@patch("app.core.rate_limit.settings.LOGIN_USERNAME_BURST", 3)
+@patch("app.core.rate_limit.settings.LOGIN_USERNAME_PER_MINUTE", 1)
+def test_login_throttled_before_lookup(db: Session, user: User):
+    login_rate_limiter.clear()
+    try:
+        # A successful login restores the username's budget
+        for _ in range(2):
+            response = client.post("/login", json={"username": "testuser", "password": "wrongpassword"})
+            assert response.status_code == 400
+        assert client.post("/login", json={"username": "testuser", "password": "testpassword"}).status_code == 200
+
+        for _ in range(3):
+            response = client.post("/login", json={"username": "testuser", "password": "wrongpassword"})
+            assert response.status_code == 400
+
+        # The budget is used up, so neither the user nor the password is looked at
+        with patch("app.routes.auth.get_user_by_username") as get_user, \
+                patch("app.routes.auth.password_hasher.verify") as verify:
+            response = client.post("/login", json={"username": "testuser", "password": "testpassword"})
+            assert response.status_code == 429
+            assert int(response.headers["Retry-After"]) >= 1
+            get_user.assert_not_called()
+            verify.assert_not_called()
+
+        response = client.post("/token", data={"username": "testuser", "password": "testpassword"})
+        assert response.status_code == 429
+    finally:
+        login_rate_limiter.clear()
+
+def test_login_unknown_user_skips_hashing(db: Session, user: User):
+    assert client.post("/login", json={"username": "testuser", "password": "testpassword"}).status_code == 200
+    completed = password_hasher.stats()["completed"]
+
+    response = client.post("/login", json={"username": "unknownuser", "password": "testpassword"})
+
+    assert response.status_code == 400
+    assert response.json()["detail"]["message"] == "Invalid credentials"
+    assert password_hasher.stats()["completed"] == completed
@@ -1,14 +1,32 @@
+import json
+import os
+from datetime import timedelta
+from unittest.mock import patch
+
 import pytest
 from fastapi.testclient import TestClient
 
+from app.core.http_cache import http_date
 from app.core.security import get_password_hash
 from app.main import app
-from app.models import Article, User, Role
+from app.models import Article, User, Role, File, FileVariant
 from app.models.base import Base
 from app.core.database import Session, clear_all_data_on_database, engine
 
 client = TestClient(app)
 
+@pytest.fixture(scope="module", autouse=True)
+def client_lifespan():
+    # Keep one event loop for the whole module so pooled asyncpg connections stay usable
+    with client:
+        yield
+
+@pytest.fixture(autouse=True)
+def role_misses_reload():
+    # Roles are inserted behind the registry's back and used straight away
+    with patch("app.core.roles.MISS_RELOAD_SECONDS", 0):
+        yield
+
 @pytest.fixture
 def db():
     Base.metadata.create_all(bind=engine)
@@ -127,4 +145,393 @@ def test_delete_content(db, user):
         headers={"Authorization": f"Bearer {token}"},
     )
     assert response.status_code == 200
-    assert response.json()["message"] == "Article deleted successfully"
\ No newline at end of file
+    assert response.json()["message"] == "Article deleted successfully"
+
+def test_get_content_paginated(db, user):
+    login_response = client.post(
+        "/login",
+        json={
+            "username": "testuser",
+            "password": "testpassword"
+        }
+    )
+    assert login_response.status_code == 200
+    token = login_response.json()["data"]["access_token"]
+
+    created_ids = []
+    for index in range(3):
+        create_response = client.post(
+            "/content/",
+            headers={"Authorization": f"Bearer {token}"},
+            data={"title": f"Test Title {index}", "content": "Test Content"},
+        )
+        created_ids.append(create_response.json()["data"]["id"])
+
+    response = client.get("/content/?limit=2", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    page = response.json()["data"]
+    assert [item["id"] for item in page["items"]] == created_ids[:0:-1]
+    assert page["next_cursor"] is not None
+
+    response = client.get(
+        f"/content/?limit=2&cursor={page['next_cursor']}",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 200
+    page = response.json()["data"]
+    assert [item["id"] for item in page["items"]] == created_ids[:1]
+    assert page["next_cursor"] is None
+
+    for cursor in ("not-a-cursor", created_ids[1]):
+        response = client.get("/content/", headers={"Authorization": f"Bearer {token}"}, params={"cursor": cursor})
+        assert response.status_code == 400
+
+def test_get_content_summary_view(db, user):
+    login_response = client.post(
+        "/login",
+        json={
+            "username": "testuser",
+            "password": "testpassword"
+        }
+    )
+    assert login_response.status_code == 200
+    token = login_response.json()["data"]["access_token"]
+
+    client.post(
+        "/content/",
+        headers={"Authorization": f"Bearer {token}"},
+        data={"title": "Test Title", "content": "x" * 1000},
+    )
+
+    response = client.get("/content/?view=summary", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    item = response.json()["data"]["items"][0]
+    assert "content" not in item
+    assert item["excerpt"] == "x" * 280
+
+def test_create_content_same_title_slugs(db, user):
+    login_response = client.post(
+        "/login",
+        json={
+            "username": "testuser",
+            "password": "testpassword"
+        }
+    )
+    assert login_response.status_code == 200
+    token = login_response.json()["data"]["access_token"]
+
+    content_ids = []
+    for _ in range(3):
+        response = client.post(
+            "/content/",
+            headers={"Authorization": f"Bearer {token}"},
+            data={"title": "Weekly Update", "content": "Test Content"},
+        )
+        assert response.status_code == 200
+        content_ids.append(response.json()["data"]["id"])
+
+    slugs = {article.slug for article in db.query(Article).filter(Article.author_id == user.id)}
+    assert slugs == {"weekly-update", "weekly-update-1", "weekly-update-2"}
+
+    content_id = response.json()["data"]["id"]
+    response = client.put(
+        f"/content/{content_id}",
+        headers={"Authorization": f"Bearer {token}"},
+        data={"title": "Weekly Update"},
+    )
+    assert response.status_code == 200
+
+    db.expire_all()
+    assert db.get(Article, content_id).slug == "weekly-update-2"
+
+    # Neither the base slug nor the highest suffix, and a title that slugifies the same
+    response = client.put(
+        f"/content/{content_ids[1]}",
+        headers={"Authorization": f"Bearer {token}"},
+        data={"title": "Weekly update"},
+    )
+    assert response.status_code == 200
+
+    db.expire_all()
+    assert db.get(Article, content_ids[1]).slug == "weekly-update-1"
+    assert db.get(Article, content_ids[1]).title == "Weekly update"
+
+
+def test_thumbnail_deduplicated(db, user, tmp_path):
+    login_response = client.post(
+        "/login",
+        json={
+            "username": "testuser",
+            "password": "testpassword"
+        }
+    )
+    assert login_response.status_code == 200
+    token = login_response.json()["data"]["access_token"]
+
+    thumbnail = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+    with patch("app.core.storage.UPLOAD_DIR", str(tmp_path)):
+        content_ids = []
+        for _ in range(2):
+            response = client.post(
+                "/content/",
+                headers={"Authorization": f"Bearer {token}"},
+                data={"title": "Test Title", "content": "Test Content"},
+                files={"thumbnail": ("thumbnail.png", thumbnail, "image/png")},
+            )
+            assert response.status_code == 200
+            content_ids.append(response.json()["data"]["id"])
+
+        assert db.query(File).count() == 1
+        assert len(os.listdir(tmp_path)) == 1
+
+        response = client.delete(f"/content/{content_ids[0]}/permanently", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 200
+        assert len(os.listdir(tmp_path)) == 1
+
+        response = client.delete(f"/content/{content_ids[1]}/permanently", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 200
+        assert os.listdir(tmp_path) == []
+        assert db.query(File).count() == 0
+
+def test_get_content_conditional(db, user):
+    login_response = client.post(
+        "/login",
+        json={
+            "username": "testuser",
+            "password": "testpassword"
+        }
+    )
+    assert login_response.status_code == 200
+    headers = {"Authorization": f"Bearer {login_response.json()['data']['access_token']}"}
+
+    create_response = client.post("/content/", headers=headers, data={"title": "Cached", "content": "Body"})
+    content_id = create_response.json()["data"]["id"]
+
+    response = client.get(f"/content/{content_id}", headers=headers)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    last_modified = response.headers["last-modified"]
+
+    response = client.get(f"/content/{content_id}", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    response = client.get(f"/content/{content_id}", headers={**headers, "If-Modified-Since": last_modified})
+    assert response.status_code == 304
+    assert response.headers["last-modified"] == last_modified
+
+    client.put(f"/content/{content_id}", headers=headers, data={"content": "Changed"})
+
+    response = client.get(f"/content/{content_id}", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["data"]["content"] == "Changed"
+
+def test_get_content_revalidated_after_variants(db, user, tmp_path):
+    login_response = client.post("/login", json={"username": "testuser", "password": "testpassword"})
+    headers = {"Authorization": f"Bearer {login_response.json()['data']['access_token']}"}
+
+    with patch("app.core.storage.UPLOAD_DIR", str(tmp_path)):
+        create_response = client.post(
+            "/content/",
+            headers=headers,
+            data={"title": "With thumbnail", "content": "Body"},
+            files={"thumbnail": ("thumbnail.png", b"\x89PNG\r\n\x1a\n" + b"\x00" * 64, "image/png")},
+        )
+        content_id = create_response.json()["data"]["id"]
+
+        response = client.get(f"/content/{content_id}", headers=headers)
+        assert response.json()["data"]["thumbnail_srcset"] is None
+        last_modified = response.headers["last-modified"]
+
+        # Variants generated after the client's copy, without touching the article row
+        article = db.get(Article, content_id)
+        created_at = article.updated_at + timedelta(seconds=1)
+        db.add(FileVariant(
+            file_id=article.thumbnail_file_id,
+            width=320,
+            format="webp",
+            file_path=str(tmp_path / "small-320w.webp"),
+            size=1,
+            created_at=created_at,
+        ))
+        db.commit()
+
+        response = client.get(f"/content/{content_id}", headers={**headers, "If-Modified-Since": last_modified})
+        assert response.status_code == 200
+        assert response.json()["data"]["thumbnail_srcset"] == "/static/small-320w.webp 320w"
+        assert response.headers["last-modified"] == http_date(created_at)
+
+        # Likewise for the author's name
+        last_modified = response.headers["last-modified"]
+        user.name = "Renamed Author"
+        user.updated_at = created_at + timedelta(seconds=1)
+        db.commit()
+
+        response = client.get(f"/content/{content_id}", headers={**headers, "If-Modified-Since": last_modified})
+        assert response.status_code == 200
+        assert response.json()["data"]["author"]["name"] == "Renamed Author"
+
+        client.delete(f"/content/{content_id}/permanently", headers=headers)
+
+def test_get_content_cached(db, user):
+    login_response = client.post(
+        "/login",
+        json={
+            "username": "testuser",
+            "password": "testpassword"
+        }
+    )
+    assert login_response.status_code == 200
+    headers = {"Authorization": f"Bearer {login_response.json()['data']['access_token']}"}
+
+    create_response = client.post("/content/", headers=headers, data={"title": "Cached", "content": "Body"})
+    content_id = create_response.json()["data"]["id"]
+
+    def article_stats():
+        response = client.get("/system/stats", headers=headers)
+        assert response.status_code == 200
+        return response.json()["data"]["caches"]["article"]
+
+    before = article_stats()
+    first = client.get(f"/content/{content_id}", headers=headers).json()["data"]
+    second = client.get(f"/content/{content_id}", headers=headers).json()["data"]
+    after = article_stats()
+
+    assert first == second
+    assert after["misses"] - before["misses"] == 1
+    assert after["hits"] - before["hits"] == 1
+
+    client.put(f"/content/{content_id}", headers=headers, data={"content": "Changed"})
+    assert client.get(f"/content/{content_id}", headers=headers).json()["data"]["content"] == "Changed"
+    assert article_stats()["misses"] - after["misses"] == 1
+
+    client.delete(f"/content/{content_id}", headers=headers)
+    assert client.get(f"/content/{content_id}", headers=headers).status_code == 404
+
+def test_system_stats_password_hashing(db, user):
+    login_response = client.post(
+        "/login",
+        json={
+            "username": "testuser",
+            "password": "testpassword"
+        }
+    )
+    assert login_response.status_code == 200
+    headers = {"Authorization": f"Bearer {login_response.json()['data']['access_token']}"}
+
+    response = client.get("/system/stats", headers=headers)
+    assert response.status_code == 200
+    stats = response.json()["data"]["password_hashing"]
+    assert stats["completed"] >= 1
+    assert stats["in_flight"] == 0
+    assert stats["p50_ms"] > 0
+
+def test_search_content(db, user):
+    login_response = client.post(
+        "/login",
+        json={
+            "username": "testuser",
+            "password": "testpassword"
+        }
+    )
+    assert login_response.status_code == 200
+    headers = {"Authorization": f"Bearer {login_response.json()['data']['access_token']}"}
+
+    articles = [
+        ("Gardening basics", "How to water <b>tomatoes</b> and other plants."),
+        ("Tomatoes everywhere", "A whole article about tomatoes."),
+        ("Cooking", "Pasta with a sauce, no fruit mentioned."),
+        ("Comparisons", "Cherry < beefsteak & plum."),
+        ("Deleted tomatoes", "Tomatoes that were removed."),
+    ]
+    ids = []
+    for title, content in articles:
+        response = client.post("/content/", headers=headers, data={"title": title, "content": content})
+        ids.append(response.json()["data"]["id"])
+    client.delete(f"/content/{ids[4]}", headers=headers)
+
+    response = client.get("/content/search", headers=headers, params={"q": "tomato"})
+    assert response.status_code == 200
+    items = response.json()["data"]["items"]
+    # The title match outranks the body-only match; the deleted article is excluded
+    assert [item["id"] for item in items] == [ids[1], ids[0]]
+    assert items[0]["rank"] > items[1]["rank"]
+    assert "<mark>tomatoes</mark>" in items[1]["snippet"]
+    assert "<b>" not in items[1]["snippet"]
+
+    items = client.get("/content/search", headers=headers, params={"q": "beefsteak"}).json()["data"]["items"]
+    assert items[0]["snippet"] == "Cherry &lt; <mark>beefsteak</mark> &amp; plum"
+
+    first_page = client.get("/content/search", headers=headers, params={"q": "tomato", "limit": 1}).json()["data"]
+    assert [item["id"] for item in first_page["items"]] == [ids[1]]
+    second_page = client.get(
+        "/content/search", headers=headers, params={"q": "tomato", "limit": 1, "cursor": first_page["next_cursor"]}
+    ).json()["data"]
+    assert [item["id"] for item in second_page["items"]] == [ids[0]]
+    assert second_page["next_cursor"] is None
+
+    response = client.get("/content/search", headers=headers, params={"q": "tomato", "cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+def test_import_export_content(db, user):
+    login_response = client.post(
+        "/login",
+        json={
+            "username": "testuser",
+            "password": "testpassword"
+        }
+    )
+    assert login_response.status_code == 200
+    headers = {"Authorization": f"Bearer {login_response.json()['data']['access_token']}"}
+
+    client.post("/content/", headers=headers, data={"title": "Weekly update", "content": "Existing"})
+
+    body = "\n".join([
+        json.dumps({"title": "Weekly update", "content": "First import"}),
+        json.dumps({"title": "Weekly update", "content": "Second import", "created_at": "2020-01-02T03:04:05+00:00"}),
+        "",
+        json.dumps({"title": "Weekly update 2", "content": "Base slug taken within the batch", "author_id": user.id}),
+    ])
+    response = client.post("/content/import", headers=headers, content=body)
+    assert response.status_code == 200
+    assert response.json()["data"] == {"imported": 3}
+
+    response = client.get("/content/export", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    exported = [json.loads(line) for line in response.text.splitlines()]
+
+    # Same slugs as creating the articles one by one
+    assert sorted(article["slug"] for article in exported) == [
+        "weekly-update", "weekly-update-1", "weekly-update-2", "weekly-update-2-1",
+    ]
+    # Ids follow created_at, so the back-dated article exports first
+    assert exported[0]["content"] == "Second import"
+    assert exported[0]["created_at"] == "2020-01-02T03:04:05Z"
+    assert {article["author_id"] for article in exported} == {user.id}
+
+def test_import_content_rejects_invalid_line(db, user):
+    login_response = client.post(
+        "/login",
+        json={
+            "username": "testuser",
+            "password": "testpassword"
+        }
+    )
+    assert login_response.status_code == 200
+    headers = {"Authorization": f"Bearer {login_response.json()['data']['access_token']}"}
+
+    body = json.dumps({"title": "Valid", "content": "Body"}) + "\n" + json.dumps({"title": "", "content": "Body"})
+    response = client.post("/content/import", headers=headers, content=body)
+    assert response.status_code == 400
+    assert response.json()["detail"]["message"].startswith("Line 2:")
+
+    body = json.dumps({"title": "Valid", "content": "Body", "author_id": user.id + 1000})
+    response = client.post("/content/import", headers=headers, content=body)
+    assert response.status_code == 400
+    assert response.json()["detail"]["message"] == f"Line 1: author {user.id + 1000} does not exist"
+
+    response = client.get("/content/", headers=headers)
+    assert response.json()["data"]["items"] == []
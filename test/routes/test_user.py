@@ -1,14 +1,32 @@
+from datetime import datetime, UTC
+from unittest.mock import patch
+
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import event, text
 
+from app.core.config import settings
 from app.core.security import get_password_hash
 from app.main import app
 from app.models import User, Role
 from app.models.base import Base
-from app.core.database import Session, clear_all_data_on_database, engine
+from app.core.database import Session, async_engine, clear_all_data_on_database, engine
+from app.schemas.user import CreateUserRequest, DetailUser, UpdateUserRequest
 
 client = TestClient(app)
 
+@pytest.fixture(scope="module", autouse=True)
+def client_lifespan():
+    # Keep one event loop for the whole module so pooled asyncpg connections stay usable
+    with client:
+        yield
+
+@pytest.fixture(autouse=True)
+def role_misses_reload():
+    # Roles are inserted behind the registry's back and used straight away
+    with patch("app.core.roles.MISS_RELOAD_SECONDS", 0):
+        yield
+
 @pytest.fixture
 def db():
     Base.metadata.create_all(bind=engine)
@@ -105,7 +123,88 @@ def test_create_user_invalid_role(db, user_admin):
     assert response.status_code == 422
     assert response.json()["errors"][0]["ctx"]["error"] == "Role does not exist."
 
-def test_get_users(db, user_admin):
+def test_create_user_role_created_by_another_worker(db, user_admin, role_editor):
+    login_response = client.post("/login", json={"username": "testuser", "password": "testpassword"})
+    assert login_response.status_code == 200
+    token = login_response.json()["data"]["access_token"]
+
+    # Load the role registry, then add a role behind its back
+    client.post(
+        "/users/",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"name": "New User", "username": "newuser", "password": "@New12345", "role": role_editor.id},
+    )
+    role = Role(name="writer")
+    db.add(role)
+    db.commit()
+
+    response = client.post(
+        "/users/",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"name": "Writer", "username": "writer", "password": "@New12345", "role": role.id},
+    )
+    assert response.status_code == 200
+
+def test_create_user_username_taken(db, user_admin, role_editor):
+    login_response = client.post("/login", json={"username": "testuser", "password": "testpassword"})
+    assert login_response.status_code == 200
+    token = login_response.json()["data"]["access_token"]
+
+    response = client.post(
+        "/users/",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"name": "New User", "username": "testuser", "password": "@New12345", "role": role_editor.id},
+    )
+    assert response.status_code == 422
+    assert response.json()["errors"][0]["loc"] == ["body", "username"]
+    assert response.json()["errors"][0]["ctx"]["error"] == "Username is already taken."
+
+def test_request_parsing_does_not_query(db):
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    for target in (engine, async_engine.sync_engine):
+        event.listen(target, "before_cursor_execute", record)
+    try:
+        CreateUserRequest(name="New User", username="newuser", password="@New12345", role=1)
+        UpdateUserRequest(username="newuser", role=1)
+    finally:
+        for target in (engine, async_engine.sync_engine):
+            event.remove(target, "before_cursor_execute", record)
+
+    assert statements == []
+
+def test_roles_served_from_registry(db, user_admin, role_editor):
+    login_response = client.post("/login", json={"username": "testuser", "password": "testpassword"})
+    assert login_response.status_code == 200
+    headers = {"Authorization": f"Bearer {login_response.json()['data']['access_token']}"}
+    assert client.get("/roles/", headers=headers).status_code == 200
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        response = client.get("/roles/", headers=headers)
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+    # The admin check and the listing are both answered from memory
+    assert response.status_code == 200
+    assert statements == []
+    assert [role["name"] for role in response.json()["data"]] == ["admin", "editor"]
+
+    response = client.post("/roles/", headers=headers, json={"name": "writer"})
+    assert response.status_code == 200
+
+    response = client.get("/roles/", headers=headers)
+    assert [role["name"] for role in response.json()["data"]] == ["admin", "editor", "writer"]
+
+def test_get_users(db, user_admin, role_admin):
     login_response = client.post("/login", json={"username": "testuser", "password": "testpassword"})
     assert login_response.status_code == 200
     token = login_response.json()["data"]["access_token"]
@@ -114,6 +213,79 @@ def test_get_users(db, user_admin):
     assert response.status_code == 200
     assert response.json()["message"] == "Users retrieved successfully"
 
+    page = response.json()["data"]
+    users = page["items"]
+    assert DetailUser.model_validate(users[0]).username == "testuser"
+    assert users[0]["role"] == {"id": role_admin.id, "name": role_admin.name}
+    assert page["next_cursor"] is None
+    assert page["approximate_total"] is None
+
+def test_get_users_paginated(db, user_admin, role_editor):
+    db.add_all([
+        User(username=f"member{index}", name=f"Member {index % 2}", password="-", role_id=role_editor.id)
+        for index in range(5)
+    ])
+    db.commit()
+    login_response = client.post("/login", json={"username": "testuser", "password": "testpassword"})
+    headers = {"Authorization": f"Bearer {login_response.json()['data']['access_token']}"}
+
+    for sort, expected in [
+        ("-username", ["testuser", "member4", "member3", "member2", "member1", "member0"]),
+        ("name", ["member0", "member2", "member4", "member1", "member3", "testuser"]),
+    ]:
+        usernames, cursor = [], None
+        while True:
+            params = {"limit": 4, "sort": sort} | ({"cursor": cursor} if cursor else {})
+            response = client.get("/users/", headers=headers, params=params)
+            assert response.status_code == 200
+            page = response.json()["data"]
+            usernames += [user["username"] for user in page["items"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert usernames == expected
+
+    # A cursor only fits the sort it was issued for
+    response = client.get("/users/", headers=headers, params={"limit": 4, "sort": "name"})
+    response = client.get("/users/", headers=headers, params={"sort": "id", "cursor": response.json()["data"]["next_cursor"]})
+    assert response.status_code == 400
+    assert response.json()["detail"]["message"] == "Invalid cursor"
+
+def test_get_users_filtered(db, user_admin, role_editor):
+    db.add_all([
+        User(username="member_a", name="Member", password="-", role_id=role_editor.id),
+        User(username="memberxb", name="Member", password="-", role_id=role_editor.id),
+        User(username="member_c", name="Member", password="-", role_id=role_editor.id, deleted_at=datetime.now(UTC)),
+    ])
+    db.commit()
+    login_response = client.post("/login", json={"username": "testuser", "password": "testpassword"})
+    headers = {"Authorization": f"Bearer {login_response.json()['data']['access_token']}"}
+
+    def usernames(**params):
+        response = client.get("/users/", headers=headers, params=params)
+        assert response.status_code == 200
+        return [user["username"] for user in response.json()["data"]["items"]]
+
+    assert usernames(role=role_editor.id) == ["member_a", "memberxb", "member_c"]
+    assert usernames(role=role_editor.id, status="active") == ["member_a", "memberxb"]
+    assert usernames(status="deleted") == ["member_c"]
+    # The underscore is matched literally, not as a LIKE wildcard
+    assert usernames(username="member_") == ["member_a", "member_c"]
+    assert usernames(username="test", sort="-id") == ["testuser"]
+
+def test_get_users_approximate_total(db, user_admin, role_editor):
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("ANALYZE users"))
+    login_response = client.post("/login", json={"username": "testuser", "password": "testpassword"})
+    headers = {"Authorization": f"Bearer {login_response.json()['data']['access_token']}"}
+
+    response = client.get("/users/", headers=headers, params={"include_total": True})
+    assert response.json()["data"]["approximate_total"] == 1
+
+    # Filtered listings only get next_cursor
+    response = client.get("/users/", headers=headers, params={"include_total": True, "status": "active"})
+    assert response.json()["data"]["approximate_total"] is None
+
 def test_update_user(db, user_admin, role_editor):
     login_response = client.post("/login", json={"username": "testuser", "password": "testpassword"})
     assert login_response.status_code == 200
@@ -134,6 +306,60 @@ def test_update_user(db, user_admin, role_editor):
     assert response.status_code == 200
     assert response.json()["message"] == "User updated successfully"
 
+def test_update_keeps_sessions(db, user_admin, role_admin):
+    login_response = client.post("/login", json={"username": "testuser", "password": "testpassword"})
+    assert login_response.status_code == 200
+    headers = {"Authorization": f"Bearer {login_response.json()['data']['access_token']}"}
+
+    response = client.put(f"/users/{user_admin.id}", headers=headers, json={"name": "Renamed User"})
+    assert response.status_code == 200
+    response = client.put(f"/roles/{role_admin.id}", headers=headers, json={"name": "admin"})
+    assert response.status_code == 200
+
+    # Neither a profile edit nor a role update ends the caller's session
+    response = client.get(f"/users/{user_admin.id}", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["data"]["name"] == "Renamed User"
+
+def test_update_user_stateless_revokes_sessions(db, user_admin, role_admin):
+    with patch.object(settings, "JWT_STATELESS_AUTH", True):
+        login_response = client.post("/login", json={"username": "testuser", "password": "testpassword"})
+        assert login_response.status_code == 200
+        headers = {"Authorization": f"Bearer {login_response.json()['data']['access_token']}"}
+
+        # The name is carried in the token, so changing it makes the token stale
+        response = client.put(f"/users/{user_admin.id}", headers=headers, json={"name": "Renamed User"})
+        assert response.status_code == 200
+        assert client.get(f"/users/{user_admin.id}", headers=headers).status_code == 401
+
+def test_update_user_username_taken(db, user_admin, role_editor):
+    login_response = client.post("/login", json={"username": "testuser", "password": "testpassword"})
+    assert login_response.status_code == 200
+    token = login_response.json()["data"]["access_token"]
+
+    create_response = client.post(
+        "/users/",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"name": "New User", "username": "newuser", "password": "@New12345", "role": role_editor.id},
+    )
+    user_id = create_response.json()["data"]["id"]
+
+    response = client.put(
+        f"/users/{user_id}",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"username": "testuser"},
+    )
+    assert response.status_code == 422
+    assert response.json()["errors"][0]["ctx"]["error"] == "Username is already taken."
+
+    response = client.put(
+        f"/users/{user_id}",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"role": role_editor.id + 100},
+    )
+    assert response.status_code == 422
+    assert response.json()["errors"][0]["ctx"]["error"] == "Role does not exist."
+
 def test_delete_user(db, user_admin, role_editor):
     login_response = client.post("/login", json={"username": "testuser", "password": "testpassword"})
     assert login_response.status_code == 200
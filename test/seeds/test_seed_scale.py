@@ -0,0 +1,50 @@
+import pytest
+from sqlalchemy import func, select
+
+from app.core.database import Session, clear_all_data_on_database, engine
+from app.core.security import verify_password
+from app.models import Article, User, Role
+from app.models.base import Base
+from app.seeds.seed_scale import SCALE_PASSWORD, seed_scale
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    db = Session()
+    try:
+        yield db
+    finally:
+        db.close()
+        clear_all_data_on_database(db)
+
+@pytest.fixture
+def role(db):
+    role = Role(name="editor")
+    db.add(role)
+    db.commit()
+    return role
+
+def test_seed_scale(db, role):
+    seed_scale(users=50, articles=2000, deleted_ratio=0.1, random_seed=1)
+    seed_scale(users=5, articles=100, random_seed=1)
+
+    users = db.execute(select(User)).scalars().all()
+    assert len(users) == 55
+    assert len({user.username for user in users}) == 55
+    assert verify_password(SCALE_PASSWORD, users[0].password)
+    assert {user.role_id for user in users} == {role.id}
+
+    total, slugs, deleted, searchable = db.execute(select(
+        func.count(),
+        func.count(Article.slug.distinct()),
+        func.count(Article.deleted_at),
+        func.count(Article.search_vector),
+    )).one()
+    assert total == slugs == searchable == 2100
+    assert 100 < deleted < 320
+    # Popular titles repeat, and their slugs get numeric suffixes like generate_slug's
+    assert db.scalar(select(func.count()).where(Article.slug.like("weekly-update-%"))) > 100
+
+    articles = db.execute(select(Article.created_at, Article.updated_at, Article.deleted_at)).all()
+    assert all(article.created_at <= article.updated_at for article in articles)
+    assert all(article.deleted_at is None or article.deleted_at >= article.created_at for article in articles)